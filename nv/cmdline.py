@@ -16,6 +16,7 @@
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
 from NeoVintageous.nv.options import get_option
+from NeoVintageous.nv.output import OutputSink
 from NeoVintageous.nv.utils import hide_panel
 
 
@@ -123,6 +124,9 @@ class CmdlineOutput():
 
         _init_common_panel_settings(self._output)
 
+        self._output.set_read_only(True)
+        self._sink = OutputSink(self._output)
+
     def disable_highlight_line(self):
         self._output.settings().set('highlight_line', False)
 
@@ -130,9 +134,14 @@ class CmdlineOutput():
         self._window.run_command('show_panel', {'panel': 'output.' + self._name})
         self._output.settings().set('nv_cmdline_output', True)
         self.write('\nPress ENTER to continue')
+        self.flush()
+        self._output.sel().clear()
+        self._output.sel().add(self._output.size())
         self._window.focus_view(self._window.find_output_panel(self._name))
 
     def write(self, text: str) -> None:
-        self._output.set_read_only(False)
-        self._output.run_command('insert', {'characters': text})
-        self._output.set_read_only(True)
+        # The output is buffered until it's flushed or shown.
+        self._sink.write(text)
+
+    def flush(self) -> None:
+        self._sink.flush()
@@ -15,12 +15,17 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from time import perf_counter
+
+from sublime import LITERAL
+from sublime import set_timeout
+
 from NeoVintageous.nv.cmdline import Cmdline
 from NeoVintageous.nv.history import history_update
 from NeoVintageous.nv.history import reset_cmdline_history
-from NeoVintageous.nv.search import add_search_highlighting
 from NeoVintageous.nv.search import clear_search_highlighting
-from NeoVintageous.nv.search import find_search_occurrences
+from NeoVintageous.nv.search import highlight_search
+from NeoVintageous.nv.search import narrow_search_occurrences
 from NeoVintageous.nv.search import process_search_pattern
 from NeoVintageous.nv.settings import append_sequence
 from NeoVintageous.nv.settings import get_count
@@ -36,6 +41,10 @@ from NeoVintageous.nv.vi.search import find_wrapping
 from NeoVintageous.nv.vi.search import reverse_find_wrapping
 from NeoVintageous.nv.vim import status_message
 
+# Changes to the pattern within this many milliseconds of the last incremental
+# search are searched when the delay is up, and only the latest pattern is.
+_INCSEARCH_DELAY = 50
+
 
 class CmdlineSearch():
 
@@ -43,6 +52,10 @@ class CmdlineSearch():
         self.view = view
         self.forward = forward
         self.type = Cmdline.SEARCH_FORWARD if self.forward else Cmdline.SEARCH_BACKWARD
+        self._pending = None
+        self._searched_at = None
+        self._prefix = None
+        self._progress = None
 
     def run(self, edit, pattern: str = '') -> None:
         set_reset_during_init(self.view, False)
@@ -57,6 +70,7 @@ class CmdlineSearch():
         self._cmdline.prompt(pattern)
 
     def on_done(self, pattern: str) -> None:
+        self._pending = None
         history_update(self.type + pattern)
         reset_cmdline_history()
         clear_search_highlighting(self.view)
@@ -68,10 +82,47 @@ class CmdlineSearch():
         evaluate_state(self.view)
 
     def on_change(self, pattern: str) -> None:
+        # A pending search is cancelled by replacing its token.
+        self._pending = None
+
+        if self._searched_at is not None:
+            elapsed = (perf_counter() - self._searched_at) * 1000
+            if elapsed < _INCSEARCH_DELAY:
+                token = object()
+                self._pending = token
+                set_timeout(lambda: self._on_delayed_change(token, pattern), int(_INCSEARCH_DELAY - elapsed) + 1)
+                return
+
+        self._search(pattern)
+
+    def _on_delayed_change(self, token, pattern: str) -> None:
+        if self._pending is token and self.view.is_valid():
+            self._pending = None
+            self._search(pattern)
+
+    def _search(self, pattern: str) -> None:
+        # The delay is measured from the end of the search, so changes made
+        # while a slow search runs are coalesced into one search.
+        self._incsearch(pattern)
+        self._searched_at = perf_counter()
+
+    def _incsearch(self, pattern: str) -> None:
         count = get_count(self.view)
         sel = self.view.sel()[0]
         pattern, flags = process_search_pattern(self.view, pattern)
 
+        # When the pattern extends the previous one, the occurrences of the
+        # previous one are narrowed down instead of searching the whole buffer.
+        # The occurrences found for the previous one are kept with its search
+        # progress, because in large buffers they're only cached once the
+        # whole buffer has been searched.
+        if self._prefix:
+            narrow_search_occurrences(self.view, self._prefix, pattern, flags)
+
+        self._prefix = pattern if flags & LITERAL else None
+        progress = self._progress
+        self._progress = None
+
         if self.forward:
             start = get_insertion_point_at_b(sel) + 1
             end = self.view.size()
@@ -99,10 +150,11 @@ class CmdlineSearch():
         if not match:
             return status_message('E486: Pattern not found: %s', pattern)
 
-        add_search_highlighting(self.view, find_search_occurrences(self.view, pattern, flags), [match])
         show_if_not_visible(self.view, match)
+        self._progress = highlight_search(self.view, pattern, flags, [match], narrow_from=progress)
 
     def on_cancel(self) -> None:
+        self._pending = None
         clear_search_highlighting(self.view)
         reset_command_data(self.view)
         reset_cmdline_history()
@@ -32,6 +32,7 @@ from sublime_plugin import WindowCommand
 
 from NeoVintageous.nv import listener
 from NeoVintageous.nv import macros
+from NeoVintageous.nv import shell
 from NeoVintageous.nv.cmdline import Cmdline
 from NeoVintageous.nv.cmdline_search import CmdlineSearch
 from NeoVintageous.nv.ex.completions import insert_best_cmdline_completion
@@ -48,6 +49,7 @@ from NeoVintageous.nv.history import history_update
 from NeoVintageous.nv.history import next_cmdline_history
 from NeoVintageous.nv.history import reset_cmdline_history
 from NeoVintageous.nv.jumplist import jumplist_updater
+from NeoVintageous.nv.line_completion import get_line_completions
 from NeoVintageous.nv.macros import add_macro_step
 from NeoVintageous.nv.marks import set_mark
 from NeoVintageous.nv.paste import pad_visual_block_paste_contents
@@ -64,11 +66,9 @@ from NeoVintageous.nv.registers import registers_get_for_paste
 from NeoVintageous.nv.registers import registers_op_change
 from NeoVintageous.nv.registers import registers_op_delete
 from NeoVintageous.nv.registers import registers_op_yank
-from NeoVintageous.nv.search import add_search_highlighting
 from NeoVintageous.nv.search import clear_search_highlighting
-from NeoVintageous.nv.search import find_search_occurrences
-from NeoVintageous.nv.search import find_word_search_occurrences
 from NeoVintageous.nv.search import get_search_occurrences
+from NeoVintageous.nv.search import highlight_search
 from NeoVintageous.nv.search import process_search_pattern
 from NeoVintageous.nv.search import process_word_search_pattern
 from NeoVintageous.nv.settings import get_glue_until_normal_mode
@@ -76,10 +76,12 @@ from NeoVintageous.nv.settings import get_last_search_pattern
 from NeoVintageous.nv.settings import get_last_search_pattern_command
 from NeoVintageous.nv.settings import get_mode
 from NeoVintageous.nv.settings import get_normal_insert_count
+from NeoVintageous.nv.settings import get_repeat_command
 from NeoVintageous.nv.settings import get_repeat_data
 from NeoVintageous.nv.settings import get_sequence
 from NeoVintageous.nv.settings import get_setting
 from NeoVintageous.nv.settings import get_xpos
+from NeoVintageous.nv.settings import is_gluing_undo_groups
 from NeoVintageous.nv.settings import is_processing_notation
 from NeoVintageous.nv.settings import set_glue_until_normal_mode
 from NeoVintageous.nv.settings import set_last_char_search
@@ -92,6 +94,7 @@ from NeoVintageous.nv.settings import set_xpos
 from NeoVintageous.nv.settings import toggle_ctrl_keys
 from NeoVintageous.nv.settings import toggle_super_keys
 from NeoVintageous.nv.state import reset_command_data
+from NeoVintageous.nv.state import run_repeat_command
 from NeoVintageous.nv.state import update_status_line
 from NeoVintageous.nv.ui import ui_bell
 from NeoVintageous.nv.ui import ui_highlight_yank
@@ -116,6 +119,7 @@ from NeoVintageous.nv.utils import get_previous_selection
 from NeoVintageous.nv.utils import get_scroll_down_target_pt
 from NeoVintageous.nv.utils import get_scroll_up_target_pt
 from NeoVintageous.nv.utils import get_string_under_cursor
+from NeoVintageous.nv.utils import glue_undo_groups
 from NeoVintageous.nv.utils import hide_panel
 from NeoVintageous.nv.utils import highest_visible_pt
 from NeoVintageous.nv.utils import highlow_visible_rows
@@ -166,7 +170,6 @@ from NeoVintageous.nv.utils import update_xpos
 from NeoVintageous.nv.vi.search import find_in_range
 from NeoVintageous.nv.vi.search import find_wrapping
 from NeoVintageous.nv.vi.search import reverse_find_wrapping
-from NeoVintageous.nv.vi.search import reverse_search
 from NeoVintageous.nv.vi.text_objects import big_word_end_reverse
 from NeoVintageous.nv.vi.text_objects import big_word_reverse
 from NeoVintageous.nv.vi.text_objects import find_next_item_match_pt
@@ -530,6 +533,13 @@ class nv_view(TextCommand):
             self.view.insert(edit, 0, **kwargs)
         elif action == 'replace_line':
             replace_line(self.view, edit, **kwargs)
+        elif action == 'replace_filtered_regions':
+            shell.replace_filtered_regions(
+                self.view,
+                edit,
+                [Region(a, b) for a, b in kwargs['regions']],
+                kwargs['outputs']
+            )
 
 
 class Neovintageous(WindowCommand):
@@ -784,12 +794,23 @@ class nv_vi_c(TextCommand):
         enter_insert_mode(self.view, mode)
 
 
+# The undo groups of an insert are glued when it ends, unless they're glued
+# as part of a larger edit, see glue_undo_groups().
+def _run_undo_glue_command(view, command: str) -> None:
+    if not is_gluing_undo_groups(view):
+        view.window().run_command(command)
+
+
 class nv_enter_normal_mode(TextCommand):
 
     def run(self, edit, mode=None, count=None, register=None, from_init=False):
         if is_insert_mode(self.view, mode):
             listener.on_insert_leave(self.view, new_mode=NORMAL)
 
+        # Pressing <Esc> in normal mode cancels a background shell filter.
+        if not from_init and mode == NORMAL and shell.is_filtering(self.view):
+            shell.cancel_filter(self.view)
+
         if self.view.is_auto_complete_visible():
             self.view.window().run_command('hide_auto_complete')
 
@@ -875,7 +896,7 @@ class nv_enter_normal_mode(TextCommand):
 
         if get_glue_until_normal_mode(self.view) and not is_processing_notation(self.view):
             if self.view.is_dirty():
-                self.view.window().run_command('glue_marked_undo_groups')
+                _run_undo_glue_command(self.view, 'glue_marked_undo_groups')
                 # We're exiting from insert mode or replace mode. Capture
                 # the last native command as repeat data.
                 repeat_data = get_repeat_data(self.view)
@@ -891,7 +912,7 @@ class nv_enter_normal_mode(TextCommand):
                 add_macro_step(self.view, 'nv_enter_normal_mode', {'mode': mode, 'from_init': from_init})
             else:
                 add_macro_step(self.view, 'nv_enter_normal_mode', {'mode': mode, 'from_init': from_init})
-                self.view.window().run_command('unmark_undo_groups_for_gluing')
+                _run_undo_glue_command(self.view, 'unmark_undo_groups_for_gluing')
                 set_glue_until_normal_mode(self.view, False)
 
         normal_insert_count = get_normal_insert_count(self.view)
@@ -1114,11 +1135,8 @@ class nv_vi_dot(WindowCommand):
             if not repeat_data:
                 return ui_bell()
 
-        # TODO: Find out if the user actually meant '1'.
-        if count and count == 1:
-            count = None
-
         repeat_type, seq_or_cmd, old_mode, visual_data = repeat_data
+        repeat_command = get_repeat_command(self.view)
 
         if visual_data and (mode != VISUAL):
             restore_visual_repeat_data(self.view, get_mode(self.view), visual_data)
@@ -1127,7 +1145,10 @@ class nv_vi_dot(WindowCommand):
         elif mode not in (VISUAL, VISUAL_LINE, NORMAL, INTERNAL_NORMAL, INSERT):
             return ui_bell()
 
-        if repeat_type == 'vi':
+        if repeat_type == 'vi' and repeat_command and not visual_data and mode in (NORMAL, INTERNAL_NORMAL):
+            # Fast path: replay the translated command instead of the keys.
+            repeat_command = run_repeat_command(self.view, repeat_command, count)
+        elif repeat_type == 'vi':
             self.window.run_command('nv_process_notation', {'keys': seq_or_cmd, 'repeat_count': count})
         elif repeat_type == 'native':
             # FIXME: We're not repeating as we should. It's the motion that should receive this count.
@@ -1137,7 +1158,7 @@ class nv_vi_dot(WindowCommand):
             raise ValueError('bad repeat data')
 
         enter_normal_mode(self.window, mode)
-        set_repeat_data(self.view, repeat_data)
+        set_repeat_data(self.view, repeat_data, repeat_command)
 
 
 class nv_vi_dd(TextCommand):
@@ -2259,26 +2280,33 @@ class nv_vi_at(TextCommand):
         if not macros.is_readable(name):
             return ui_bell("E354: Invalid register name: '" + name + "'")
 
-        cmds = macros.get_recorded(name)
-        if not cmds:
+        plan = macros.get_compiled(name)
+        if not plan:
             return
 
         macros.set_last_used_register_name(name)
 
-        for i in range(count):
-            for cmd, args in cmds:
-                if 'xpos' in args:
-                    update_xpos(self.view)
-                    args['xpos'] = get_xpos(self.view)
-                elif args.get('motion'):
-                    motion = args.get('motion')
-                    if motion and 'motion_args' in motion and 'xpos' in motion['motion_args']:
-                        update_xpos(self.view)
-                        motion = args.get('motion')
-                        motion['motion_args']['xpos'] = get_xpos(self.view)
-                        args['motion'] = motion
+        window = self.view.window()
 
-                self.view.window().run_command(cmd, args)
+        # The whole playback is undone in one go. Unlike processing notation,
+        # playing a macro doesn't change how repeat data is captured.
+        with glue_undo_groups(self.view):
+            if is_visual_mode(mode):
+                # Run the macro on each line of the selection, like
+                # :'<,'>normal @{name} in Vim.
+                first_row = self.view.rowcol(self.view.sel()[0].begin())[0]
+                last_row = self.view.rowcol(max(self.view.sel()[-1].end() - 1, 0))[0]
+                enter_normal_mode(self.view, mode)
+                for row in range(first_row, last_row + 1):
+                    if row > self.view.rowcol(self.view.size())[0]:
+                        break
+
+                    set_selection(self.view, self.view.text_point(row, 0))
+                    macros.play(window, self.view, plan)
+            else:
+                for i in range(count):
+                    if not macros.play(window, self.view, plan):
+                        break
 
 
 class nv_enter_visual_block_mode(TextCommand):
@@ -2475,7 +2503,7 @@ class nv_vi_ctrl_x_ctrl_l(TextCommand):
         s = self.view.sel()[0]
         line_begin = self.view.text_point(row_at(self.view, s.b), 0)
         prefix = self.view.substr(Region(line_begin, s.b)).lstrip()
-        self._matches = self.find_matches(prefix, end=self.view.line(s.b).a)
+        self._matches = self.find_matches(prefix, s.b)
         if self._matches:
             self.show_matches(self._matches)
             set_reset_during_init(self.view, False)
@@ -2492,20 +2520,8 @@ class nv_vi_ctrl_x_ctrl_l(TextCommand):
         del self.__dict__['_matches']
         set_selection(self.view, self.view.sel()[0].b)
 
-    def find_matches(self, prefix: str, end: int) -> list:
-        escaped = re.escape(prefix)
-        matches = []  # type: list
-        while end > 0:
-            match = reverse_search(self.view, '^\\s*{0}'.format(escaped), 0, end, flags=0)
-            if (match is None) or (len(matches) == self.MAX_MATCHES):
-                break
-            line = self.view.line(match.begin())
-            end = line.begin()
-            text = self.view.substr(line).lstrip()
-            if text not in matches:
-                matches.append(text)
-
-        return matches
+    def find_matches(self, prefix: str, pt: int) -> list:
+        return get_line_completions(self.view, prefix, pt, self.MAX_MATCHES)
 
 
 class nv_vi_find_in_line(TextCommand):
@@ -2666,7 +2682,7 @@ class nv_vi_slash_impl(TextCommand):
 
         target = get_insertion_point_at_a(match)
         regions_transformer(self.view, f)
-        add_search_highlighting(self.view, find_search_occurrences(self.view, pattern, flags))
+        highlight_search(self.view, pattern, flags)
 
 
 class nv_vi_l(TextCommand):
@@ -3305,12 +3321,11 @@ class nv_vi_star(TextCommand):
         with jumplist_updater(self.view):
             regions_transformer(self.view, f)
 
-        add_search_highlighting(self.view, find_word_search_occurrences(self.view, pattern, flags))
-
         if save:
             set_last_search_pattern(self.view, word, 'nv_vi_star')
 
         show_if_not_visible(self.view)
+        highlight_search(self.view, pattern, flags)
 
 
 class nv_vi_octothorp(TextCommand):
@@ -3350,12 +3365,11 @@ class nv_vi_octothorp(TextCommand):
         with jumplist_updater(self.view):
             regions_transformer(self.view, f)
 
-        add_search_highlighting(self.view, find_word_search_occurrences(self.view, pattern, flags))
-
         if save:
             set_last_search_pattern(self.view, word, 'nv_vi_octothorp')
 
         show_if_not_visible(self.view)
+        highlight_search(self.view, pattern, flags)
 
 
 class nv_vi_b(TextCommand):
@@ -3748,7 +3762,7 @@ class nv_vi_question_mark_impl(TextCommand):
 
         target = get_insertion_point_at_a(match)
         regions_transformer(self.view, f)
-        add_search_highlighting(self.view, find_search_occurrences(self.view, pattern, flags))
+        highlight_search(self.view, pattern, flags)
 
 
 class nv_vi_question_mark(TextCommand):
@@ -3786,14 +3800,14 @@ class nv_vi_repeat_buffer_search(TextCommand):
 class nv_vi_search(TextCommand):
 
     def run(self, edit, mode=None, count=1, forward=True):
-        last_search = get_last_search_pattern(self.view)
+        last_search, flags = process_search_pattern(self.view, get_last_search_pattern(self.view) or '')
 
         def f(view, s):
             b = get_insertion_point_at_b(s)
 
             if forward:
                 start = prev_blank(view, b) if mode in (NORMAL, INTERNAL_NORMAL) else b
-                target = find_wrapping(self.view, last_search, start, self.view.size())
+                target = find_wrapping(self.view, last_search, start, self.view.size(), flags)
                 if target is not None:
                     if mode in (NORMAL, INTERNAL_NORMAL):
                         s.a = target.a
@@ -3803,7 +3817,7 @@ class nv_vi_search(TextCommand):
 
             else:
                 start = next_blank(view, b) if mode in (NORMAL, INTERNAL_NORMAL) else b
-                target = reverse_find_wrapping(self.view, last_search, 0, start)
+                target = reverse_find_wrapping(self.view, last_search, 0, start, flags)
                 if target is not None:
                     if mode in (NORMAL, INTERNAL_NORMAL):
                         s.a = target.b
@@ -20,13 +20,17 @@ from sublime import OP_NOT_EQUAL
 from sublime import version
 from sublime_plugin import EventListener
 
+from NeoVintageous.nv.line_completion import update_line_index
 from NeoVintageous.nv.modeline import do_modeline
 from NeoVintageous.nv.options import get_option
+from NeoVintageous.nv.profiler import count_query_context
 from NeoVintageous.nv.registers import set_alternate_file_register
+from NeoVintageous.nv.session import get_setting_cache
 from NeoVintageous.nv.session import session_on_close
 from NeoVintageous.nv.session import session_on_exit
 from NeoVintageous.nv.settings import get_mode
 from NeoVintageous.nv.settings import get_setting
+from NeoVintageous.nv.settings import get_view_setting
 from NeoVintageous.nv.state import init_view
 from NeoVintageous.nv.utils import fix_eol_cursor
 from NeoVintageous.nv.utils import is_view
@@ -56,9 +60,26 @@ def _check_query_context_value(value: bool, operator: int, operand: bool, match_
     return False
 
 
+# The query contexts evaluate is_view() and the handled keys of a mode once
+# and memoise the results in the setting cache of the view, which is cleared
+# whenever the view settings change. The tuple keys can't clash with the
+# settings keys.
+_IS_VIEW = ('nv_is_view',)
+
+
+def _is_view(view) -> bool:
+    cache = get_setting_cache(view)
+    try:
+        return cache[_IS_VIEW]
+    except KeyError:
+        value = cache[_IS_VIEW] = is_view(view)
+
+        return value
+
+
 def _is_command_mode(view, operator: int = OP_EQUAL, operand: bool = True, match_all: bool = False) -> bool:
     return _check_query_context_value(
-        (view.settings().get('command_mode') and is_view(view)),
+        (get_view_setting(view, 'command_mode') and _is_view(view)),
         operator,
         operand,
         match_all
@@ -70,7 +91,7 @@ def _is_insert_mode(view, operator: int, operand: bool, match_all: bool) -> bool
     # mode. Fixing this will break things, for example <Esc> in replace mode
     # would break, a few things need to be reworked to fix this.
     return _check_query_context_value(
-        (not view.settings().get('command_mode') and is_view(view)),
+        (not get_view_setting(view, 'command_mode') and _is_view(view)),
         operator,
         operand,
         match_all
@@ -79,7 +100,7 @@ def _is_insert_mode(view, operator: int, operand: bool, match_all: bool) -> bool
 
 def _command_or_insert(view, operator: int, operand: bool, match_all: bool) -> bool:
     return _check_query_context_value(
-        is_view(view),
+        _is_view(view),
         operator,
         operand,
         match_all
@@ -105,26 +126,39 @@ def _winaltkeys(view, operator: int, operand: str, match_all: bool) -> bool:
     return False if winaltkeys == 'yes' else _is_command_mode(view)
 
 
+def _unhandled_keys(handle_keys: dict, mode_char: str) -> frozenset:
+    # Returns:
+    #   frozenset: The keys that are not handled in the mode. A key (no mode
+    #       prefix; all modes) takes precedence over a key for a specific mode.
+    #       The format of the latter is "{mode}_{key}" e.g. "n_<C-w>",
+    #       "v_<C-w>" meaning NORMAL, VISUAL respectively. See mode_to_char()
+    #       for a list of valid mode prefixes.
+    keys = set(key for key, handled in handle_keys.items() if not handled)
+    if mode_char:
+        prefix = mode_char + '_'
+        for key, handled in handle_keys.items():
+            if not handled and key.startswith(prefix) and key[len(prefix):] not in handle_keys:
+                keys.add(key[len(prefix):])
+
+    return frozenset(keys)
+
+
 def _handle_key(view, operator: int, operand: str, match_all: bool) -> bool:
-    handle_keys = get_setting(view, 'handle_keys')
-    if handle_keys:
-        try:
-            # Check if the key (no mode prefix; all modes) should be handled.
-            return bool(handle_keys[operand])
-        except KeyError:
-            # Check if the key should be handled only for a specific mode.
-            # The format is "{mode}_{key}" e.g. "n_<C-w>", "v_<C-w>"
-            # meaning NORMAL, VISUAL respectively. No prefix implies all
-            # modes. See mode_to_char() for a list of valid mode prefixes.
-            cur_mode_char = mode_to_char(get_mode(view))
-            if cur_mode_char:
-                try:
-                    return bool(handle_keys['%s_%s' % (cur_mode_char, operand)])
-                except KeyError:
-                    pass
+    mode = get_mode(view)
+    cache = get_setting_cache(view)
+    try:
+        unhandled_keys = cache[('nv_handle_key', mode)]
+    except KeyError:
+        handle_keys = get_setting(view, 'handle_keys')
+        if handle_keys:
+            unhandled_keys = _unhandled_keys(handle_keys, mode_to_char(mode))
+        else:
+            unhandled_keys = frozenset()
+
+        cache[('nv_handle_key', mode)] = unhandled_keys
 
     # By default all keys are handled.
-    return True
+    return operand not in unhandled_keys
 
 
 _OVERLAY_CONTROL_ELEMENTS = (
@@ -170,9 +204,13 @@ class NeoVintageousEvents(EventListener):
         #   bool: If the context is known.
         #   None: If the context is unknown.
         try:
-            return _query_contexts[key](view, operator, operand, match_all)
+            query_context = _query_contexts[key]
         except KeyError:
-            pass
+            return None
+
+        count_query_context(key)
+
+        return query_context(view, operator, operand, match_all)
 
     def on_text_command(self, view, command: str, args: dict):
         # Called when a text command is issued.
@@ -267,6 +305,20 @@ class NeoVintageousEvents(EventListener):
             session_on_exit()
 
 
+# The TextChangeListener api was added in build 4081.
+if int(version()) >= 4081:
+    from sublime_plugin import TextChangeListener
+
+    class NeoVintageousTextChangeEvents(TextChangeListener):
+
+        def on_text_changed(self, changes):
+            # Called once after changes have been made to the buffer.
+            for view in self.buffer.views():
+                update_line_index(view, changes)
+
+    __all__.append('NeoVintageousTextChangeEvents')
+
+
 def _clear_inactive_views_visual_selections(view) -> None:
     window = view.window()
     if window:
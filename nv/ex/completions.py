@@ -15,11 +15,13 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
-import glob
+from collections import OrderedDict
 import os
 import re
+import threading
 
 from sublime import Region
+from sublime import set_timeout_async
 
 from NeoVintageous.nv.ex_routes import ex_completions
 from NeoVintageous.nv.options import get_option_completions
@@ -45,7 +47,83 @@ _completion_settings = (
 )
 
 
-def _iter_paths(prefix=None, from_dir=None, only_dirs: bool = False):
+_DIR_CACHE_SIZE = 32
+
+# A LRU cache of directory -> (mtime, entries) where entries is a sorted list
+# of (name, is_dir) tuples. See _list_dir(). The cache is also populated in
+# the background, so access to it is guarded by a lock.
+_dir_cache = OrderedDict()  # type: OrderedDict
+_dir_cache_lock = threading.Lock()
+
+# The directory last scheduled to be listed in the background.
+_prefetched_dir = None
+
+
+def _list_dir(directory: str) -> list:
+    # Args:
+    #   :directory (str):
+    #
+    # Returns:
+    #   list: Sorted (name, is_dir) tuples of the directory entries, or an
+    #       empty list if the directory can't be read. The list is shared with
+    #       the cache and must not be modified.
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return []
+
+    with _dir_cache_lock:
+        cached = _dir_cache.get(directory)
+        if cached and cached[0] == mtime:
+            _dir_cache.move_to_end(directory)
+            return cached[1]
+
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                # DirEntry.is_dir() follows symlinks like os.path.isdir(), but
+                # can usually answer without another stat call.
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                entries.append((entry.name, is_dir))
+    except OSError:
+        return []
+
+    entries.sort()
+
+    with _dir_cache_lock:
+        _dir_cache[directory] = (mtime, entries)
+        _dir_cache.move_to_end(directory)
+        if len(_dir_cache) > _DIR_CACHE_SIZE:
+            _dir_cache.popitem(last=False)
+
+    return entries
+
+
+def _iter_dir_matches(start_at: str, only_dirs: bool):
+    # Yields the (name, is_dir) entries that glob.iglob(start_at + '*') would
+    # find, i.e. hidden entries are only included if the name being completed
+    # starts with a dot.
+    directory, name_prefix = os.path.split(start_at)
+    name_prefix = os.path.normcase(name_prefix)
+    include_hidden = name_prefix.startswith('.')
+
+    for name, is_dir in _list_dir(directory or os.curdir):
+        if only_dirs and not is_dir:
+            continue
+
+        if not include_hidden and name.startswith('.'):
+            continue
+
+        if os.path.normcase(name).startswith(name_prefix):
+            yield name, is_dir
+
+
+def _get_start_at(prefix, from_dir) -> str:
     if prefix:
         start_at = expand_path(prefix)
         # TODO: implement env var completion.
@@ -53,23 +131,38 @@ def _iter_paths(prefix=None, from_dir=None, only_dirs: bool = False):
             start_at = os.path.join(from_dir, prefix)
             start_at = expand_path(start_at)
 
+        return start_at
+
+    return expand_path(from_dir)
+
+
+def _iter_paths(prefix=None, from_dir=None, only_dirs: bool = False):
+    start_at = _get_start_at(prefix, from_dir)
+    if prefix:
         prefix_split = os.path.split(prefix)
         prefix_len = len(prefix_split[1])
 
         if ('/' in prefix and not prefix_split[0]):
             prefix_len = 0
 
-        for path in sorted(glob.iglob(start_at + '*')):
-            if not only_dirs or os.path.isdir(path):
-                suffix = ('/' if os.path.isdir(path) else '')
-                item = os.path.split(path)[1]
-                yield prefix + (item + suffix)[prefix_len:]
+        for name, is_dir in _iter_dir_matches(start_at, only_dirs):
+            suffix = ('/' if is_dir else '')
+            yield prefix + (name + suffix)[prefix_len:]
     else:
-        prefix = from_dir
-        start_at = expand_path(prefix)
-        for path in sorted(glob.iglob(start_at + '*')):
-            if not only_dirs or os.path.isdir(path):
-                yield path[len(start_at):] + ('' if not os.path.isdir(path) else '/')
+        for name, is_dir in _iter_dir_matches(start_at, only_dirs):
+            yield name + ('/' if is_dir else '')
+
+
+def _prefetch_paths(prefix: str) -> None:
+    # Lists the directory being completed in the background, so that the
+    # first completion doesn't have to wait for it.
+    global _prefetched_dir
+
+    from_dir = _FsCompletion.frozen_dir or (get_cmdline_cwd() + '/')
+    directory = os.path.split(_get_start_at(prefix, from_dir))[0] or os.curdir
+    if directory != _prefetched_dir:
+        _prefetched_dir = directory
+        set_timeout_async(lambda: _list_dir(directory))
 
 
 def _parse_cmdline_for_fs(text: str) -> tuple:
@@ -233,6 +326,7 @@ def on_change_cmdline_completion_prefix(window, cmdline: str) -> None:
     if cmd:
         _FsCompletion.prefix = prefix
         _FsCompletion.is_stale = True
+        _prefetch_paths(prefix)
 
         return
 
@@ -245,6 +339,8 @@ def on_change_cmdline_completion_prefix(window, cmdline: str) -> None:
 
 
 def reset_cmdline_completion_state() -> None:
+    global _prefetched_dir
+    _prefetched_dir = None
     _SettingCompletion.reset()
     _FsCompletion.reset()
 
@@ -30,6 +30,7 @@ from NeoVintageous.nv.ex.tokens import TokenSearchBackward
 from NeoVintageous.nv.ex.tokens import TokenSearchForward
 from NeoVintageous.nv.marks import get_mark
 from NeoVintageous.nv.polyfill import view_to_region
+from NeoVintageous.nv.search import process_search_pattern
 from NeoVintageous.nv.utils import row_at
 from NeoVintageous.nv.vi.search import reverse_search_by_pt
 
@@ -55,14 +56,16 @@ def _resolve_line_number(view, token, current: int) -> int:
         return current + sum(token.content)
 
     if isinstance(token, TokenSearchForward):
-        match = view.find(token.content, view.text_point(current, 0))
+        pattern, flags = process_search_pattern(view, token.content)
+        match = view.find(pattern, view.text_point(current, 0), flags)
         if not match:
             raise ValueError('E385: Search hit BOTTOM without match for: ' + token.content)
 
         return row_at(view, match.a)
 
     if isinstance(token, TokenSearchBackward):
-        match = reverse_search_by_pt(view, token.content, 0, view.text_point(current, 0))
+        pattern, flags = process_search_pattern(view, token.content)
+        match = reverse_search_by_pt(view, pattern, 0, view.text_point(current, 0), flags)
         if not match:
             raise ValueError('E384: Search hit TOP without match for: ' + token.content)
 
@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
+import copy
 import logging
 
 from NeoVintageous.nv.ex.nodes import RangeNode
@@ -35,6 +37,11 @@ from NeoVintageous.nv.ex.tokens import TokenSemicolon
 
 _log = logging.getLogger(__name__)
 
+_PARSE_CACHE_SIZE = 100
+
+# A LRU cache of source -> _ParsedCommandLine. See parse_command_line().
+_parse_cache = OrderedDict()  # type: OrderedDict
+
 
 class _ParsedCommandLine():
 
@@ -73,6 +80,30 @@ class _ParserState:
 
 
 def parse_command_line(source: str) -> _ParsedCommandLine:
+    # Parsed command lines are cached. Callers are free to modify the command
+    # params of the returned command line because each call returns a copy.
+    try:
+        command_line = _parse_cache[source]
+        _parse_cache.move_to_end(source)
+    except KeyError:
+        command_line = _parse_command_line(source)
+        _parse_cache[source] = command_line
+        if len(_parse_cache) > _PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+
+    return _copy_command_line(command_line)
+
+
+def _copy_command_line(command_line: _ParsedCommandLine) -> _ParsedCommandLine:
+    command = command_line.command
+    if command:
+        command = copy.copy(command)
+        command.params = dict(command.params)
+
+    return _ParsedCommandLine(command_line.line_range, command)
+
+
+def _parse_command_line(source: str) -> _ParsedCommandLine:
     # The parser works its way through the command line by passing the current
     # state to the next parsing function. It stops when no parsing funcion is
     # returned from the previous one.
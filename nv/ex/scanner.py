@@ -31,6 +31,11 @@ from NeoVintageous.nv.ex.tokens import TokenSemicolon
 from NeoVintageous.nv.ex_routes import ex_routes
 
 
+# Routes indexed by the first character of the command, so that scanning a
+# command only tries the routes that could match it. See _get_routes().
+_routes_by_first_char = {}  # type: dict
+
+
 class _ScannerState:
 
     EOF = '__EOF__'
@@ -311,13 +316,129 @@ def _scan_offset(state) -> tuple:
             return _scan_range, [TokenOffset(list(map(to_int, offsets)))]
 
 
+def _route_first_chars(pattern: str):
+    # Returns the characters a route pattern can start with, or None if they
+    # can't be determined, in which case the route is tried for any character.
+    # The analysis is conservative: anything it doesn't understand, such as an
+    # optional group or an escape, makes the route match any character.
+    #
+    # Args:
+    #   :pattern (str):
+    #
+    # Returns:
+    #   set|None
+    alternatives = _split_alternatives(pattern)
+    if alternatives is None:
+        return None
+
+    if len(alternatives) > 1:
+        first_chars = set()
+        for alternative in alternatives:
+            alternative_first_chars = _route_first_chars(alternative)
+            if alternative_first_chars is None:
+                return None
+
+            first_chars |= alternative_first_chars
+
+        return first_chars
+
+    if pattern.startswith('(?:'):
+        end = _find_group_end(pattern)
+        if end < 0 or pattern[end + 1:end + 2] in ('?', '*', '{'):
+            return None
+
+        return _route_first_chars(pattern[3:end])
+
+    if pattern[:1] and pattern[0] not in '\\.^$*+?{}[]()|' and pattern[1:2] not in ('?', '*', '{'):
+        return {pattern[0]}
+
+    return None
+
+
+def _iter_pattern_chars(pattern: str):
+    # Yields the index, character, and group depth of the characters of a
+    # pattern that are outside of escapes and character classes.
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            i += 2
+            continue
+
+        if c == '[':
+            # A "]" straight after "[" or "[^" is literal.
+            i += 2 if pattern[i + 1:i + 2] == '^' else 1
+            i += 1 if pattern[i:i + 1] == ']' else 0
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+
+            i += 1
+            continue
+
+        if c == ')':
+            depth -= 1
+
+        yield i, c, depth
+
+        if c == '(':
+            depth += 1
+
+        i += 1
+
+
+def _split_alternatives(pattern: str):
+    # Returns the top-level alternatives of a pattern, or None if its groups
+    # are unbalanced.
+    alternatives = []
+    begin = 0
+    for i, c, depth in _iter_pattern_chars(pattern):
+        if depth < 0:
+            return None
+
+        if c == '|' and depth == 0:
+            alternatives.append(pattern[begin:i])
+            begin = i + 1
+
+    alternatives.append(pattern[begin:])
+
+    return alternatives
+
+
+def _find_group_end(pattern: str) -> int:
+    # Returns the index of the ")" that closes the group the pattern starts
+    # with, or -1 if it isn't closed.
+    for i, c, depth in _iter_pattern_chars(pattern):
+        if c == ')' and depth == 0:
+            return i
+
+    return -1
+
+
+def _get_routes(first_char: str) -> list:
+    # Returns the routes, in order, that could match a command that starts with
+    # first_char.
+    try:
+        return _routes_by_first_char[first_char]
+    except KeyError:
+        routes = []
+        for route, command in ex_routes.items():
+            first_chars = _route_first_chars(route.pattern)
+            if first_chars is None or first_char in first_chars:
+                routes.append((route, command))
+
+        _routes_by_first_char[first_char] = routes
+
+        return routes
+
+
 def _scan_command(state) -> tuple:
     # Args:
     #   :state (_ScannerState):
     #
     # Returns:
     #   Tuple[None, list(TokenEof)]
-    for route, command in ex_routes.items():
+    for route, command in _get_routes(state.source[state.position:state.position + 1]):
         if state.match(route):
             state.ignore()
 
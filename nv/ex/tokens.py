@@ -52,14 +52,11 @@ class TokenCommand(Token):
         #                           command "name".
         #   :addressable (bool): Indicates if the command accepts ranges.
         #   :cooperates_with_global (bool): Indicates if the command cooperates
-        #       with the :global command. This is special flag, because ex
-        #       commands don't yet support a global_lines argument. It seems
-        #       that, in Vim, some ex commands work well with :global and others
-        #       ignore :global ranges. However, according to the docs, all ex
-        #       commands should work with :global ranges. At the time of
-        #       writing, the only command that supports the global_lines
-        #       argument is the "print" command e.g. print all lines matching
-        #       \d+ into new buffer: ":%global/\d+/print".
+        #       with the :global command, i.e. it accepts a global_lines
+        #       argument and runs on all the lines marked by :global at once,
+        #       e.g. delete all lines matching \d+ with a few coalesced edits:
+        #       ":%global/\d+/delete". Other commands are run by :global on
+        #       each marked line in turn.
         super().__init__(content=name)
 
         self.name = name
@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from bisect import bisect_right
 import inspect
 import logging
 import os
@@ -24,7 +25,10 @@ import traceback
 
 from sublime import DIALOG_CANCEL
 from sublime import DIALOG_YES
+from sublime import HIDDEN
+from sublime import IGNORECASE
 from sublime import Region
+from sublime import View
 from sublime import set_timeout
 from sublime import version
 from sublime import yes_no_cancel_dialog
@@ -46,6 +50,8 @@ from NeoVintageous.nv.marks import get_marks
 from NeoVintageous.nv.options import get_option
 from NeoVintageous.nv.options import set_option
 from NeoVintageous.nv.options import toggle_option
+from NeoVintageous.nv.output import OutputSink
+from NeoVintageous.nv.pattern import translate_pattern
 from NeoVintageous.nv.polyfill import has_dirty_buffers
 from NeoVintageous.nv.polyfill import has_newline_at_eof
 from NeoVintageous.nv.polyfill import is_file_read_only
@@ -55,14 +61,16 @@ from NeoVintageous.nv.polyfill import set_selection
 from NeoVintageous.nv.polyfill import spell_add
 from NeoVintageous.nv.polyfill import spell_undo
 from NeoVintageous.nv.polyfill import truncate
-from NeoVintageous.nv.polyfill import view_find_all_in_range
 from NeoVintageous.nv.polyfill import view_to_region
+from NeoVintageous.nv.profiler import clear_profile
+from NeoVintageous.nv.profiler import format_profile_stats
 from NeoVintageous.nv.registers import get_alternate_file_register
 from NeoVintageous.nv.registers import is_alternate_file_register
 from NeoVintageous.nv.registers import registers_get_all
 from NeoVintageous.nv.registers import registers_set
 from NeoVintageous.nv.search import clear_search_highlighting
-from NeoVintageous.nv.search import is_smartcase_pattern
+from NeoVintageous.nv.search import find_search_occurrences_in_range
+from NeoVintageous.nv.search import translate_search_pattern
 from NeoVintageous.nv.settings import get_cmdline_cwd
 from NeoVintageous.nv.settings import get_ex_global_last_pattern
 from NeoVintageous.nv.settings import get_ex_shell_last_command
@@ -83,6 +91,7 @@ from NeoVintageous.nv.utils import current_working_directory
 from NeoVintageous.nv.utils import expand_path
 from NeoVintageous.nv.utils import expand_to_realpath
 from NeoVintageous.nv.utils import get_line_count
+from NeoVintageous.nv.utils import get_previous_selection
 from NeoVintageous.nv.utils import glue_undo_groups
 from NeoVintageous.nv.utils import next_non_blank
 from NeoVintageous.nv.utils import regions_transformer
@@ -109,6 +118,16 @@ from NeoVintageous.nv.window import window_tab_control
 
 _log = logging.getLogger(__name__)
 
+# The maximum number of edits that :substitute applies individually.
+_SUBSTITUTE_MAX_EDITS = 100
+
+# Whether the view can transform regions from an earlier change (build 4069).
+_CAN_TRANSFORM_REGIONS = hasattr(View, 'transform_region_from')
+
+# Above this many runs of adjacent lines, :global deletes the lines by
+# replacing the text that spans them with the text that is kept.
+_MAX_GLOBAL_DELETE_ERASES = 1000
+
 
 def ex_ascii(view, **kwargs) -> None:
     show_ascii(view)
@@ -243,6 +262,10 @@ def ex_cquit(window, **kwargs) -> None:
 
 
 def ex_delete(view, edit, register: str, line_range: RangeNode, global_lines=None, **kwargs) -> None:
+    # If :global called us, ignore the parsed range.
+    if global_lines:
+        return _delete_global_lines(view, edit, register, global_lines)
+
     try:
         r = line_range.resolve(view)
     except ValueError as e:
@@ -252,48 +275,67 @@ def ex_delete(view, edit, register: str, line_range: RangeNode, global_lines=Non
     if r == Region(-1, -1):
         r = view.full_line(0)
 
-    rs = [r]
+    view.sel().clear()
+    view.sel().add(r)
 
-    # If :global called us, ignore the parsed range.
-    if global_lines:
-        rs = [Region(a, b) for (a, b) in global_lines]
+    # Save stuff to be deleted in register
+    if register:
+        text = view.substr(view.full_line(r))
+        if not text.endswith('\n'):
+            text = text + '\n'
+
+        registers_set(view, register, [text])
+
+    view.erase(edit, r)
 
-    def _select(view, regions: list, register: str) -> None:
-        view.sel().clear()
-        to_store = []
-        for r in regions:
-            view.sel().add(r)
-            if register:
-                to_store.append(view.substr(view.full_line(r)))
+    new_sel = view.sel()[-1].b
+
+    set_selection(view, new_sel)
+    enter_normal_mode(view)
 
-        if register:
-            text = ''.join(to_store)
-            if not text.endswith('\n'):
-                text = text + '\n'
 
-            registers_set(view, register, [text])
+def _delete_global_lines(view, edit, register: str, lines: list) -> None:
+    # Args:
+    #   lines (list[tuple[int, int]]): The sorted (begin, end) full lines to
+    #       delete. The text of the lines is read with one substr() and the
+    #       runs of adjacent lines are deleted with one erase each.
+    begin = lines[0][0]
+    end = lines[-1][1]
+    text = view.substr(Region(begin, end))
 
     # Save stuff to be deleted in register
-    if global_lines:
-        _select(view, [Region(r.a, r.b - 1) for r in rs], register)
-    else:
-        _select(view, [Region(r.a, r.b) for r in rs], register)
+    if register:
+        deleted = ''.join(text[a - begin:b - begin] for a, b in lines)
+        if not deleted.endswith('\n'):
+            deleted = deleted + '\n'
 
-    # Build regions to be selected after deletion
-    deleted_so_far = 0
-    new_sel_pos = []
-    for r in rs:
-        new_sel_pos.append(r.a - deleted_so_far)
-        size_of_region = r.b - r.a
-        deleted_so_far += size_of_region
+        registers_set(view, register, [deleted])
 
-    # Delete
-    for r in reversed(rs):
-        view.erase(edit, r)
+    runs = []  # type: list
+    for a, b in lines:
+        if runs and a <= runs[-1][1]:
+            runs[-1][1] = max(runs[-1][1], b)
+        else:
+            runs.append([a, b])
 
-    new_sel = view.sel()[-1].b
+    # The cursor is left on the first non-blank of the line after the last
+    # deleted line.
+    last = lines[-1][0]
+    new_sel = last - sum(min(b, last) - a for a, b in runs if a < last)
 
-    set_selection(view, new_sel)
+    if len(runs) > _MAX_GLOBAL_DELETE_ERASES:
+        kept = []
+        pos = begin
+        for a, b in runs:
+            kept.append(text[pos - begin:a - begin])
+            pos = b
+
+        view.replace(edit, Region(begin, end), ''.join(kept))
+    else:
+        for a, b in reversed(runs):
+            view.erase(edit, Region(a, b))
+
+    set_selection(view, min(next_non_blank(view, new_sel), view.size()))
     enter_normal_mode(view)
 
 
@@ -365,16 +407,18 @@ def ex_file(view, **kwargs) -> None:
     status_message('%s' % msg)
 
 
-def ex_global(window, view, pattern: str, line_range: RangeNode, cmd='print', **kwargs) -> None:
+def ex_global(window, view, edit, pattern: str, line_range: RangeNode, cmd='print', **kwargs) -> None:
     if not pattern:
         pattern = get_ex_global_last_pattern()
         if not pattern:
             return status_message('E35: No previous regular expression')
 
-    cmd = parse_command_line(cmd).command
-    # The cooperates_with_global flag indicates if a command supports :global.
-    if not cmd.cooperates_with_global:
-        return status_message('Command not supported: %s', cmd.target)
+    cmdline = parse_command_line(cmd)
+    if not cmdline.command:
+        return status_message('Command not supported: %s', cmd)
+
+    if cmdline.command.target == 'global':
+        return status_message('E147: Cannot do :global recursive')
 
     # The default line specifier for most commands is the cursor position, but
     # the commands :write and :global have the whole file (1,$) as default.
@@ -383,31 +427,143 @@ def ex_global(window, view, pattern: str, line_range: RangeNode, cmd='print', **
     else:
         region = line_range.resolve(view)
 
-    matches = view_find_all_in_range(view, pattern, region.a, region.b)
-    if not matches:
-        return status_message('Pattern not found: %s', pattern)
-
-    matches = [view.full_line(r.begin()) for r in matches]
-    matches = [[r.a, r.b] for r in matches]
-
     # Handle `:g!`/`:global!`
     # The `!` is translated into `kwargs['forceit'] == True` and means we should
     # pick all lines _not_ matching the pattern.
-    if kwargs.get('forceit', False):
-        inv_pos = region.a
-        new_matches = []
-        for a, b in matches:
-            new_matches.append([inv_pos, a])
-            inv_pos = b
-        new_matches.append([inv_pos, region.b])
-        matches = new_matches
-
-    cmd.params['global_lines'] = matches
-
-    do_ex_command(window, cmd.target, cmd.params)
+    invert = kwargs.get('forceit', False)
+
+    lines = _find_global_lines(view, pattern, region, invert)
+    if not lines:
+        if invert:
+            return status_message('Pattern found in every line: %s', pattern)
+
+        return status_message('Pattern not found: %s', pattern)
+
+    command = cmdline.command
+    params = command.params
+    if 'forceit' not in params:
+        params['forceit'] = command.forced
+
+    # The cooperates_with_global flag indicates if a command can run on all the
+    # lines at once. Any other command runs on each line in turn.
+    if command.cooperates_with_global and cmdline.line_range.is_empty and not params.get('count'):
+        params['global_lines'] = lines
+        _get_ex_cmd(command.target)(window=window, view=view, edit=edit, line_range=cmdline.line_range, **params)
+    else:
+        _run_global_command(window, view, edit, lines, cmdline)
+
     set_ex_global_last_pattern(pattern)
 
 
+def _find_global_lines(view, pattern: str, region: Region, invert: bool = False) -> list:
+    # Returns:
+    #   list[tuple[int, int]]: The (begin, end) full lines in the region that
+    #       match the pattern, or that don't match it if inverted. A line is
+    #       marked once, however many matches it has.
+    text = view.substr(region)
+
+    spans = []
+    a = 0
+    while True:
+        b = text.find('\n', a)
+        if b < 0:
+            if a < len(text) or not spans:
+                spans.append((a, len(text)))
+            break
+        spans.append((a, b + 1))
+        a = b + 1
+
+    translated = translate_search_pattern(view, pattern)
+    occurrences = find_search_occurrences_in_range(
+        view,
+        translated.pattern,
+        translated.flags,
+        region.begin(),
+        region.end()
+    )
+
+    if translated.in_visual:
+        visual_area = _get_visual_area(view)
+        occurrences = [match for match in occurrences if _in_visual_area(visual_area, match.begin())]
+
+    begin = region.begin()
+    starts = [a for a, b in spans]
+    marked = [invert] * len(spans)
+    for match in occurrences:
+        pt = match.begin() - begin
+        i = bisect_right(starts, pt) - 1
+        if i < 0:
+            continue
+
+        a, b = spans[i]
+        # A match at the end of the region only belongs to the last line if it
+        # doesn't end with a newline.
+        if pt < b or (pt == b and not text.endswith('\n', a, b)):
+            marked[i] = not invert
+
+    return [(begin + a, begin + b) for (a, b), mark in zip(spans, marked) if mark]
+
+
+def _run_global_command(window, view, edit, lines: list, cmdline) -> None:
+    # Vim's two-pass :global: the lines are marked first and then the command
+    # is run with the cursor on each marked line in turn. The commands run in
+    # the edit of :global, so they are undone in one go.
+    ex_cmd = _get_ex_cmd(cmdline.command.target)
+    anchors = _LineAnchors(view, lines)
+    try:
+        for i in range(len(lines)):
+            line = anchors.get(i)
+            if line is None:
+                continue
+
+            set_selection(view, line.begin())
+            ex_cmd(window=window, view=view, edit=edit, line_range=cmdline.line_range, **dict(cmdline.command.params))
+    finally:
+        anchors.clear()
+
+
+class _LineAnchors():
+
+    # The lines marked by :global. The lines follow the edits made by the
+    # commands run on them, and a line that is deleted loses its mark, as in
+    # Vim. In builds that can transform regions from an earlier change, the
+    # anchors are just the (begin, end) lines and the change they are from.
+    # Older builds track a region for each line instead.
+
+    def __init__(self, view, lines: list):
+        self._view = view
+        self._lines = lines
+        if _CAN_TRANSFORM_REGIONS:
+            self._change_id = view.change_id()
+        else:
+            for i, (a, b) in enumerate(lines):
+                view.add_regions('nv_global_%d' % i, [Region(a, b)], '', '', HIDDEN)
+
+    def get(self, i: int):
+        # Returns:
+        #   Region: The line as it is now.
+        #   None: If the line was deleted.
+        a, b = self._lines[i]
+        if _CAN_TRANSFORM_REGIONS:
+            line = self._view.transform_region_from(Region(a, b), self._change_id)
+        else:
+            regions = self._view.get_regions('nv_global_%d' % i)
+            if not regions:
+                return None
+
+            line = regions[0]
+
+        if line.empty() and b > a:
+            return None
+
+        return line
+
+    def clear(self) -> None:
+        if not _CAN_TRANSFORM_REGIONS:
+            for i in range(len(self._lines)):
+                self._view.erase_regions('nv_global_%d' % i)
+
+
 def ex_help(window, subject: str = None, forceit: bool = False, **kwargs) -> None:
     if not subject and forceit:
         status_message("E478: Don't panic!")
@@ -543,19 +699,11 @@ def ex_print(window, view, line_range: RangeNode, flags: list = None, global_lin
     if flags is None:
         flags = []
 
-    def _get_lines(view, parsed_range, global_lines):
-        # If :global called us, ignore the parsed range.
-        if global_lines:
-            return [(view.substr(Region(a, b)), row_at(view, a)) for (a, b) in global_lines]
-
-        to_display = []
-        for line in view.lines(parsed_range):
-            text = view.substr(line)
-            to_display.append((text, row_at(view, line.begin())))
-
-        return to_display
-
-    lines = _get_lines(view, line_range.resolve(view), global_lines)
+    # If :global called us, ignore the parsed range.
+    if global_lines:
+        spans = global_lines
+    else:
+        spans = [(line.a, line.b) for line in view.lines(line_range.resolve(view))]
 
     display = window.new_file()
     display.set_scratch(True)
@@ -564,18 +712,50 @@ def ex_print(window, view, line_range: RangeNode, flags: list = None, global_lin
     if 'l' in flags:
         display.settings().set('draw_white_space', 'all')
 
-    for i, (text, row) in enumerate(lines):
-        characters = ''
+    # The lines are read with one substr() and their rows are counted, rather
+    # than two API calls per line, because :global can print a lot of lines.
+    begin = min(min(a, b) for a, b in spans)
+    text = view.substr(Region(begin, max(max(a, b) for a, b in spans)))
+    pt = begin
+    row = row_at(view, begin)
+    last = len(spans) - 1
+
+    output = OutputSink(display)
+    for i, (a, b) in enumerate(spans):
+        if a >= pt:
+            row += text.count('\n', pt - begin, a - begin)
+        else:
+            row -= text.count('\n', a - begin, pt - begin)
+        pt = a
+
+        line = text[min(a, b) - begin:max(a, b) - begin]
         if '#' in flags:
-            characters = "{} {}".format(row + 1, text).lstrip()
+            characters = "{} {}".format(row + 1, line).lstrip()
         else:
-            characters = text.lstrip()
+            characters = line.lstrip()
 
         if not global_lines:
-            if i < len(lines) - 1:
+            if i < last:
                 characters += '\n'
 
-        display.run_command('append', {'characters': characters})
+        output.write(characters)
+
+    output.stream()
+
+
+def ex_profile(window, action: str = None, **kwargs) -> None:
+    if not action:
+        return ui_bell('E471: Argument required')
+
+    if action == 'dump':
+        output = CmdlineOutput(window)
+        output.disable_highlight_line()
+        output.write(format_profile_stats())
+        output.show()
+    elif action == 'clear':
+        clear_profile()
+    else:
+        ui_bell('E475: Invalid argument: %s', action)
 
 
 @current_working_directory
@@ -765,7 +945,9 @@ def ex_shell_out(view, edit, cmd: str, line_range: RangeNode, **kwargs) -> None:
         else:
             cmdline_output = CmdlineOutput(view.window())
             cmdline_output.write(shell.read(view, cmd))
-            if not get_setting(view, 'shell_silent'):
+            if get_setting(view, 'shell_silent'):
+                cmdline_output.flush()
+            else:
                 cmdline_output.show()
 
         # TODO: store only successful commands.
@@ -835,94 +1017,294 @@ def ex_substitute(view, edit, line_range: RangeNode,
     set_last_substitute_search_pattern(pattern)
     set_last_substitute_string(replacement)
 
-    computed_flags = 0
+    # The [i] and [I] flags override 'ignorecase' and 'smartcase'.
+    translated = translate_pattern(
+        pattern,
+        get_option(view, 'magic'),
+        (get_option(view, 'ignorecase') or 'i' in flags) and 'I' not in flags,
+        get_option(view, 'smartcase') and 'i' not in flags and 'I' not in flags
+    )
 
-    computed_flags |= re.MULTILINE
+    target_region = line_range.resolve(view)
+    if target_region.empty():
+        return status_message('E486: Pattern not found: {}'.format(pattern))
 
-    if (get_option(view, 'ignorecase') or 'i' in flags) and 'I' not in flags:
-        if not is_smartcase_pattern(view, pattern):
-            computed_flags |= re.IGNORECASE
+    # The text of the lines in the range is fetched once and all matches are
+    # collected in a single pass over it, rather than a substr() and re.sub()
+    # for each line. Note that the range region usually ends with the newline
+    # of its last line, which is not part of the substitution text.
+    last_line = view.line(target_region.end() - 1)
+    text_region = Region(view.line(target_region.begin()).begin(), last_line.end())
+    text = view.substr(text_region)
+
+    # \%^ and \%$ match at the start and end of the buffer, so they can only
+    # match if the text includes them. The end of the buffer is before its
+    # final newline, if any.
+    anchors = ''
+    if text_region.begin() > 0:
+        anchors += 'A'
+    if text_region.end() < view.size() - 1:
+        anchors += 'Z'
+
+    computed_flags = re.MULTILINE
+    if translated.flags & IGNORECASE:
+        computed_flags |= re.IGNORECASE
 
     try:
-        compiled_pattern = re.compile(pattern, flags=computed_flags)
+        compiled_pattern = re.compile(_disable_anchors(translated.regex, anchors), flags=computed_flags)
+        match_start_pattern = None
+        if translated.match_start_regex:
+            match_start_pattern = re.compile(
+                _disable_anchors(translated.match_start_regex, anchors),
+                flags=computed_flags
+            )
     except Exception as e:
         return status_message('[regex error]: {} ... in pattern {}'.format(str(e), pattern))
 
-    target_region = line_range.resolve(view)
-    if target_region.empty():
+    if translated.in_visual:
+        substitutions = _find_substitutions_in_visual_area(
+            compiled_pattern,
+            replacement,
+            text,
+            'g' in flags,
+            _get_visual_area(view),
+            text_region.begin(),
+            match_start_pattern
+        )
+    else:
+        substitutions = _find_substitutions(compiled_pattern, replacement, text, 'g' in flags, match_start_pattern)
+
+    if 'c' in flags:
+        return _substitute_confirming(view, edit, text_region.begin(), substitutions, replacement)
+
+    edits = [(begin, end, string) for begin, end, string in substitutions if text[begin:end] != string]
+    if not edits:
         return status_message('E486: Pattern not found: {}'.format(pattern))
 
-    replace_count = 0 if (flags and 'g' in flags) else 1
+    base = text_region.begin()
 
-    if 'c' in flags:
+    if len(edits) <= _SUBSTITUTE_MAX_EDITS:
+        # Applied back-to-front so that the edits don't shift each other.
+        for begin, end, string in reversed(edits):
+            view.replace(edit, Region(base + begin, base + end), string)
+    else:
+        # Too many edits to replace one by one; replace the span from the first
+        # to the last edit in one go instead.
+        chunks = []
+        prev_end = edits[0][0]
+        for begin, end, string in edits:
+            chunks.append(text[prev_end:begin])
+            chunks.append(string)
+            prev_end = end
+
+        view.replace(edit, Region(base + edits[0][0], base + prev_end), ''.join(chunks))
+
+    # The cursor is put on the first non-blank of the last line in the range.
+    last_line_begin = last_line.begin() - base
+    cursor = last_line.begin()
+    for begin, end, string in edits:
+        if begin >= last_line_begin:
+            break
+        cursor += len(string) - (end - begin)
+
+    set_selection(view, cursor)
+    if view.line(cursor).size() > 0:
+        set_selection(view, view.find('^\\s*', cursor).end())
 
-        def _replace_confirming(view, edit, pattern: str, compiled_pattern,
-                                replacement: str, replace_count: int, target_region: Region) -> None:
+    enter_normal_mode(view)
 
-            last_row = row_at(view, target_region.b - 1)
-            start = target_region.begin()
+    substitution_count = len(substitutions)
+    if substitution_count > get_option(view, 'report'):
+        line_count = _count_lines(text, substitutions)
+        status_message('%s substitution%s on %s line%s' % (
+            substitution_count,
+            's' if substitution_count > 1 else '',
+            line_count,
+            's' if line_count > 1 else ''
+        ))
 
-            while True:
-                if start >= view.size():
-                    break
 
-                match = view.find(pattern, start)
+def _find_substitutions(compiled_pattern, replacement: str, text: str, replace_all: bool,
+                        match_start_pattern=None) -> list:
+    # Args:
+    #   compiled_pattern: A compiled multiline regular expression.
+    #   replacement (str): A re.sub() replacement template.
+    #   text (str): The lines to search, separated by newlines.
+    #   replace_all (bool): Substitute all the matches in a line rather than
+    #       only the first.
+    #   match_start_pattern: The compiled match start regex of the pattern, if
+    #       any, see TranslatedPattern. Matches start where it ends.
+    #
+    # Returns:
+    #   list: A list of (begin, end, substitution) tuples, with offsets relative
+    #       to the text. Matches never span lines.
+    expand = '\\' in replacement
+    substitutions = []
+
+    # A single pass over the whole text is equivalent to searching each line
+    # separately unless a match can cross a newline. The \A and \Z anchors
+    # only match at the beginning and end of the whole text.
+    line_begin = 0
+    last_line_begin = -1
+    scanned = 0
+    for match in compiled_pattern.finditer(text):
+        begin, end = match.span()
+        if text.find('\n', begin, end) != -1:
+            break
+
+        newline = text.rfind('\n', scanned, begin)
+        if newline != -1:
+            line_begin = newline + 1
+        scanned = begin
+
+        if not replace_all:
+            if line_begin == last_line_begin:
+                continue
+
+            last_line_begin = line_begin
+
+        if match_start_pattern:
+            begin = _match_start(match_start_pattern, text, begin)
+
+        substitutions.append((begin, end, match.expand(replacement) if expand else replacement))
+    else:
+        return substitutions
 
-                # no match or match out of range -- stop
-                if (match == Region(-1)) or (row_at(view, match.a) > last_row):
-                    view.show(view.sel()[0].begin())
-                    return
+    substitutions = []
 
-                size_before = view.size()
+    # Each line is searched on its own, so the \A and \Z anchors are disabled
+    # in all but the first and last line respectively.
+    lines = text.split('\n')
+    line_patterns = {}  # type: dict
+    offset = 0
+    for i, line in enumerate(lines):
+        anchors = ('A' if i > 0 else '') + ('Z' if i < len(lines) - 1 else '')
+        try:
+            line_pattern, line_match_start_pattern = line_patterns[anchors]
+        except KeyError:
+            line_pattern, line_match_start_pattern = line_patterns[anchors] = (
+                _compile_without_anchors(compiled_pattern, anchors),
+                _compile_without_anchors(match_start_pattern, anchors)
+            )
 
-                with adding_regions(view, 's_confirm', [match], 'comment'):
-                    view.show(match.a, True)
-                    response = yes_no_cancel_dialog('Replace with "%s"?' % replacement)
-                    if response == DIALOG_CANCEL:
-                        break
+        for match in line_pattern.finditer(line):
+            begin, end = match.span()
+            if line_match_start_pattern:
+                begin = _match_start(line_match_start_pattern, line, begin)
 
-                    if response == DIALOG_YES:
-                        text = view.substr(match)
-                        substituted = re.sub(compiled_pattern, replacement, text, count=replace_count)
-                        view.replace(edit, match, substituted)
+            substitutions.append((offset + begin, offset + end, match.expand(replacement) if expand else replacement))
+            if not replace_all:
+                break
 
-                start = match.b + (view.size() - size_before) + 1
+        offset += len(line) + 1
 
-        return _replace_confirming(view, edit, pattern, compiled_pattern, replacement, replace_count, target_region)
+    return substitutions
 
-    lines = view.lines(target_region)
-    if not lines:
-        return status_message('E486: Pattern not found: {}'.format(pattern))
 
-    new_lines = []
-    dirty = False
-    for line in lines:
-        line_str = view.substr(line)
-        new_line_str = re.sub(compiled_pattern, replacement, line_str, count=replace_count)
-        new_lines.append(new_line_str)
-        if new_line_str != line_str:
-            dirty = True
+# The \A and \Z anchors of a regex, i.e. \%^ and \%$ in a Vim pattern.
+_ANCHOR_PATTERN = re.compile('(?<!\\\\)((?:\\\\\\\\)*)\\\\([AZ])')
 
-    new_region_text = '\n'.join(new_lines)
-    if view.size() > line.end():
-        new_region_text += '\n'
 
-    if not dirty:
-        return status_message('E486: Pattern not found: {}'.format(pattern))
+def _disable_anchors(regex: str, anchors: str) -> str:
+    # Args:
+    #   regex (str):
+    #   anchors (str): The anchors to replace with an empty lookahead, which
+    #       never matches: "A", "Z", or both.
+    if not anchors:
+        return regex
+
+    return _ANCHOR_PATTERN.sub(
+        lambda m: m.group(1) + ('(?!)' if m.group(2) in anchors else '\\' + m.group(2)),
+        regex
+    )
 
-    # Reposition cursor before replacing target region so that the cursor
-    # will auto adjust in sync with the replacement.
-    set_selection(view, line.begin())
 
-    view.replace(edit, target_region, new_region_text)
+def _compile_without_anchors(compiled_pattern, anchors: str):
+    if compiled_pattern is None:
+        return None
 
-    # TODO Refactor set position cursor after operation into reusable api.
-    # Put cursor on first non-whitespace char of current line.
-    line = view.line(view.sel()[0].b)
-    if line.size() > 0:
-        set_selection(view, view.find('^\\s*', line.begin()).end())
+    regex = _disable_anchors(compiled_pattern.pattern, anchors)
+    if regex == compiled_pattern.pattern:
+        return compiled_pattern
 
-    enter_normal_mode(view)
+    return re.compile(regex, flags=compiled_pattern.flags)
+
+
+def _match_start(match_start_pattern, text: str, begin: int) -> int:
+    # The regex of a pattern with \zs matches from the start of the pattern, so
+    # its match starts where the part of the pattern before \zs ends.
+    match = match_start_pattern.match(text, begin)
+
+    return match.end() if match else begin
+
+
+def _find_substitutions_in_visual_area(compiled_pattern, replacement: str, text: str, replace_all: bool,
+                                       visual_area: list, base: int, match_start_pattern=None) -> list:
+    # Like _find_substitutions(), for patterns with \%V: only the matches that
+    # start inside the visual area are substituted.
+    substitutions = []
+    last_line_begin = -1
+    for begin, end, string in _find_substitutions(compiled_pattern, replacement, text, True, match_start_pattern):
+        if not _in_visual_area(visual_area, base + begin):
+            continue
+
+        if not replace_all:
+            line_begin = text.rfind('\n', 0, begin) + 1
+            if line_begin == last_line_begin:
+                continue
+
+            last_line_begin = line_begin
+
+        substitutions.append((begin, end, string))
+
+    return substitutions
+
+
+def _get_visual_area(view) -> list:
+    # Returns:
+    #   list[tuple[int, int]]: The sorted (begin, end) regions of the last
+    #       visual area, one per line for a blockwise area.
+    # The selection is still visual if the command was run from visual mode.
+    regions = [region for region in view.sel() if not region.empty()]
+    if not regions:
+        regions = get_previous_selection(view)[0]
+
+    return sorted((region.begin(), region.end()) for region in regions)
+
+
+def _in_visual_area(visual_area: list, pt: int) -> bool:
+    i = bisect_right(visual_area, (pt, float('inf'))) - 1
+
+    return i >= 0 and pt < visual_area[i][1]
+
+
+def _count_lines(text: str, substitutions: list) -> int:
+    # Returns the number of distinct lines that the substitutions are on.
+    count = 0
+    prev_begin = -1
+    for begin, end, string in substitutions:
+        if prev_begin == -1 or text.find('\n', prev_begin, begin) != -1:
+            count += 1
+        prev_begin = begin
+
+    return count
+
+
+def _substitute_confirming(view, edit, base: int, substitutions: list, replacement: str) -> None:
+    for begin, end, string in substitutions:
+        match = Region(base + begin, base + end)
+
+        with adding_regions(view, 's_confirm', [match], 'comment'):
+            view.show(match.a, True)
+            response = yes_no_cancel_dialog('Replace with "%s"?' % replacement)
+            if response == DIALOG_CANCEL:
+                break
+
+            if response == DIALOG_YES:
+                view.replace(edit, match, string)
+                base += len(string) - (end - begin)
+    else:
+        view.show(view.sel()[0].begin())
 
 
 def ex_sunmap(lhs: str, **kwargs) -> None:
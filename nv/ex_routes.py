@@ -265,6 +265,14 @@ def _ex_route_global(state) -> TokenCommand:
     return command
 
 
+def _ex_route_vglobal(state) -> TokenCommand:
+    # Same as :global!
+    command = _ex_route_global(state)
+    command.forced = True
+
+    return command
+
+
 def _ex_route_help(state) -> TokenCommand:
     command = TokenCommand('help')
     match = state.expect_match(r'(?P<bang>!)?\s*(?P<subject>.+)?$').groupdict()
@@ -389,6 +397,12 @@ def _ex_route_print(state) -> TokenCommand:
     return command
 
 
+def _ex_route_profile(state) -> TokenCommand:
+    command = _create_route(state, 'profile')
+
+    return _resolve(state, command, r'\s*(?P<action>\w+)\s*$')
+
+
 def _ex_route_pwd(state) -> TokenCommand:
     return _create_route(state, 'pwd')
 
@@ -789,6 +803,7 @@ _add_ex_route(r'nun(?:map)?', _ex_route_nunmap, 'nunmap')
 _add_ex_route(r'ono(?:remap)?', _ex_route_onoremap, 'onoremap')
 _add_ex_route(r'on(?:ly)?', _ex_route_only, 'only')
 _add_ex_route(r'ou(?:nmap)?', _ex_route_ounmap, 'ounmap')
+_add_ex_route(r'prof(?:ile)?', _ex_route_profile, 'profile')
 _add_ex_route(r'pw(?:d)?', _ex_route_pwd, 'pwd')
 _add_ex_route(r'p(?:rint)?', _ex_route_print, 'print')
 _add_ex_route(r'qa(?:ll)?', _ex_route_qall, 'qall')
@@ -821,6 +836,7 @@ _add_ex_route(r'vne(?:w)?', _ex_route_vnew, 'vnew')
 _add_ex_route(r'vn(?:oremap)?', _ex_route_vnoremap, 'vnoremap')
 _add_ex_route(r'vs(?:plit)?', _ex_route_vsplit, 'vsplit')
 _add_ex_route(r'vu(?:nmap)?', _ex_route_vunmap, 'vunmap')
+_add_ex_route(r'v(?:global)?(?=[^a-zA-Z]|$)', _ex_route_vglobal, 'vglobal')
 _add_ex_route(r'w(?:rite)?(?=(?:!?(?:\+\+|>>| |$)))', _ex_route_write, 'write')
 _add_ex_route(r'wa(?:ll)?', _ex_route_wall, 'wall')
 _add_ex_route(r'wqa(?:ll)?', _ex_route_wqall, 'wqall')
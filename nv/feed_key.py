@@ -22,6 +22,9 @@ from NeoVintageous.nv.mappings import Mapping
 from NeoVintageous.nv.mappings import mappings_can_resolve
 from NeoVintageous.nv.mappings import mappings_resolve
 from NeoVintageous.nv.mappings_handler import evaluate_mapping
+from NeoVintageous.nv.profiler import COLLECT_INPUT
+from NeoVintageous.nv.profiler import RESOLVE
+from NeoVintageous.nv.profiler import profiling
 from NeoVintageous.nv.settings import append_sequence
 from NeoVintageous.nv.settings import get_action_count
 from NeoVintageous.nv.settings import get_capture_register
@@ -146,12 +149,13 @@ class FeedKeyHandler():
         action = get_action(self.view)
 
         if must_collect_input(self.view, motion, action):
-            if motion and motion.accept_input:
-                motion.accept(self.key)
-                set_motion(self.view, motion)  # Processed motion needs to reserialised and stored.
-            else:
-                action.accept(self.key)
-                set_action(self.view, action)  # Processed action needs to reserialised and stored.
+            with profiling(self.view, COLLECT_INPUT):
+                if motion and motion.accept_input:
+                    motion.accept(self.key)
+                    set_motion(self.view, motion)
+                else:
+                    action.accept(self.key)
+                    set_action(self.view, action)
 
             if self.do_eval and is_runnable(self.view):
                 evaluate_state(self.view)
@@ -185,13 +189,17 @@ class FeedKeyHandler():
         # If the user has defined a mapping that starts with a number i.e. count
         # then the count handler has to be skipped otherwise it won't resolve.
         # See https://github.com/NeoVintageous/NeoVintageous/issues/434.
-        if not mappings_can_resolve(self.view, self.key):
+        with profiling(self.view, RESOLVE):
+            can_resolve = mappings_can_resolve(self.view, self.key)
+
+        if not can_resolve:
             if self._handle_count():
                 return
 
         set_partial_sequence(self.view, get_partial_sequence(self.view) + self.key)
 
-        command = mappings_resolve(self.view, check_user_mappings=self.check_user_mappings)
+        with profiling(self.view, RESOLVE):
+            command = mappings_resolve(self.view, check_user_mappings=self.check_user_mappings)
 
         if isinstance(command, IncompleteMapping):
             return
@@ -15,12 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
+from itertools import islice
+
 from sublime import Region
 
+from NeoVintageous.nv.options import get_option
 from NeoVintageous.nv.session import set_session_value
 
-# TODO Implement 'history' option so that the number of history entries
-# remembered can be configured.
+# The upper limit of the 'history' option.
 _MAX_ITEMS = 10000
 
 
@@ -76,6 +79,59 @@ _storage = {
 }  # type: dict
 
 
+# A reverse index of item -> number per history type, so that duplicates can be
+# found without scanning the items. Each entry is a tuple of the items dict the
+# index was built from and the index, which means replacing the items dict, for
+# example when the session is loaded, invalidates the index.
+_index = {}  # type: dict
+
+
+def _get_items(history_type: int) -> OrderedDict:
+    # The items are ordered oldest to newest, which makes eviction and indexing
+    # from the end of the history constant time. Items that were not added via
+    # this module, for example loaded from a session file, are sorted once.
+    storage = _storage[history_type]
+    items = storage['items']
+    if not isinstance(items, OrderedDict):
+        items = storage['items'] = OrderedDict(sorted(items.items()))
+
+    return items
+
+
+def _get_index(history_type: int, items: OrderedDict) -> dict:
+    try:
+        indexed_items, index = _index[history_type]
+        if indexed_items is items and len(index) == len(items):
+            return index
+    except KeyError:
+        pass
+
+    index = {}
+    for num, item in list(items.items()):
+        # Only the newest of any duplicates is kept.
+        if item in index:
+            del items[index[item]]
+
+        index[item] = num
+
+    _index[history_type] = (items, index)
+
+    return index
+
+
+def _unindex(history_type: int, num: int, item: str) -> None:
+    try:
+        index = _index[history_type][1]
+        if index.get(item) == num:
+            del index[item]
+    except KeyError:
+        pass
+
+
+def _get_max_items() -> int:
+    return min(max(get_option(None, 'history'), 0), _MAX_ITEMS)
+
+
 def _char2type(char: str) -> int:
     try:
         return _CHAR2TYPE[char]
@@ -134,20 +190,29 @@ def history_add(history: str, item: str) -> int:
     #
     # Returns:
     #   int: 1 for a successful operation, otherwise 0
-    if _MAX_ITEMS == 0:
+    max_items = _get_max_items()
+    if max_items == 0:
         return 0
 
     history_type = history_get_type(history)
+    items = _get_items(history_type)
+    index = _get_index(history_type, items)
+
+    duplicate = index.pop(item, None)
+    if duplicate is not None:
+        items.pop(duplicate, None)
 
-    pending_deletes = [k for k, v in _storage[history_type]['items'].items() if v == item]
-    for pending_delete in pending_deletes:
-        del _storage[history_type]['items'][pending_delete]
+    storage = _storage[history_type]
+    if items:
+        # Guard against a corrupt number so the items stay in ascending order.
+        storage['num'] = max(storage['num'], next(reversed(items)))
 
-    _storage[history_type]['num'] += 1
-    _storage[history_type]['items'][_storage[history_type]['num']] = item
+    storage['num'] += 1
+    items[storage['num']] = item
+    index[item] = storage['num']
 
-    if len(_storage[history_type]['items']) > _MAX_ITEMS:
-        del _storage[history_type]['items'][min(_storage[history_type]['items'].keys())]
+    while len(items) > max_items:
+        _unindex(history_type, *items.popitem(last=False))
 
     # TODO Refactor history _storage to use session store directly i.e. remove the need for the _storage variable.
     set_session_value('history', _storage, persist=True)
@@ -159,6 +224,8 @@ def history_clear() -> None:
     for key in _storage:
         _storage[key] = {'num': 0, 'items': {}}
 
+    _index.clear()
+
 
 def history_del(history: str, item=None) -> int:
     # Delete an item from a history.
@@ -183,19 +250,20 @@ def history_del(history: str, item=None) -> int:
     if item is None:
         _storage[history_type]['num'] = 0
         _storage[history_type]['items'] = {}
+        _index.pop(history_type, None)
         ret = 1
     else:
         if isinstance(item, int):
+            items = _get_items(history_type)
             try:
                 if item >= 0:
-                    del _storage[history_type]['items'][item]
-                    ret = 1
+                    num = item
                 else:
-                    keys = sorted(_storage[history_type]['items'].keys())
-                    key_index = keys[item]
-                    del _storage[history_type]['items'][key_index]
-                    ret = 1
-            except (KeyError, IndexError):
+                    num = next(islice(reversed(items), -item - 1, None))
+
+                _unindex(history_type, num, items.pop(num))
+                ret = 1
+            except (KeyError, StopIteration):
                 ret = 0
         else:
             raise NotImplementedError('history_del(history, item) where item is regular expression')
@@ -226,9 +294,8 @@ def history_get(history: str, index: int = -1) -> str:
         if index >= 0:
             ret = _storage[history_type]['items'][index]
         else:
-            keys = sorted(_storage[history_type]['items'].keys())
-            key_index = keys[index]
-            ret = _storage[history_type]['items'][key_index]
+            items = _get_items(history_type)
+            ret = items[next(islice(reversed(items), -index - 1, None))]
 
     except Exception:
         ret = ''
@@ -253,9 +320,9 @@ def history_nr(history: str) -> int:
     if history_type == _HIST_INVALID:
         return -1
 
-    items = _storage[history_type]['items'].keys()
+    items = _get_items(history_type)
     if len(items) > 0:
-        num = max(items)
+        num = next(reversed(items))
     else:
         num = -1
 
@@ -269,7 +336,6 @@ def history(name: str) -> str:
     # Returns:
     #   str:
 
-    # TODO use 'history' option (default=50)
     # TODO if 'history' option is 0 then print message "'history' option is zero"
 
     if name == 'all':
@@ -293,12 +359,12 @@ def history(name: str) -> str:
 
     for history_type in history_types:
         name = type2name[history_type]
-        contents = _storage[history_type]['items']
+        contents = _get_items(history_type)
         count = len(contents)
 
         # TODO initial padding should be size of max history width
         buf.append('%6s  %s history' % ('#', name))
-        for i, number in enumerate(sorted(contents, reverse=False), start=1):
+        for i, number in enumerate(contents, start=1):
             if i == count:
                 buf.append('>%5d  %s' % (number, contents[number]))
             else:
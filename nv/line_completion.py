@@ -0,0 +1,233 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+# Whole line completion, see |i_CTRL-X_CTRL-L|.
+#
+# Each view has an index of its lines, stripped of leading whitespace, grouped
+# by their first character. The index is kept up to date from the text changes
+# of the view, see update_line_index(). When changes were missed (or text change
+# events aren't available), the index is refreshed on the next lookup: only the
+# lines between the unchanged lines at the start and end of the view are
+# re-indexed, but the whole view is read to find them.
+#
+# The index avoids searching the view, but a lookup is not constant-time: the
+# candidates are found by scanning the bucket of the first character of the
+# prefix, and they are ranked by walking the lines above the cursor until all
+# of them have been found, which can be every line of the view.
+
+from collections import Counter
+
+from NeoVintageous.nv.options import get_option
+from NeoVintageous.nv.polyfill import view_to_str
+from NeoVintageous.nv.session import get_line_index
+from NeoVintageous.nv.utils import get_line_count
+
+
+def _common_prefix_len(a: list, b: list) -> int:
+    # Slice comparisons run in C, so compare exponentially growing chunks and
+    # then narrow down the first difference with a binary search.
+    lo = 0
+    hi = min(len(a), len(b))
+    step = 1
+    while lo < hi:
+        mid = min(lo + step, hi)
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+            step *= 2
+        else:
+            hi = mid - 1
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if a[lo:mid] == b[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid - 1
+
+    return lo
+
+
+def _common_suffix_len(a: list, b: list, limit: int) -> int:
+    n = 0
+    while n < limit and a[-n - 1] == b[-n - 1]:
+        n += 1
+
+        # Switch to the chunked comparison for long runs of unchanged lines.
+        if n == 8:
+            return _common_prefix_len(a[::-1][:limit], b[::-1][:limit])
+
+    return n
+
+
+def _add_lines(buckets: dict, lines: list) -> None:
+    for line in lines:
+        text = line.lstrip()
+        if text:
+            try:
+                buckets[text[0]][text] += 1
+            except KeyError:
+                buckets[text[0]] = Counter({text: 1})
+
+
+def _remove_lines(buckets: dict, lines: list) -> None:
+    for line in lines:
+        text = line.lstrip()
+        if text:
+            bucket = buckets[text[0]]
+            bucket[text] -= 1
+            if bucket[text] <= 0:
+                del bucket[text]
+
+
+def _get_index(view) -> dict:
+    index = get_line_index(view)
+    change_count = view.change_count()
+    if index['change_count'] == change_count:
+        return index
+
+    old_lines = index['lines']
+    new_lines = view_to_str(view).split('\n')
+
+    prefix = _common_prefix_len(old_lines, new_lines)
+    suffix = _common_suffix_len(old_lines, new_lines, min(len(old_lines), len(new_lines)) - prefix)
+
+    _remove_lines(index['buckets'], old_lines[prefix:len(old_lines) - suffix])
+    _add_lines(index['buckets'], new_lines[prefix:len(new_lines) - suffix])
+
+    index['lines'] = new_lines
+    index['change_count'] = change_count
+
+    return index
+
+
+def update_line_index(view, changes: list) -> None:
+    # Apply text changes to the line index of a view.
+    #
+    # Only the lines touched by the changes are re-indexed. The index is
+    # discarded, to be rebuilt on the next lookup, if it doesn't match the view
+    # after the changes, e.g. because earlier changes were missed.
+    #
+    # Args:
+    #   :view (View):
+    #   :changes (list[TextChange]): The changes, in the order they were made.
+    index = get_line_index(view)
+    if index['change_count'] is None:
+        return
+
+    lines = index['lines']
+    buckets = index['buckets']
+    for change in changes:
+        a = change.a
+        b = change.b
+        if b.row >= len(lines):
+            break
+
+        old = lines[a.row:b.row + 1]
+        new = (old[0][:a.col] + change.str + old[-1][b.col:]).split('\n')
+        _remove_lines(buckets, old)
+        _add_lines(buckets, new)
+        lines[a.row:b.row + 1] = new
+    else:
+        if len(lines) == get_line_count(view):
+            index['change_count'] = view.change_count()
+            return
+
+    index['change_count'] = None
+    index['lines'] = []
+    index['buckets'] = {}
+
+
+def _get_candidates(index: dict, prefix: str) -> list:
+    if prefix:
+        bucket = index['buckets'].get(prefix[0], ())
+
+        return [text for text in bucket if text.startswith(prefix)]
+
+    return [text for bucket in index['buckets'].values() for text in bucket]
+
+
+def _rank_by_count(index: dict, prefix: str) -> list:
+    counts = Counter()  # type: Counter
+    for bucket in ([index['buckets'].get(prefix[0], {})] if prefix else index['buckets'].values()):
+        for text, count in bucket.items():
+            if text.startswith(prefix):
+                counts[text] = count
+
+    return sorted(counts, key=lambda text: (-counts[text], text))
+
+
+def _rank_by_distance(lines: list, row: int, candidates: set, limit: int) -> list:
+    # Rank the candidates like Vim does: by searching backwards from the
+    # current line, wrapping around at the start of the view. The search stops
+    # once all candidates (or the limit) have been found.
+    matches = []  # type: list
+    if not candidates:
+        return matches
+
+    for i in range(row - 1, row - len(lines), -1):
+        text = lines[i].lstrip()
+        if text in candidates:
+            candidates.discard(text)
+            matches.append(text)
+            if not candidates or len(matches) == limit:
+                break
+
+    return matches
+
+
+def get_line_completions(view, prefix: str, pt: int, limit: int = 20) -> list:
+    # Find the lines that start with prefix (ignoring leading whitespace).
+    #
+    # Lines in the view are ranked by their distance above pt, wrapping around
+    # at the start of the view. If the 'complete' option includes "w", lines in
+    # other views in the window follow, ranked by how often they occur.
+    #
+    # Args:
+    #   :view (View):
+    #   :prefix (str): The text to complete, without leading whitespace.
+    #   :pt (int): The completion point, the line of which is not a candidate.
+    #   :limit (int): The maximum number of matches to return.
+    #
+    # Returns:
+    #   list[str]: De-duplicated matches without leading whitespace.
+    index = _get_index(view)
+    lines = index['lines']
+    row = view.rowcol(pt)[0]
+
+    candidates = set(_get_candidates(index, prefix))
+
+    # The current line is only a candidate if it occurs elsewhere.
+    current = lines[row].lstrip() if row < len(lines) else ''
+    if current in candidates and index['buckets'][current[0]][current] < 2:
+        candidates.discard(current)
+
+    matches = _rank_by_distance(lines, row, candidates, limit)
+
+    if len(matches) < limit and 'w' in get_option(view, 'complete').split(','):
+        window = view.window()
+        seen = set(matches)
+        for other in (window.views() if window else ()):
+            if other.id() == view.id():
+                continue
+
+            for text in _rank_by_count(_get_index(other), prefix):
+                if text not in seen:
+                    seen.add(text)
+                    matches.append(text)
+                    if len(matches) == limit:
+                        return matches
+
+    return matches
@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from copy import deepcopy
 from string import ascii_letters
 from string import digits
 
@@ -24,9 +25,17 @@ from NeoVintageous.nv.session import get_session_value
 from NeoVintageous.nv.session import maybe_do_runtime_save_session
 from NeoVintageous.nv.session import set_session_value
 from NeoVintageous.nv.settings import get_glue_until_normal_mode
+from NeoVintageous.nv.settings import get_xpos
+from NeoVintageous.nv.ui import ui_bell_count
+from NeoVintageous.nv.utils import update_xpos
 
 _data = {}  # type: dict
 
+# Compiled macros by register name. Each entry is a tuple of the recorded
+# steps the plan was compiled from and the plan, which means recording the
+# register again (or loading a session) invalidates the plan.
+_compiled = {}  # type: dict
+
 
 def is_readable(name: str) -> bool:
     return name in tuple(digits + ascii_letters + '".=*+@')
@@ -82,6 +91,76 @@ def get_recorded(name: str):
     return _get_macros().get(name)
 
 
+def _compile(steps: list) -> list:
+    # Returns:
+    #   list[tuple[str, dict, dict|None]]: A list of (cmd, args, xpos_args)
+    #       where xpos_args is the args dict that takes the xpos, if any. The
+    #       args are copies, so playing a macro doesn't modify the recording.
+    plan = []
+    for cmd, args in steps:
+        args = deepcopy(args)
+        xpos_args = None
+        if 'xpos' in args:
+            xpos_args = args
+        else:
+            motion = args.get('motion')
+            if motion and 'motion_args' in motion and 'xpos' in motion['motion_args']:
+                xpos_args = motion['motion_args']
+
+        plan.append((cmd, args, xpos_args))
+
+    return plan
+
+
+def get_compiled(name: str):
+    steps = get_recorded(name)
+    if not steps:
+        return None
+
+    try:
+        compiled_steps, plan = _compiled[name]
+        if compiled_steps is steps:
+            return plan
+    except KeyError:
+        pass
+
+    plan = _compile(steps)
+    _compiled[name] = (steps, plan)
+
+    return plan
+
+
+def play(window, view, plan: list) -> bool:
+    # Run the steps of a compiled macro.
+    #
+    # Args:
+    #   :window (Window):
+    #   :view (View):
+    #   :plan (list): See get_compiled().
+    #
+    # Returns:
+    #   bool: False if a step failed (rang the bell), which stops the playback
+    #       like an error in Vim does, otherwise True.
+    xpos_is_current = False
+    for cmd, args, xpos_args in plan:
+        if xpos_args is not None:
+            # Consecutive motions like "jjk" keep the xpos of the first one,
+            # any other step may have moved the cursor horizontally.
+            if not xpos_is_current:
+                update_xpos(view)
+
+            xpos_args['xpos'] = get_xpos(view)
+
+        xpos_is_current = xpos_args is args
+
+        bell_count = ui_bell_count()
+        window.run_command(cmd, args)
+        if ui_bell_count() != bell_count:
+            return False
+
+    return True
+
+
 def get_last_used_register_name() -> str:
     return get_session_value('last_used_register_name')
 
@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from copy import deepcopy
 import logging
 import re
 import traceback
@@ -49,6 +50,13 @@ _mappings = {
     VISUAL: {}
 }  # type: dict
 
+# A per-mode prefix trie over the normalised lhs tokens of the user mappings.
+# Each node counts the mappings in its subtree by file type ('' for mappings
+# that apply to all file types), which answers partial match queries in
+# O(len(sequence)) instead of scanning every lhs. It is kept in sync with
+# _mappings by mappings_add(), mappings_remove(), and clear_mappings().
+_trie = {mode: {} for mode in _mappings}  # type: dict
+
 
 class Mapping:
 
@@ -61,31 +69,84 @@ class IncompleteMapping:
     pass
 
 
-def _has_partial_matches(view, mode: str, lhs: str) -> bool:
-    for map_lhs, map_rhs in _mappings[mode].items():
-        if isinstance(map_rhs, str):
-            if map_lhs.startswith(lhs):
-                return True
-        else:
-            file_type = get_file_type(view)
-            if file_type and file_type in map_rhs:
-                if map_lhs.startswith(lhs):
-                    return True
-            elif '' in map_rhs:
-                if map_lhs.startswith(lhs):
-                    return True
+def _tokenize(lhs: str) -> list:
+    try:
+        return list(tokenize_keys(lhs))
+    except ValueError:
+        return list(lhs)
+
+
+def _file_types_of(rhs) -> tuple:
+    if rhs is None:
+        return ()
+
+    if isinstance(rhs, str):
+        return ('',)
+
+    return tuple(rhs)
 
-    return False
 
+def _trie_update(mode: str, lhs: str, old_rhs, new_rhs) -> None:
+    old_file_types = _file_types_of(old_rhs)
+    new_file_types = _file_types_of(new_rhs)
+    if old_file_types == new_file_types:
+        return
 
-def _find_full_match(view, mode: str, lhs: str):
+    tokens = _tokenize(lhs)
+    path = [_trie[mode]]
+    for token in tokens:
+        path.append(path[-1].setdefault(token, {}))
+
+    for node in path:
+        counts = node.setdefault(None, {})
+        for file_type in old_file_types:
+            counts[file_type] -= 1
+            if not counts[file_type]:
+                del counts[file_type]
+
+        for file_type in new_file_types:
+            counts[file_type] = counts.get(file_type, 0) + 1
+
+    # Prune the nodes that no longer lead to any mapping.
+    for i in range(len(tokens), 0, -1):
+        if path[i][None] or len(path[i]) > 1:
+            break
+
+        del path[i - 1][tokens[i - 1]]
+
+
+def _has_partial_matches(view, mode: str, lhs: str, file_type: str = None) -> bool:
+    node = _trie[mode]
+    for token in _tokenize(lhs):
+        try:
+            node = node[token]
+        except KeyError:
+            return False
+
+    counts = node.get(None)
+    if not counts:
+        return False
+
+    if '' in counts:
+        return True
+
+    if file_type is None:
+        file_type = get_file_type(view)
+
+    return bool(file_type) and file_type in counts
+
+
+def _find_full_match(view, mode: str, lhs: str, file_type: str = None):
     rhs = _mappings[mode].get(lhs)
     if rhs:
         if isinstance(rhs, str):
             return rhs
 
+        if file_type is None:
+            file_type = get_file_type(view)
+
         try:
-            return _mappings[mode][lhs][get_file_type(view)]
+            return _mappings[mode][lhs][file_type]
         except KeyError:
             try:
                 return _mappings[mode][lhs]['']
@@ -102,6 +163,8 @@ def _normalise_lhs(lhs: str) -> str:
 
 
 def mappings_add(mode: str, lhs: str, rhs: str) -> None:
+    mode_mappings = _mappings[mode]
+
     if re.match('^FileType$', lhs):
         parsed = re.match('^([^ ]+) ([^ ]+)\\s+', rhs)
         if parsed:
@@ -111,45 +174,69 @@ def mappings_add(mode: str, lhs: str, rhs: str) -> None:
 
                 file_type_lhs_norm = _normalise_lhs(file_type_lhs)
 
-                match = _mappings[mode].get(file_type_lhs_norm)
+                match = mode_mappings.get(file_type_lhs_norm)
+                old_rhs = dict(match) if isinstance(match, dict) else match
 
                 if not match:
-                    _mappings[mode][file_type_lhs_norm] = {}
+                    mode_mappings[file_type_lhs_norm] = {}
                 elif isinstance(match, str):
-                    _mappings[mode][file_type_lhs_norm] = {'': match}
+                    mode_mappings[file_type_lhs_norm] = {'': match}
 
-                _mappings[mode][file_type_lhs_norm][file_type] = file_type_rhs
+                mode_mappings[file_type_lhs_norm][file_type] = file_type_rhs
+
+                _trie_update(mode, file_type_lhs_norm, old_rhs, mode_mappings[file_type_lhs_norm])
 
             return
 
-    _mappings[mode][_normalise_lhs(lhs)] = rhs
+    lhs = _normalise_lhs(lhs)
+    old_rhs = mode_mappings.get(lhs)
+    mode_mappings[lhs] = rhs
+    _trie_update(mode, lhs, old_rhs, rhs)
 
 
 def mappings_remove(mode: str, lhs: str) -> None:
-    del _mappings[mode][_normalise_lhs(lhs)]
+    lhs = _normalise_lhs(lhs)
+    old_rhs = _mappings[mode].pop(lhs)
+    _trie_update(mode, lhs, old_rhs, None)
 
 
 def clear_mappings() -> None:
     for mode in _mappings:
         _mappings[mode] = {}
+        _trie[mode] = {}
+
+
+def dump_mappings() -> dict:
+    return {mode: deepcopy(mode_mappings) for mode, mode_mappings in _mappings.items()}
+
+
+# Replace the mappings with mappings returned by dump_mappings(). The lhs of
+# the mappings are already normalised.
+def load_mappings(mappings: dict) -> None:
+    clear_mappings()
+    for mode, mode_mappings in mappings.items():
+        for lhs, rhs in mode_mappings.items():
+            _mappings[mode][lhs] = rhs
+            _trie_update(mode, lhs, None, rhs)
 
 
 def mappings_can_resolve(view, key: str) -> bool:
     mode = get_mode(view)
     sequence = get_partial_sequence(view) + key
+    file_type = get_file_type(view)
 
-    if _find_full_match(view, mode, sequence):
+    if _find_full_match(view, mode, sequence, file_type):
         return True
 
-    if _has_partial_matches(view, mode, sequence):
+    if _has_partial_matches(view, mode, sequence, file_type):
         return True
 
     return False
 
 
-def _seq_to_mapping(view, seq: str):
+def _seq_to_mapping(view, seq: str, file_type: str = None):
     mode = get_mode(view)
-    full_match = _find_full_match(view, mode, seq)
+    full_match = _find_full_match(view, mode, seq, file_type)
     if full_match:
         return Mapping(seq, full_match)
 
@@ -166,6 +253,7 @@ def _seq_to_command(view, seq: str, mode: str):
     #   ViCommandDefBase
     #   CommandNotFound
     if mode in plugin.mappings:
+        plugin.load_enabled_plugins(view)
         plugin_command = plugin.mappings[mode].get(seq)
         if plugin_command:
             if is_plugin_enabled(view, plugin_command):
@@ -221,11 +309,13 @@ def mappings_resolve(view, sequence: str = None, mode: str = None, check_user_ma
         # let the definition handle any special-cases itself instead of passing
         # off the responsibility to the feed key command.
 
-        command = _seq_to_mapping(view, seq)
+        file_type = get_file_type(view)
+
+        command = _seq_to_mapping(view, seq, file_type)
 
         if not command:
             if not sequence:
-                if _has_partial_matches(view, get_mode(view), seq):
+                if _has_partial_matches(view, get_mode(view), seq, file_type):
                     return IncompleteMapping()
 
     if not command:
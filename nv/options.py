@@ -49,6 +49,11 @@ class Option():
         try:
             value = _session[self._name]
         except KeyError:
+            # Options used outside of a view, like 'history', have no view
+            # settings to fall back on.
+            if view is None:
+                return self._default
+
             # DEPRECATED This is for backwards compatability only. All options
             # should be set by the .neovintageousrc configuration file.
             # See https://github.com/NeoVintageous/NeoVintageous/issues/404.
@@ -184,8 +189,10 @@ def _get_default_shell_flags() -> str:
 _options = {
     'autoindent': BooleanViewOption('auto_indent'),
     'belloff': StringOption('belloff', '', select=('', 'all')),
+    'complete': StringOption('complete', '.'),
     'equalalways': BooleanOption('equalalways', True),
     'expandtab': BooleanViewOption('translate_tabs_to_spaces', on=True, off=False),
+    'history': NumberOption('history', 10000),
     'hlsearch': BooleanOption('hlsearch', True),
     'ignorecase': BooleanOption('ignorecase', False),
     'incsearch': BooleanOption('incsearch', True),
@@ -197,6 +204,7 @@ _options = {
     'modelines': NumberOption('modelines', 5),
     'number': BooleanViewOption('line_numbers'),
     'relativenumber': BooleanViewOption('relative_line_numbers'),
+    'report': NumberOption('report', 2),
     'scrolloff': NumberViewOption('scroll_context_lines', 0),
     'shell': StringOption('shell', _get_default_shell()),
     'shellcmdflag': StringOption('shellcmdflag', _get_default_shell_flags()),
@@ -215,7 +223,9 @@ _options = {
 _OPTION_ALIASES = {
     'ai': 'autoindent',
     'bo': 'belloff',
+    'cpt': 'complete',
     'et': 'expandtab',
+    'hi': 'history',
     'hls': 'hlsearch',
     'ic': 'ignorecase',
     'is': 'incsearch',
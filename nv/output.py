@@ -0,0 +1,80 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+# Buffered output to views.
+#
+# Writing output with a command per line or per write is slow for large
+# outputs, so the output is buffered in memory and appended with one edit.
+# Very large outputs are streamed: the first chunk is appended immediately and
+# the rest in the background, with the progress in the status bar.
+
+from sublime import set_timeout
+
+_CHUNK_SIZE = 1000000
+
+
+def _append(view, text: str) -> None:
+    view.run_command('append', {'characters': text, 'force': True, 'scroll_to_end': False})
+
+
+class OutputSink():
+
+    def __init__(self, view):
+        self._view = view
+        self._buffer = []  # type: list
+
+    def write(self, text: str) -> None:
+        self._buffer.append(text)
+
+    def flush(self) -> None:
+        if self._buffer:
+            text = ''.join(self._buffer)
+            self._buffer = []
+            _append(self._view, text)
+
+    def stream(self) -> None:
+        text = ''.join(self._buffer)
+        self._buffer = []
+        if len(text) <= _CHUNK_SIZE:
+            if text:
+                _append(self._view, text)
+            return
+
+        view = self._view
+        size = len(text)
+
+        def _next_chunk(start: int) -> None:
+            if not view.is_valid():
+                return
+
+            # Chunks end at a line break, unless a line is longer than a chunk.
+            if size - start <= _CHUNK_SIZE:
+                end = size
+            else:
+                end = text.rfind('\n', start, start + _CHUNK_SIZE) + 1
+                if end <= start:
+                    end = start + _CHUNK_SIZE
+
+            _append(view, text[start:end])
+
+            if end < size:
+                view.set_status('vim-output', 'Writing output... {}%'.format(end * 100 // size))
+                set_timeout(lambda: _next_chunk(end), 0)
+            else:
+                view.erase_status('vim-output')
+
+        _next_chunk(0)
@@ -0,0 +1,706 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+# Translation of Vim search patterns to regular expressions.
+#
+# Vim patterns are translated to the subset of the regular expression syntax
+# that both Sublime Text and the Python re module understand, so the same
+# translation can be used to search views and to substitute text. See :help
+# pattern. Translations are memoised, because searches translate the pattern
+# on every keystroke when 'incsearch' is set.
+#
+# \zs is translated to \K in the pattern used to search views. Python's re
+# module has no \K, so in the regex used to substitute text, a \zs at the top
+# level of the pattern splits it in two, see TranslatedPattern. A \zs inside a
+# group or an alternative is translated to a lookbehind instead, which re only
+# supports for fixed-width text, e.g. not for \(^\s*\zsfoo\).
+#
+# \%^ and \%$ are translated to \A and \Z. Views are searched as a whole, but
+# text is substituted a range at a time, so the substitution disables them if
+# the range doesn't include the start or end of the buffer.
+#
+# Not supported: ~ (matches a literal ~), \z(, \%[0-9]l and friends, \%#, and
+# \%'m. \@> is translated to a non-atomic group. \%V is reported to the caller
+# rather than translated, see TranslatedPattern.
+
+from collections import OrderedDict
+from collections import namedtuple
+
+from sublime import IGNORECASE
+from sublime import LITERAL
+
+# Attributes:
+#   :pattern (str): The pattern to search views with, i.e. the literal text of
+#       the pattern if the flags include LITERAL, otherwise the regex.
+#   :flags (int): The LITERAL and IGNORECASE search flags.
+#   :regex (str): The pattern as a Python regular expression, even if it is
+#       literal.
+#   :in_visual (bool): True if the pattern contains \%V, which should only
+#       match inside the last visual area.
+#   :match_start_regex (str): If the pattern has a \zs at the top level, the
+#       regex matches from the start of the pattern, and the match starts
+#       where this regex, matched at the start of the regex match, ends.
+#       Otherwise None.
+TranslatedPattern = namedtuple('TranslatedPattern', 'pattern flags regex in_visual match_start_regex')
+
+_TRANSLATE_CACHE_SIZE = 100
+
+# A LRU cache of (pattern, magic, ignorecase, smartcase) -> TranslatedPattern.
+# See translate_pattern().
+_translate_cache = OrderedDict()  # type: OrderedDict
+
+# The characters that are special without a backslash, by magic level: \V very
+# nomagic, \M nomagic, \m magic, and \v very magic.
+_SPECIAL = {
+    'V': '',
+    'M': '^$',
+    'm': '^$.*[~',
+    'v': '^$.*[~()|+?={@<>%&',
+}
+
+# The characters that a backslash makes special if they are not special, and
+# literal if they are. See META_flags in Vim's regexp.c.
+_META = '%&()*+.123456789<=>?@ACDFHIKLMOPSUVWXZ[_acdfhiklmnopsuvwxz{|~'
+
+# Character classes: letter -> (class body, negated).
+_CLASSES = {
+    'a': ('A-Za-z', False),
+    'A': ('A-Za-z', True),
+    'd': ('0-9', False),
+    'D': ('0-9', True),
+    'f': ('\\w/.\\-+,#$%~=', False),
+    'F': ('A-Za-z_/.\\-+,#$%~=', False),
+    'h': ('A-Za-z_', False),
+    'H': ('A-Za-z_', True),
+    'i': ('\\w', False),
+    'I': ('\\W0-9', True),
+    'k': ('\\w', False),
+    'K': ('\\W0-9', True),
+    'l': ('a-z', False),
+    'L': ('a-z', True),
+    'o': ('0-7', False),
+    'O': ('0-7', True),
+    'p': ('\\x00-\\x09\\x0b-\\x1f\\x7f', True),
+    'P': ('\\x00-\\x09\\x0b-\\x1f\\x7f0-9', True),
+    's': (' \\t', False),
+    'S': (' \\t', True),
+    'u': ('A-Z', False),
+    'U': ('A-Z', True),
+    'w': ('0-9A-Za-z_', False),
+    'W': ('0-9A-Za-z_', True),
+    'x': ('0-9A-Fa-f', False),
+    'X': ('0-9A-Fa-f', True),
+}
+
+# Character class expressions in collections, e.g. [[:alpha:]].
+_POSIX_CLASSES = {
+    'alnum': '0-9A-Za-z',
+    'alpha': 'A-Za-z',
+    'backspace': '\\x08',
+    'blank': ' \\t',
+    'cntrl': '\\x00-\\x1f\\x7f',
+    'digit': '0-9',
+    'escape': '\\x1b',
+    'fname': '\\w/.\\-+,#$%~=',
+    'graph': '!-~',
+    'ident': '\\w',
+    'keyword': '\\w',
+    'lower': 'a-z',
+    'print': ' -~',
+    'punct': '!-/:-@\\[-`{-~',
+    'return': '\\r',
+    'space': ' \\t\\n\\r\\f\\v',
+    'tab': '\\t',
+    'upper': 'A-Z',
+    'xdigit': '0-9A-Fa-f',
+}
+
+_ESCAPED_CHARS = {'e': '\x1b', 't': '\t', 'r': '\r', 'b': '\x08', 'n': '\n'}
+
+# The maximum number of digits of the \%d, \%o, \%x, \%u, and \%U items.
+_CODE_DIGITS = {'d': (10, 10), 'o': (8, 4), 'x': (16, 2), 'u': (16, 4), 'U': (16, 8)}
+
+
+def _escape(char: str) -> str:
+    if char in '.^$*+?{}[]\\|()':
+        return '\\' + char
+
+    if char == '\n':
+        return '\\n'
+
+    return char
+
+
+def _escape_in_class(char: str) -> str:
+    if char in '\\]^-[&~|':
+        return '\\' + char
+
+    if char == '\n':
+        return '\\n'
+
+    return char
+
+
+def _has_uppercase(pattern: str) -> bool:
+    # The characters after a backslash don't count, e.g. \S and \%V.
+    i = 0
+    n = len(pattern)
+    while i < n:
+        if pattern[i] == '\\':
+            if pattern[i + 1:i + 2] in ('_', '%') and i + 2 < n:
+                i += 3
+            else:
+                i += 2
+        elif pattern[i].isupper():
+            return True
+        else:
+            i += 1
+
+    return False
+
+
+class _Translator():
+
+    def __init__(self, pattern: str, magic: str, for_view: bool = True):
+        self.pattern = pattern
+        self.pos = 0
+        self.magic = magic
+        self.for_view = for_view
+        self.case = None
+        self.in_visual = False
+        self.is_literal = True
+        self.literal = []  # type: list
+        self.has_match_start = False
+        self.match_start_split = None  # type: tuple
+
+    def peek(self) -> tuple:
+        # Returns:
+        #   tuple: A (special, char, length) tuple of the item at the position,
+        #       or (False, '', 0) at the end of the pattern.
+        pattern = self.pattern
+        pos = self.pos
+        if pos >= len(pattern):
+            return (False, '', 0)
+
+        char = pattern[pos]
+        if char != '\\':
+            return (char in _SPECIAL[self.magic], char, 1)
+
+        if pos + 1 >= len(pattern):
+            return (False, '\\', 1)
+
+        char = pattern[pos + 1]
+        if char in _META:
+            return (char not in _SPECIAL[self.magic], char, 2)
+
+        if char in _ESCAPED_CHARS or char in 'cCmMvV':
+            return (True, char, 2)
+
+        if char in '^$' and self.magic == 'V':
+            return (True, char, 2)
+
+        return (False, char, 2)
+
+    def skip_modes(self) -> tuple:
+        # Consumes the mode items (\c, \C, \m, \M, \v, and \V), which can be
+        # anywhere in the pattern, and peeks at the item after them.
+        while True:
+            special, char, length = self.peek()
+            if not (special and length == 2 and char in 'cCmMvV'):
+                return (special, char, length)
+
+            self.pos += 2
+            if char in 'mMvV':
+                self.magic = char
+            elif self.case != 'c':
+                # \c wins over \C.
+                self.case = char
+
+    def next(self) -> tuple:
+        special, char, length = self.skip_modes()
+        self.pos += length
+
+        return (special, char)
+
+    def at(self, *items) -> bool:
+        # True if the next item is one of the special characters.
+        special, char, length = self.skip_modes()
+
+        return special and char in items
+
+    def raw(self, length: int = 1) -> str:
+        # Consumes raw pattern characters, for example the "s" of \zs.
+        text = self.pattern[self.pos:self.pos + length]
+        self.pos += len(text)
+
+        return text
+
+    def raw_startswith(self, text: str) -> bool:
+        return self.pattern.startswith(text, self.pos)
+
+    def not_literal(self, regex: str) -> str:
+        self.is_literal = False
+
+        return regex
+
+    def literal_char(self, char: str) -> str:
+        self.literal.append(char)
+
+        return _escape(char)
+
+    def translate(self) -> str:
+        return self.alternation(0)
+
+    def alternation(self, depth: int) -> str:
+        branches = [self.branch(depth)]
+        while self.at('|'):
+            self.next()
+            self.is_literal = False
+            branches.append(self.branch(depth))
+
+        return '|'.join(branches)
+
+    def branch(self, depth: int) -> str:
+        # Vim's \& matches the last concat only if the others match too at the
+        # same position.
+        concats = [self.concat(depth)]
+        while self.at('&'):
+            self.next()
+            self.is_literal = False
+            concats.append(self.concat(depth))
+
+        return ''.join('(?=' + concat + ')' for concat in concats[:-1]) + concats[-1]
+
+    def concat(self, depth: int) -> str:
+        pieces = []  # type: list
+        match_start = None
+        match_end = None
+        while True:
+            special, char, length = self.skip_modes()
+            if not length or (special and (char in '|&' or (char == ')' and depth))):
+                break
+
+            if special and char == 'z' and length == 2 and self.pattern[self.pos + 2:self.pos + 3] in ('s', 'e'):
+                self.next()
+                if self.raw() == 's':
+                    match_start = len(pieces)
+                else:
+                    match_end = len(pieces)
+                self.is_literal = False
+                continue
+
+            pieces.append(self.piece(depth, not pieces))
+
+        # \ze sets the end of the match; the rest of the pattern is a
+        # lookahead. \zs sets the start of the match, see the module docs.
+        if match_end is not None:
+            pieces[match_end:] = ['(?=' + ''.join(pieces[match_end:]) + ')']
+        if match_start is not None:
+            self.has_match_start = True
+            if self.for_view:
+                pieces.insert(match_start, '\\K')
+            else:
+                self.match_start_split = (''.join(pieces[:match_start]), ''.join(pieces[match_start:]))
+                pieces[:match_start] = ['(?<=' + self.match_start_split[0] + ')']
+
+        return ''.join(pieces)
+
+    def piece(self, depth: int, at_start: bool) -> str:
+        special, char, length = self.peek()
+        atom = self.atom(depth, at_start)
+        if atom is None:
+            # A multi without an atom is literal, e.g. the * of /*foo.
+            self.next()
+            return self.literal_char(char)
+
+        if atom == '^':
+            # A * after a start-of-line is literal too.
+            if self.at('*'):
+                self.next()
+                return atom + self.literal_char('*')
+
+        while True:
+            special, char, length = self.skip_modes()
+            if not special or char not in '*+=?{@':
+                return atom
+
+            self.next()
+            self.is_literal = False
+            if char == '*':
+                atom += '*'
+            elif char in '+=?':
+                atom += '+' if char == '+' else '?'
+            elif char == '{':
+                atom += self.brace_multi()
+            else:
+                atom = self.lookaround(atom)
+
+    def brace_multi(self) -> str:
+        end = self.pattern.find('}', self.pos)
+        if end < 0:
+            return self.not_literal('\\{')
+
+        text = self.raw(end + 1 - self.pos)[:-1]
+        if text.endswith('\\'):
+            text = text[:-1]
+
+        lazy = text.startswith('-')
+        if lazy:
+            text = text[1:]
+
+        if not text:
+            quantifier = '*'
+        elif ',' in text:
+            low, high = text.split(',', 1)
+            if not (low.isdigit() or not low) or not (high.isdigit() or not high):
+                return '\\{' + text + '}'
+
+            quantifier = '{%s,%s}' % (low or '0', high)
+        elif text.isdigit():
+            quantifier = '{%s}' % text
+        else:
+            return '\\{' + text + '}'
+
+        return quantifier + '?' if lazy else quantifier
+
+    def lookaround(self, atom: str) -> str:
+        while self.pos < len(self.pattern) and self.pattern[self.pos].isdigit():
+            self.raw()
+
+        if self.raw_startswith('<='):
+            self.raw(2)
+            return '(?<=' + atom + ')'
+
+        if self.raw_startswith('<!'):
+            self.raw(2)
+            return '(?<!' + atom + ')'
+
+        char = self.raw()
+        if char == '=':
+            return '(?=' + atom + ')'
+
+        if char == '!':
+            return '(?!' + atom + ')'
+
+        # \@> is an atomic group in Vim, but the Python re module used by
+        # :substitute doesn't support those before Python 3.11.
+        return '(?:' + atom + ')'
+
+    def atom(self, depth: int, at_start: bool):
+        # Returns:
+        #   str: The regex of the atom, or None if the next item is a multi.
+        special, char, length = self.skip_modes()
+        if special and char in '*+=?{@':
+            return None
+
+        self.next()
+
+        if not special:
+            return self.literal_char(char)
+
+        if char == '^':
+            if at_start or self.magic == 'v':
+                return self.not_literal('^')
+
+            return self.literal_char('^')
+
+        if char == '$':
+            if self.magic == 'v' or self.at_end_of_branch():
+                return self.not_literal('$')
+
+            return self.literal_char('$')
+
+        if char == '.':
+            return self.not_literal('.')
+
+        if char == '[':
+            collection = self.collection(False)
+            if collection is None:
+                return self.literal_char('[')
+
+            return self.not_literal(collection)
+
+        if char == '~':
+            return self.literal_char('~')
+
+        if char == '(':
+            return self.group('(')
+
+        if char == '%':
+            return self.percent()
+
+        if char == '<':
+            return self.not_literal('\\b(?=\\w)')
+
+        if char == '>':
+            return self.not_literal('\\b(?<=\\w)')
+
+        if char in '123456789':
+            return self.not_literal('\\' + char)
+
+        if char == '_':
+            return self.underscore()
+
+        if char in _CLASSES:
+            return self.not_literal(self.character_class(char, False))
+
+        if char in _ESCAPED_CHARS:
+            if char == 'n':
+                return self.not_literal('\\n')
+
+            return self.literal_char(_ESCAPED_CHARS[char])
+
+        if char == 'Z':
+            return self.not_literal('')
+
+        if char == ')':
+            # An unmatched \) at the top level.
+            return self.not_literal(')')
+
+        return self.not_literal('\\' + char)
+
+    def at_end_of_branch(self) -> bool:
+        special, char, length = self.skip_modes()
+
+        return not length or (special and char in '|&)n')
+
+    def group(self, opening: str) -> str:
+        self.is_literal = False
+        regex = opening + self.alternation(1)
+        if self.at(')'):
+            self.next()
+            regex += ')'
+
+        return regex
+
+    def percent(self) -> str:
+        char = self.raw()
+        if char in _CODE_DIGITS:
+            code = self.char_code(char)
+            if code is not None:
+                return self.literal_char(chr(code))
+
+        self.is_literal = False
+        if char == '(':
+            return self.group('(?:')
+
+        if char == 'V':
+            self.in_visual = True
+            return ''
+
+        if char == '^':
+            return '\\A'
+
+        if char == '$':
+            return '\\Z'
+
+        if char == '[':
+            return self.optional_sequence()
+
+        # Unsupported items are kept so that the regex fails to compile.
+        return '\\%' + char
+
+    def char_code(self, kind: str):
+        base, max_digits = _CODE_DIGITS[kind]
+        digits = ''
+        while len(digits) < max_digits and self.pos < len(self.pattern):
+            char = self.pattern[self.pos]
+            try:
+                int(char, base)
+            except ValueError:
+                break
+
+            digits += self.raw()
+
+        if not digits:
+            return None
+
+        code = int(digits, base)
+        if code > 0x10ffff:
+            return None
+
+        return code
+
+    def optional_sequence(self) -> str:
+        # \%[abc] matches as much of "abc" as possible.
+        atoms = []
+        while self.pos < len(self.pattern) and not self.raw_startswith(']'):
+            atom = self.atom(1, False)
+            atoms.append(atom if atom is not None else self.literal_char(self.next()[1]))
+
+        self.raw()
+        self.is_literal = False
+
+        regex = ''
+        for atom in reversed(atoms):
+            regex = '(?:' + atom + regex + ')?'
+
+        return regex
+
+    def underscore(self) -> str:
+        self.is_literal = False
+        char = self.raw()
+        if char == '^':
+            return '^'
+
+        if char == '$':
+            return '$'
+
+        if char == '.':
+            return '[\\s\\S]'
+
+        if char == '[':
+            collection = self.collection(True)
+            if collection is not None:
+                return collection
+
+            return '\\_\\['
+
+        if char in _CLASSES:
+            return self.character_class(char, True)
+
+        return '\\_' + char
+
+    def character_class(self, char: str, with_newline: bool) -> str:
+        body, negated = _CLASSES[char]
+        if negated:
+            return '[^' + body + ('' if with_newline else '\\n') + ']'
+
+        return '[' + body + ('\\n' if with_newline else '') + ']'
+
+    def collection(self, with_newline: bool):
+        # Returns:
+        #   str: The regex of the collection at the position (after the "["),
+        #       or None if there is no terminating "]", in which case the "["
+        #       is literal.
+        pattern = self.pattern
+        n = len(pattern)
+        i = self.pos
+        negated = pattern.startswith('^', i)
+        if negated:
+            i += 1
+
+        items = []
+        if pattern.startswith(']', i) or pattern.startswith('-', i):
+            items.append(_escape_in_class(pattern[i]))
+            i += 1
+
+        while i < n and pattern[i] != ']':
+            if pattern.startswith('[:', i):
+                end = pattern.find(':]', i + 2)
+                if end > 0 and pattern[i + 2:end] in _POSIX_CLASSES:
+                    items.append(_POSIX_CLASSES[pattern[i + 2:end]])
+                    i = end + 2
+                    continue
+
+            char, i = self.collection_char(i)
+            if pattern.startswith('-', i) and i + 1 < n and pattern[i + 1] != ']':
+                end_char, i = self.collection_char(i + 1)
+                items.append(_escape_in_class(char) + '-' + _escape_in_class(end_char))
+            else:
+                items.append(_escape_in_class(char))
+
+        if i >= n:
+            return None
+
+        self.pos = i + 1
+        body = ''.join(items)
+        if negated:
+            return '[^' + body + ('' if with_newline else '\\n') + ']'
+
+        return '[' + body + ('\\n' if with_newline else '') + ']'
+
+    def collection_char(self, i: int) -> tuple:
+        # Returns:
+        #   tuple: The (char, position after it) of the collection item at the
+        #       position. A backslash is only special before some characters.
+        pattern = self.pattern
+        char = pattern[i]
+        if char != '\\' or i + 1 >= len(pattern):
+            return (char, i + 1)
+
+        escaped = pattern[i + 1]
+        if escaped in _ESCAPED_CHARS:
+            return (_ESCAPED_CHARS[escaped], i + 2)
+
+        if escaped in '\\]^-':
+            return (escaped, i + 2)
+
+        if escaped in _CODE_DIGITS:
+            pos = self.pos
+            self.pos = i + 2
+            code = self.char_code(escaped)
+            end = self.pos
+            self.pos = pos
+            if code is not None:
+                return (chr(code), end)
+
+        return ('\\', i + 1)
+
+
+def _translate(pattern: str, magic: bool, ignorecase: bool, smartcase: bool) -> TranslatedPattern:
+    translator = _Translator(pattern, 'm' if magic else 'M')
+    regex = translator.translate()
+
+    if translator.case == 'c':
+        ignorecase = True
+    elif translator.case == 'C':
+        ignorecase = False
+    elif smartcase and _has_uppercase(pattern):
+        ignorecase = False
+
+    flags = IGNORECASE if ignorecase else 0
+
+    if translator.is_literal and regex:
+        return TranslatedPattern(''.join(translator.literal), flags | LITERAL, regex, False, None)
+
+    if not translator.has_match_start:
+        return TranslatedPattern(regex, flags, regex, translator.in_visual, None)
+
+    # The regex used to substitute text differs from the view pattern by \zs.
+    regex_translator = _Translator(pattern, 'm' if magic else 'M', for_view=False)
+    python_regex = regex_translator.translate()
+    match_start_regex = None
+    split = regex_translator.match_start_split
+    if split and python_regex == '(?<=' + split[0] + ')' + split[1]:
+        python_regex = split[0] + split[1]
+        match_start_regex = split[0] + '(?=' + split[1] + ')'
+
+    return TranslatedPattern(regex, flags, python_regex, translator.in_visual, match_start_regex)
+
+
+def translate_pattern(pattern: str, magic: bool = True, ignorecase: bool = False,
+                      smartcase: bool = False) -> TranslatedPattern:
+    # Args:
+    #   :pattern (str): A Vim search pattern.
+    #   :magic (bool): The 'magic' option.
+    #   :ignorecase (bool): The 'ignorecase' option.
+    #   :smartcase (bool): The 'smartcase' option.
+    #
+    # Returns:
+    #   TranslatedPattern: The returned value is shared and must not be
+    #       modified.
+    key = (pattern, magic, ignorecase, smartcase)
+    try:
+        translated = _translate_cache[key]
+        _translate_cache.move_to_end(key)
+    except KeyError:
+        translated = _translate_cache[key] = _translate(pattern, magic, ignorecase, smartcase)
+        if len(_translate_cache) > _TRANSLATE_CACHE_SIZE:
+            _translate_cache.popitem(last=False)
+
+    return translated
@@ -15,6 +15,13 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from importlib import import_module
+
+from sublime import View as _View
+
+from NeoVintageous.nv.session import get_setting_cache as _get_setting_cache
+from NeoVintageous.nv.settings import get_setting as _get_setting
+from NeoVintageous.nv.vi.keys import DeferredDefs as _DeferredDefs
 from NeoVintageous.nv.vim import INSERT as _INSERT
 from NeoVintageous.nv.vim import NORMAL as _NORMAL
 from NeoVintageous.nv.vim import OPERATOR_PENDING as _OPERATOR_PENDING
@@ -25,19 +32,53 @@ from NeoVintageous.nv.vim import VISUAL_LINE as _VISUAL_LINE
 
 
 mappings = {
-    _INSERT: {},
-    _NORMAL: {},
-    _OPERATOR_PENDING: {},
-    _SELECT: {},
-    _VISUAL: {},
-    _VISUAL_BLOCK: {},
-    _VISUAL_LINE: {}
+    _INSERT: _DeferredDefs(),
+    _NORMAL: _DeferredDefs(),
+    _OPERATOR_PENDING: _DeferredDefs(),
+    _SELECT: _DeferredDefs(),
+    _VISUAL: _DeferredDefs(),
+    _VISUAL_BLOCK: _DeferredDefs(),
+    _VISUAL_LINE: _DeferredDefs()
 }  # type: dict
 
 
 classes = {}  # type: dict
 
 
+# Plugins that only register key mappings, i.e. they don't define any Sublime
+# Text commands, so they don't need to be imported at startup. They are
+# imported the first time a mapping lookup finds them enabled, which means a
+# disabled plugin is never imported.
+_DEFERRED_PLUGINS = (
+    'multiple_cursors',
+    'sublime',
+)
+
+
+_loaded_plugins = set()  # type: set
+
+# The setting cache entry that marks the enabled plugins of a view as loaded.
+# It's cleared with the rest of the cache when the settings change, see
+# get_setting_cache(), so the plugins are only checked again then.
+_PLUGINS_LOADED_KEY = '_nv_plugins_loaded'
+
+
+def load_enabled_plugins(view) -> None:
+    if len(_loaded_plugins) == len(_DEFERRED_PLUGINS):
+        return
+
+    cache = _get_setting_cache(view) if isinstance(view, _View) else {}
+    if _PLUGINS_LOADED_KEY in cache:
+        return
+
+    for name in _DEFERRED_PLUGINS:
+        if name not in _loaded_plugins and _get_setting(view, 'enable_' + name):
+            import_module('NeoVintageous.nv.plugin_' + name)
+            _loaded_plugins.add(name)
+
+    cache[_PLUGINS_LOADED_KEY] = True
+
+
 def register(seq: str, modes: tuple, *args, **kwargs):
     """
     Register a 'key sequence' to 'command' mapping with NeoVintageous.
@@ -45,7 +86,8 @@ def register(seq: str, modes: tuple, *args, **kwargs):
     The registered key sequence must be known to NeoVintageous. The
     registered command must be a ViMotionDef or ViOperatorDef.
 
-    The decorated class is instantiated with `*args` and `**kwargs`.
+    The decorated class is instantiated with `*args` and `**kwargs` the
+    first time the sequence is looked up.
 
     @keys
       A list of (`mode`, `sequence`) pairs to map the decorated
@@ -53,7 +95,7 @@ def register(seq: str, modes: tuple, *args, **kwargs):
     """
     def inner(cls):
         for mode in modes:
-            mappings[mode][seq] = cls(*args, **kwargs)
+            mappings[mode].defer(seq, cls, args, kwargs)
             classes[cls.__name__] = cls
         return cls
     return inner
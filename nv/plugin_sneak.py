@@ -19,18 +19,17 @@
 
 import os
 
-from sublime import IGNORECASE
 from sublime import LITERAL
 from sublime_plugin import TextCommand
 
 from NeoVintageous.nv.options import get_option
+from NeoVintageous.nv.pattern import translate_pattern
 from NeoVintageous.nv.plugin import register
 from NeoVintageous.nv.polyfill import set_selection
 from NeoVintageous.nv.polyfill import view_find_all_in_range
 from NeoVintageous.nv.polyfill import view_rfind_all
 from NeoVintageous.nv.search import add_search_highlighting
 from NeoVintageous.nv.search import clear_search_highlighting
-from NeoVintageous.nv.search import is_smartcase_pattern
 from NeoVintageous.nv.settings import get_internal_setting
 from NeoVintageous.nv.settings import get_setting
 from NeoVintageous.nv.settings import set_internal_setting
@@ -111,13 +110,16 @@ def _set_last_sneak_search(view, command: str, search: str) -> None:
 
 
 def _get_search_flags(view, search: str) -> int:
-    flags = LITERAL
-
-    if search and get_setting(view, 'sneak_use_ic_scs') == 1:
-        if get_option(view, 'ignorecase') and not is_smartcase_pattern(view, search):
-            flags |= IGNORECASE
-
-    return flags
+    if not (search and get_setting(view, 'sneak_use_ic_scs') == 1):
+        return LITERAL
+
+    # The search is literal, so it's a very nomagic pattern with its
+    # backslashes escaped.
+    return translate_pattern(
+        '\\V' + search.replace('\\', '\\\\'),
+        ignorecase=get_option(view, 'ignorecase'),
+        smartcase=get_option(view, 'smartcase')
+    ).flags
 
 
 class nv_sneak_command(TextCommand):
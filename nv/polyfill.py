@@ -15,12 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
 from contextlib import contextmanager
 import os
 import re
 import stat
 import sys
 
+from sublime import IGNORECASE
+from sublime import LITERAL
 from sublime import Region
 from sublime import active_window as _active_window
 from sublime import load_settings
@@ -188,23 +191,13 @@ def view_find(view, pattern: str, start_pt: int, flags: int = 0):
 # There's no Sublime API to find patterns in reverse direction.
 # @see https://github.com/SublimeTextIssues/Core/issues/245
 def view_rfind_all(view, pattern: str, start_pt: int, flags: int = 0):
-    matches = view.find_all(pattern, flags)
-    for region in matches:
-        if region.b > start_pt:
-            return reversed(matches[:matches.index(region)])
-
-    return reversed(matches)
+    return view_rfind_all_in_range(view, pattern, 0, start_pt, flags)
 
 
 # There's no Sublime API to find a pattern in reverse direction.
 # @see https://github.com/SublimeTextIssues/Core/issues/245
 def view_rfind(view, pattern: str, start_pt: int, flags: int = 0):
-    matches = view_rfind_all(view, pattern, start_pt, flags)
-    if matches:
-        try:
-            return next(matches)
-        except StopIteration:
-            pass
+    return view_rfind_in_range(view, pattern, 0, start_pt, flags)
 
 
 # Returns the first region matching the pattern, between indexes pos and endpos,
@@ -253,6 +246,142 @@ def view_find_all_in_range(view, pattern: str, pos: int, endpos: int, flags: int
     return matches
 
 
+# The size of the windows searched by view_rfind_all_in_range(). Each window
+# is read with up to this many characters of context on either side.
+_RFIND_WINDOW_SIZE = 4096
+
+# The compiled regexes of the patterns searched by view_rfind_all_in_range(),
+# keyed by pattern and flags, or None for patterns that Python can't compile
+# or may not match the way Sublime does.
+_RFIND_REGEX_CACHE_SIZE = 32
+_rfind_regexes = OrderedDict()  # type: OrderedDict
+
+
+def _compile_rfind_regex(pattern: str, flags: int):
+    key = (pattern, flags)
+    try:
+        regex = _rfind_regexes[key]
+        _rfind_regexes.move_to_end(key)
+
+        return regex
+    except KeyError:
+        pass
+
+    if flags & LITERAL:
+        regex = re.compile(re.escape(pattern), re.MULTILINE | (re.IGNORECASE if flags & IGNORECASE else 0))
+    elif '[:' in pattern:
+        # POSIX classes like [[:alpha:]] compile in Python, but as nested sets.
+        regex = None
+    else:
+        try:
+            regex = re.compile(pattern, re.MULTILINE | (re.IGNORECASE if flags & IGNORECASE else 0))
+        except (re.error, OverflowError, RecursionError):
+            regex = None
+
+    _rfind_regexes[key] = regex
+    if len(_rfind_regexes) > _RFIND_REGEX_CACHE_SIZE:
+        _rfind_regexes.popitem(last=False)
+
+    return regex
+
+
+# There's no Sublime API to find patterns in reverse direction.
+#
+# Yields the regions matching the pattern, between indexes pos and endpos, in
+# reverse order i.e. nearest to endpos first.
+#
+# The buffer is searched backwards from endpos in fixed-size windows, each
+# extended to the beginning of a line, so the cost of finding the nearest match
+# is proportional to its distance from endpos rather than to the size of the
+# buffer. Matches are found forwards within each window, so they are the same
+# as the ones found by a forward search from the start of the line. Patterns
+# that Python can't be trusted to match like Sublime are searched with the view
+# instead, see _compile_rfind_regex().
+#
+# @see https://github.com/SublimeTextIssues/Core/issues/245
+def view_rfind_all_in_range(view, pattern: str, pos: int, endpos: int, flags: int = 0):
+    endpos = min(endpos, view.size())
+    regex = _compile_rfind_regex(pattern, flags)
+
+    # Matches in the current window must begin before stop.
+    stop = endpos + 1
+
+    while stop > pos:
+        start = max(pos, view.line(max(pos, stop - _RFIND_WINDOW_SIZE)).a)
+
+        if regex:
+            matches = _rfind_window(view, regex, pattern, flags, start, stop, endpos)
+        else:
+            matches = _rfind_window_by_view(view, pattern, flags, start, stop, endpos)
+
+        for match in reversed(matches):
+            yield match
+
+        stop = start
+
+
+# Finds the matches that begin in the window from start to stop by searching
+# the text of the window, so the cost is bounded by the size of the window.
+def _rfind_window(view, regex, pattern: str, flags: int, start: int, stop: int, endpos: int) -> list:
+    size = view.size()
+
+    # The context before the window is for lookbehinds, and the context after
+    # it is for lookaheads and for matches that continue past the window.
+    begin = max(0, start - _RFIND_WINDOW_SIZE)
+    end = min(size, stop + _RFIND_WINDOW_SIZE)
+    text = view.substr(Region(begin, end))
+
+    matches = []
+    pt = start
+    while pt < stop:
+        match = regex.search(text, pt - begin)
+        if match is None:
+            break
+
+        region = Region(match.start() + begin, match.end() + begin)
+
+        # A match that reaches the end of the context may continue past it.
+        if region.b == end and end < size:
+            region = view.find(pattern, region.a, flags)
+            if region is None or region.b == -1:
+                break
+
+        if region.a >= stop or region.b > endpos:
+            break
+
+        matches.append(region)
+
+        pt = region.b
+        if region.size() == 0:
+            pt += 1
+
+    return matches
+
+
+# Like _rfind_window(), but for patterns that only Sublime can compile.
+def _rfind_window_by_view(view, pattern: str, flags: int, start: int, stop: int, endpos: int) -> list:
+    matches = []
+    pt = start
+    while pt < stop:
+        match = view.find(pattern, pt, flags)
+        if match is None or match.b == -1 or match.a >= stop or match.b > endpos:
+            break
+
+        matches.append(match)
+
+        pt = match.b
+        if match.size() == 0:
+            pt += 1
+
+    return matches
+
+
+# Returns the last region matching the pattern, between indexes pos and endpos,
+# or None if no position in the string matches the pattern.
+def view_rfind_in_range(view, pattern: str, pos: int, endpos: int, flags: int = 0):
+    return next(view_rfind_all_in_range(view, pattern, pos, endpos, flags), None)
+
+
 # Polyfill to work around bug in internal APIs.
 # @see https://github.com/SublimeTextIssues/Core/issues/2879
 def view_indentation_level(view, pt: int):
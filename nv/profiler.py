@@ -0,0 +1,186 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+# Opt-in timings of the key-dispatch pipeline.
+#
+# Profiling is enabled by the "vintageous_profile" preference, or by setting the
+# SUBLIME_NEOVINTAGEOUS_DEBUG environment variable. The timings are recorded
+# per phase (and per command name where available) into a bounded ring buffer
+# and can be reported with the :profile dump command, along with the number of
+# query context evaluations per key and the hit rates of the settings cache.
+
+from collections import Counter
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+import os
+
+from sublime import load_settings
+
+from NeoVintageous.nv.settings import clear_setting_cache_stats
+from NeoVintageous.nv.settings import get_setting_cache_stats
+
+RESOLVE = 'resolve'
+COLLECT_INPUT = 'collect-input'
+TRANSLATE = 'translate'
+RUN_COMMAND = 'run_command'
+RESET_COMMAND_DATA = 'reset_command_data'
+
+_PHASES = (RESOLVE, COLLECT_INPUT, TRANSLATE, RUN_COMMAND, RESET_COMMAND_DATA)
+
+_ENV_ENABLED = bool(os.getenv('SUBLIME_NEOVINTAGEOUS_DEBUG'))
+
+_MAX_TIMINGS = 10000
+
+# Whether profiling is enabled. The key-dispatch pipeline checks it several
+# times per key, so it's a plain flag that is updated when the preferences
+# change rather than a setting read. None until first checked.
+_enabled = None
+
+# A ring buffer of (phase, name, seconds) tuples.
+_timings = deque(maxlen=_MAX_TIMINGS)  # type: deque
+
+# The number of on_query_context() evaluations by context key.
+_query_contexts = Counter()  # type: Counter
+
+
+def _update_enabled() -> None:
+    global _enabled
+    _enabled = _ENV_ENABLED or bool(load_settings('Preferences.sublime-settings').get('vintageous_profile'))
+
+
+def is_profiling() -> bool:
+    if _enabled is None:
+        preferences = load_settings('Preferences.sublime-settings')
+        preferences.clear_on_change('NeoVintageous.profiler')
+        preferences.add_on_change('NeoVintageous.profiler', _update_enabled)
+        _update_enabled()
+
+    return _enabled
+
+
+@contextmanager
+def profiling(view, phase: str, name: str = ''):
+    if not is_profiling():
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        _timings.append((phase, name, perf_counter() - start))
+
+
+def count_query_context(key: str) -> None:
+    # Called for every query context, so the flag is checked directly: it's
+    # only unset until profiling is first checked, see is_profiling().
+    if _enabled or (_enabled is None and is_profiling()):
+        _query_contexts[key] += 1
+
+
+def clear_profile() -> None:
+    _timings.clear()
+    _query_contexts.clear()
+    clear_setting_cache_stats()
+
+
+def _percentile(sorted_values: list, percent: int) -> float:
+    # Nearest-rank percentile.
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+
+    return sorted_values[index]
+
+
+def _summarize(values: list) -> dict:
+    values = sorted(values)
+
+    return {
+        'count': len(values),
+        'p50': _percentile(values, 50),
+        'p95': _percentile(values, 95),
+        'p99': _percentile(values, 99),
+    }
+
+
+def get_profile_stats() -> dict:
+    # Returns:
+    #   dict: {'phases': {phase: summary}, 'commands': {name: summary}} where
+    #       summary is a dict of count, p50, p95, and p99 (in seconds).
+    phases = {}  # type: dict
+    commands = {}  # type: dict
+    for phase, name, seconds in _timings:
+        phases.setdefault(phase, []).append(seconds)
+        if name:
+            commands.setdefault(name, []).append(seconds)
+
+    return {
+        'phases': {k: _summarize(v) for k, v in phases.items()},
+        'commands': {k: _summarize(v) for k, v in commands.items()},
+    }
+
+
+def get_query_context_stats() -> dict:
+    # Returns:
+    #   dict: {key: (calls, calls per key)} where calls per key is relative to
+    #       the number of keys resolved, or None if no keys were resolved.
+    keys = sum(1 for phase, name, seconds in _timings if phase == RESOLVE)
+
+    return {key: (calls, calls / keys if keys else None) for key, calls in _query_contexts.items()}
+
+
+def _format_row(name: str, summary: dict) -> str:
+    return '{:<32} {:>7} {:>9.3f} {:>9.3f} {:>9.3f}\n'.format(
+        name,
+        summary['count'],
+        summary['p50'] * 1000,
+        summary['p95'] * 1000,
+        summary['p99'] * 1000
+    )
+
+
+def format_profile_stats() -> str:
+    stats = get_profile_stats()
+    if not stats['phases']:
+        return 'No timings recorded'
+
+    header = '{:<32} {:>7} {:>9} {:>9} {:>9}\n'.format('', 'count', 'p50 ms', 'p95 ms', 'p99 ms')
+
+    output = 'Phase' + header[5:]
+    for phase in _PHASES:
+        if phase in stats['phases']:
+            output += _format_row(phase, stats['phases'][phase])
+
+    output += '\nCommand' + header[7:]
+    for name in sorted(stats['commands']):
+        output += _format_row(name, stats['commands'][name])
+
+    query_context_stats = get_query_context_stats()
+    if query_context_stats:
+        output += '\n{:<32} {:>7} {:>9}\n'.format('Query context', 'calls', 'per key')
+        for key in sorted(query_context_stats):
+            calls, per_key = query_context_stats[key]
+            output += '{:<32} {:>7} {:>9}\n'.format(key, calls, '-' if per_key is None else '%.1f' % per_key)
+
+    setting_stats = get_setting_cache_stats()
+    if setting_stats:
+        output += '\n{:<32} {:>7} {:>9} {:>9}\n'.format('Setting', 'hits', 'misses', 'hit rate')
+        for key in sorted(setting_stats):
+            hits, misses = setting_stats[key]
+            output += '{:<32} {:>7} {:>9} {:>8.1f}%\n'.format(key, hits, misses, 100 * hits / (hits + misses))
+
+    return output.rstrip('\n')
@@ -16,9 +16,12 @@
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
 import builtins
+import hashlib
+import json
 import logging
 import os
 import re
+import tempfile
 
 import sublime
 
@@ -27,6 +30,13 @@ from NeoVintageous.nv.vim import message
 
 _log = logging.getLogger(__name__)
 
+# Bump the version to invalidate compiled rc files made by older versions.
+_COMPILED_VERSION = 1
+
+# The number of errors detected while sourcing, see _source(). Sources with
+# errors are not compiled, so the errors are reported every time.
+_errors = 0
+
 
 def _file_name() -> str:
     return '.neovintageousrc'
@@ -68,29 +78,149 @@ def _unload() -> None:
     clear_options()
 
 
+def _compiled_file_path() -> str:
+    return os.path.join(os.path.dirname(sublime.packages_path()), 'Local', 'neovintageousrc.compiled')
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
 def _load() -> None:
+    global _errors
+
     window = sublime.active_window()
 
+    source_name = None
+    source_text = None
     settings = sublime.load_settings('Preferences.sublime-settings')
     source = settings.get('vintageous_source')
     if source and isinstance(source, str):
         try:
-            _source(window, iter(sublime.load_resource(source).splitlines()))
-            _log.info('sourced %s', source)
+            source_text = sublime.load_resource(source)
+            source_name = source
         except FileNotFoundError as e:
             print('NeoVintageous:', e)
 
+    try:
+        rc_mtime = os.stat(_file_path()).st_mtime
+    except FileNotFoundError:
+        rc_mtime = None
+
+    # The rc file is only read to check if it changed if its mtime changed.
+    key = {
+        'version': _COMPILED_VERSION,
+        'source': source_name,
+        'source_hash': _hash(source_text) if source_text is not None else None,
+    }
+
+    rc_text = None
+    compiled = _read_compiled()
+    if compiled and all(compiled.get(k) == v for k, v in key.items()):
+        if compiled.get('rc_mtime') == rc_mtime:
+            _log.info('loading compiled %s', _file_path())
+            _load_compiled(window, compiled)
+            return
+
+        rc_text = _read_rc()
+        if rc_text is not None and compiled.get('rc_hash') == _hash(rc_text):
+            _log.info('loading compiled %s', _file_path())
+            _load_compiled(window, compiled)
+            compiled['rc_mtime'] = rc_mtime
+            _write_compiled(compiled)
+            return
+    else:
+        rc_text = _read_rc()
+
+    _errors = 0
+    options = []  # type: list
+
+    if source_text is not None:
+        _source(window, iter(source_text.splitlines()), options)
+        _log.info('sourced %s', source_name)
+
+    if rc_text is not None:
+        _source(window, iter(rc_text.splitlines()), options)
+        _log.info('sourced %s', _file_path())
+    else:
+        _log.info('%s file not found', _file_path())
+
+    if not _errors:
+        # Imports are inline to avoid circular dependency errors.
+        from NeoVintageous.nv.mappings import dump_mappings
+        from NeoVintageous.nv.variables import dump_variables
+
+        key.update({
+            'rc_mtime': rc_mtime,
+            'rc_hash': _hash(rc_text) if rc_text is not None else None,
+            'mappings': dump_mappings(),
+            'variables': dump_variables(),
+            'options': options,
+        })
+
+        _write_compiled(key)
+
+
+def _read_rc():
     try:
         with builtins.open(_file_path(), 'r', encoding='utf-8', errors='replace') as f:
-            _source(window, f)
-            _log.info('sourced %s', _file_path())
+            return f.read()
+    except FileNotFoundError:
+        return None
+
 
+def _read_compiled():
+    try:
+        with builtins.open(_compiled_file_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
     except FileNotFoundError:
-        _log.info('%s file not found', _file_path())
+        pass
+    except Exception:
+        _log.exception('could not read %s', _compiled_file_path())
 
+    return None
 
-def _source(window, source) -> None:
-    # The import is inline to avoid circular dependency errors.
+
+def _write_compiled(compiled: dict) -> None:
+    compiled_file = _compiled_file_path()
+    try:
+        fd, temp_file = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(compiled_file))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(compiled, f)
+
+            os.replace(temp_file, compiled_file)
+        except Exception:
+            os.remove(temp_file)
+            raise
+    except Exception:
+        _log.exception('could not write %s', compiled_file)
+
+
+# Load the mappings, variables, and options of a compiled rc. Mappings and
+# variables are loaded as they were when the rc was compiled. Options are set
+# again in order, because some of them are stored in the settings.
+def _load_compiled(window, compiled: dict) -> None:
+    # Imports are inline to avoid circular dependency errors.
+    from NeoVintageous.nv.ex_cmds import ex_set
+    from NeoVintageous.nv.mappings import load_mappings
+    from NeoVintageous.nv.variables import load_variables
+
+    load_variables(compiled['variables'])
+    load_mappings(compiled['mappings'])
+
+    try:
+        window.settings().set('_nv_sourcing', True)
+        view = window.active_view()
+        for params in compiled['options']:
+            ex_set(view=view, **params)
+    finally:
+        window.settings().erase('_nv_sourcing')
+
+
+def _source(window, source, options: list = None) -> None:
+    # Imports are inline to avoid circular dependency errors.
+    from NeoVintageous.nv.ex.parser import parse_command_line
     from NeoVintageous.nv.ex_cmds import do_ex_cmdline
 
     try:
@@ -98,11 +228,29 @@ def _source(window, source) -> None:
         for line in source:
             ex_cmdline = _parse_line(line)
             if ex_cmdline:
-                do_ex_cmdline(window, ex_cmdline)
+                # The line is parsed here first, because do_ex_cmdline() only
+                # rings the bell for lines it can't parse.
+                try:
+                    command = parse_command_line(ex_cmdline[1:]).command
+                    do_ex_cmdline(window, ex_cmdline)
+                except Exception as e:
+                    _error(line, e)
+                    continue
+
+                # Collect the options for the compiled rc, see _load().
+                if options is not None and command.target == 'set':
+                    options.append({'option': command.params['option'], 'value': command.params['value']})
     finally:
         window.settings().erase('_nv_sourcing')
 
 
+def _error(line: str, e: Exception) -> None:
+    global _errors
+
+    _errors += 1
+    message('error detected while processing {} at line "{}":\n{}'.format(_file_name(), line.rstrip(), str(e)))
+
+
 # Recursive mappings (:map, :nmap, :omap, :smap, :vmap) are not supported. They
 # were removed in version 1.5.0. They were removed because they were they were
 # implemented as non-recursive mappings.
@@ -133,6 +281,6 @@ def _parse_line(line: str):
 
                 return cmdline
     except Exception as e:
-        message('error detected while processing {} at line "{}":\n{}'.format(_file_name(), line.rstrip(), str(e)))
+        _error(line, e)
 
     return None
@@ -15,17 +15,46 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from bisect import bisect_right
 import re
 
 from sublime import IGNORECASE
 from sublime import LITERAL
+from sublime import Region
+from sublime import set_timeout
 
 from NeoVintageous.nv.options import get_option
+from NeoVintageous.nv.pattern import translate_pattern
+from NeoVintageous.nv.polyfill import view_find_all_in_range
+from NeoVintageous.nv.session import get_search_occurrences_cache
 from NeoVintageous.nv.settings import get_setting_neo
 from NeoVintageous.nv.ui import ui_region_flags
 
 
+# Buffers larger than this are highlighted in the visible region first, and
+# then extended off-screen in background batches of this many characters.
+_HIGHLIGHT_BATCH_SIZE = 262144
+
+# The delay in milliseconds between background highlighting batches.
+_HIGHLIGHT_BATCH_DELAY = 10
+
+# The maximum number of patterns, and the maximum total number of occurrences,
+# held in the search occurrences cache of a view.
+_OCCURRENCES_CACHE_SIZE = 8
+_OCCURRENCES_CACHE_MAX_REGIONS = 500000
+
+# The maximum span of text, in characters, read from the buffer to narrow down
+# the occurrences of a pattern to the occurrences of a longer pattern.
+_NARROW_MAX_SPAN = 4194304
+
+# The pending background highlighting of each view, keyed by view id. Each
+# batch checks that its search progress, see _new_search_progress(), is still
+# the current one, so a batch is cancelled by removing or replacing it.
+_highlighting_jobs = {}  # type: dict
+
+
 def clear_search_highlighting(view) -> None:
+    _highlighting_jobs.pop(view.id(), None)
     view.erase_regions('_nv_search_occ')
     view.erase_regions('_nv_search_cur')
     view.erase_regions('_nv_search_inc')
@@ -36,6 +65,8 @@ def get_search_occurrences(view) -> list:
 
 
 def add_search_highlighting(view, occurrences: list, incremental: list = None) -> None:
+    _highlighting_jobs.pop(view.id(), None)
+
     # Incremental search match string highlighting: while typing a search
     # command, where the pattern, as it was typed so far, matches.
     if incremental and get_option(view, 'incsearch'):
@@ -49,115 +80,226 @@ def add_search_highlighting(view, occurrences: list, incremental: list = None) -
     # Occurrences and current search match string highlighting: when there are
     # search matches, highlight all the matches and the current active one too.
     if occurrences and get_option(view, 'hlsearch'):
-        view.add_regions(
-            '_nv_search_occ',
-            occurrences,
-            scope='string neovintageous_search_occ',
-            flags=ui_region_flags(get_setting_neo(view, 'search_occ_style'))
-        )
+        _add_occurrences_highlighting(view, occurrences)
 
-        sels = []
-        for sel in view.sel():
-            if sel.empty():
-                sel.b += 1
-            sels.append(sel)
 
-        current = []
-        for region in occurrences:
-            for sel in sels:
-                if region.contains(sel):
-                    current.append(region)
+def highlight_search(view, pattern: str, flags: int, incremental: list = None, narrow_from: dict = None):
+    # Like add_search_highlighting(), but finds the occurrences of the pattern.
+    # In large buffers only the visible region is searched up front; the rest
+    # of the buffer is searched in background batches, outwards from the
+    # visible region, and highlighted when done, unless the highlighting is
+    # cleared or replaced first.
+    #
+    # Args:
+    #   :narrow_from (dict): The search progress returned for a literal prefix
+    #       of the pattern, e.g. by the previous keystroke of an incremental
+    #       search. The part of the buffer it covers is narrowed down instead
+    #       of searched again, see narrow_search_occurrences().
+    #
+    # Returns:
+    #   dict: The search progress, which is updated by the background batches,
+    #       or None if 'hlsearch' is off.
+    if not get_option(view, 'hlsearch'):
+        add_search_highlighting(view, [], incremental)
+        return None
 
-        if current:
-            view.add_regions(
-                '_nv_search_cur',
-                current,
-                scope='support.function neovintageous_search_cur',
-                flags=ui_region_flags(get_setting_neo(view, 'search_cur_style'))
-            )
+    key = (pattern, flags, view.change_count())
 
+    if view.size() <= _HIGHLIGHT_BATCH_SIZE:
+        occurrences = find_search_occurrences(view, pattern, flags)
+        add_search_highlighting(view, occurrences, incremental)
+        return _new_search_progress(key, occurrences, 0, view.size() + 1)
 
-def is_smartcase_pattern(view, pattern: str) -> bool:
-    return get_option(view, 'smartcase') and any(p.isupper() for p in pattern)
+    occurrences = get_cached_search_occurrences(view, pattern, flags)
+    if occurrences is not None:
+        add_search_highlighting(view, occurrences, incremental)
+        return _new_search_progress(key, occurrences, 0, view.size() + 1)
 
+    visible = view.visible_region()
+    begin = view.line(visible.begin()).begin()
+    stop = view.line(visible.end()).end() + 1
 
-def process_search_pattern(view, pattern: str) -> tuple:
-    flags = 0
+    progress = _narrow_search_progress(view, narrow_from, pattern, flags)
+    if progress is None or progress['begin'] > begin or progress['end'] < stop:
+        occurrences, end = _find_occurrences(view, pattern, flags, begin, stop)
+        progress = _new_search_progress(key, occurrences, begin, end)
 
-    if get_option(view, 'ignorecase') and not is_smartcase_pattern(view, pattern):
-        flags |= IGNORECASE
+    if progress['begin'] <= 0 and progress['end'] > view.size():
+        _cache_search_occurrences(view, key, progress['below'])
+        add_search_highlighting(view, progress['below'], incremental)
+        return progress
 
-    # Changes the special characters that can be used in search patterns.
-    is_magic = get_option(view, 'magic')
+    add_search_highlighting(view, _search_progress_occurrences(progress), incremental)
 
-    # Pattern modes can be specified anywhere within the pattern itself and the
-    # effect of the mode applies to the entire pattern:
-    #
-    # \c  ignore case, do not use the 'ignorecase' option
-    # \C  match case, do not use the 'ignorecase' option
-    pattern_modes = set()
-
-    def _add_pattern_mode(match) -> str:
-        pattern_modes.add(match.group(1))
-        return ''
-
-    pattern = re.sub('\\\\([cC])', _add_pattern_mode, pattern)
-    for m in pattern_modes:
-        if m == 'c':
-            flags |= IGNORECASE
-        elif m == 'C':
-            flags &= ~IGNORECASE
-
-    # Some characters in the pattern are taken literally. They match with the
-    # same character in the text. When preceded with a backslash however, these
-    # characters get a special meaning. See :help magic for more details.
+    _highlighting_jobs[view.id()] = progress
+    _schedule_search_highlighting(view, progress)
+
+    return progress
+
+
+def _new_search_progress(key: tuple, occurrences: list, begin: int, end: int) -> dict:
+    # The occurrences of a pattern found so far, searching outwards from a part
+    # of the buffer.
     #
-    # Patterns can be prefixed by a "mode" that overrides the 'magic' option:
+    # Args:
+    #   key (tuple): The pattern, flags, and change count being searched.
+    #   occurrences (list): The occurrences found between begin and end. It
+    #       becomes the below list, so it must not be a shared list if the
+    #       search isn't done.
+    #   begin (int): The point the search has been extended up to backwards.
+    #   end (int): The point to resume the search from forwards.
     #
-    #   \m    'magic' on for the following chars in the pattern.
-    #   \M    'magic' off for the following chars in the pattern.
-    #   \v    the following chars in the pattern are "very magic".
-    #   \V    the following chars int the pattern are "very nomagic".
-    mode = None
-    match = re.match('^\\\\(m|M|v|V)(.*)$', pattern)
-    if match:
-        mode = match.group(1)
-        pattern = match.group(2)
-
-    def _process_magic(pattern, flags):
-        # When magic is on some characters in a pattern are interpreted
-        # literally depending on context. For example [0-9 is interpreted
-        # literally and [0-9] is interpreted as a regular expression.
-        # XXX The following is a quick and dirty implementation to support some
-        # very basic 'magic' literal interpretations.
-        if pattern:
-            if re.match('^[a-zA-Z0-9_\'"\\[\\]]+$', pattern):
-                if '[' not in pattern or ']' not in pattern:
-                    flags |= LITERAL
-
-            elif re.match('^[a-zA-Z0-9_\'"\\(\\)]+$', pattern):
-                if '(' not in pattern or ')' not in pattern:
-                    flags |= LITERAL
-
-        return pattern, flags
-
-    # magic
-    if mode == 'm' or (is_magic and not mode):
-        pattern, flags = _process_magic(pattern, flags)
-
-    # very magic
-    elif mode == 'v':
-        pattern, flags = _process_magic(pattern, flags)
-
-    # nomagic
-    elif mode == 'M' or (not is_magic and not mode):
-        flags |= LITERAL
-
-    # very nomagic
-    elif mode == 'V':
-        flags |= LITERAL
+    # Returns:
+    #   dict: The key, begin, and end, and the batches of occurrences found so
+    #       far that begin before begin (above, nearest to begin first) and the
+    #       occurrences found that begin at or after begin (below). The search
+    #       is done when begin is 0 and end is greater than the size of the view.
+    return {'key': key, 'above': [], 'below': occurrences, 'begin': begin, 'end': end}
+
+
+def _search_progress_occurrences(progress: dict) -> list:
+    return [region for batch in reversed(progress['above']) for region in batch] + progress['below']
+
+
+def _narrow_search_progress(view, progress: dict, pattern: str, flags: int):
+    # Returns:
+    #   dict: The search progress of the pattern over the part of the buffer
+    #       the search progress of its prefix covers, or None if it can't be
+    #       narrowed down.
+    if progress is None:
+        return None
+
+    prefix, prefix_flags, change_count = progress['key']
+    if prefix_flags != flags or change_count != view.change_count():
+        return None
+
+    occurrences = _narrow_occurrences(view, _search_progress_occurrences(progress), prefix, pattern, flags)
+    if occurrences is None:
+        return None
+
+    # The forward search must resume after the last occurrence.
+    end = progress['end']
+    if occurrences and occurrences[-1].b > end:
+        end = occurrences[-1].b
+
+    return _new_search_progress((pattern, flags, change_count), occurrences, progress['begin'], end)
+
+
+def _schedule_search_highlighting(view, progress: dict) -> None:
+    set_timeout(lambda: _extend_search_highlighting(view, progress), _HIGHLIGHT_BATCH_DELAY)
+
+
+def _extend_search_highlighting(view, progress: dict) -> None:
+    if _highlighting_jobs.get(view.id()) is not progress or not view.is_valid():
+        return
+
+    # The buffer was modified since the search started.
+    pattern, flags, change_count = progress['key']
+    if view.change_count() != change_count:
+        del _highlighting_jobs[view.id()]
+        return
+
+    begin = progress['begin']
+    if begin > 0:
+        batch_begin = view.line(max(0, begin - _HIGHLIGHT_BATCH_SIZE)).begin()
+        progress['above'].append(_find_occurrences(view, pattern, flags, batch_begin, begin)[0])
+        progress['begin'] = batch_begin
+
+    end = progress['end']
+    if end <= view.size():
+        occurrences, progress['end'] = _find_occurrences(view, pattern, flags, end, end + _HIGHLIGHT_BATCH_SIZE)
+        progress['below'].extend(occurrences)
+
+    if progress['begin'] > 0 or progress['end'] <= view.size():
+        _schedule_search_highlighting(view, progress)
+    else:
+        # The occurrences are only highlighted once they've all been found;
+        # highlighting them after each batch would make a full pass quadratic
+        # in the number of occurrences.
+        del _highlighting_jobs[view.id()]
+        occurrences = _search_progress_occurrences(progress)
+        progress['above'] = []
+        progress['below'] = occurrences
+        _add_occurrences_highlighting(view, occurrences)
+        _cache_search_occurrences(view, progress['key'], occurrences)
+
+
+def _find_occurrences(view, pattern: str, flags: int, pt: int, stop: int) -> tuple:
+    # Returns:
+    #   tuple: The occurrences that begin at or after pt and before stop, and
+    #       the point to resume searching from (greater than the size of the
+    #       view when there are no more occurrences).
+    occurrences = []
+    while pt < stop:
+        match = view.find(pattern, pt, flags)
+        if match is None or match.b == -1:
+            return occurrences, view.size() + 1
+
+        if match.a >= stop:
+            return occurrences, match.a
+
+        occurrences.append(match)
+
+        pt = match.b
+        if match.size() == 0:
+            pt += 1
+
+    return occurrences, pt
+
+
+def _add_occurrences_highlighting(view, occurrences: list) -> None:
+    view.add_regions(
+        '_nv_search_occ',
+        occurrences,
+        scope='string neovintageous_search_occ',
+        flags=ui_region_flags(get_setting_neo(view, 'search_occ_style'))
+    )
 
-    return pattern, flags
+    current = _find_current_occurrences(view, occurrences)
+    if current:
+        view.add_regions(
+            '_nv_search_cur',
+            current,
+            scope='support.function neovintageous_search_cur',
+            flags=ui_region_flags(get_setting_neo(view, 'search_cur_style'))
+        )
+
+
+def _find_current_occurrences(view, occurrences: list) -> list:
+    # The occurrences are usually sorted already, but may be in reverse order.
+    occurrences = sorted(occurrences, key=Region.begin)
+    begins = [region.begin() for region in occurrences]
+
+    current = []
+    for sel in view.sel():
+        if sel.empty():
+            sel.b += 1
+
+        # Occurrences don't overlap, so only the last occurrence that begins
+        # at or before the selection can contain it.
+        i = bisect_right(begins, sel.begin()) - 1
+        if i >= 0 and occurrences[i].contains(sel):
+            current.append(occurrences[i])
+
+    return current
+
+
+def translate_search_pattern(view, pattern: str):
+    # Returns:
+    #   TranslatedPattern: The Vim pattern translated according to the
+    #       'magic', 'ignorecase', and 'smartcase' options.
+    return translate_pattern(
+        pattern,
+        get_option(view, 'magic'),
+        get_option(view, 'ignorecase'),
+        get_option(view, 'smartcase')
+    )
+
+
+def process_search_pattern(view, pattern: str) -> tuple:
+    translated = translate_search_pattern(view, pattern)
+
+    return translated.pattern, translated.flags
 
 
 def process_word_search_pattern(view, pattern: str) -> tuple:
@@ -171,9 +313,162 @@ def process_word_search_pattern(view, pattern: str) -> tuple:
     return pattern, flags
 
 
+# The occurrences of a pattern are cached per view, keyed by the pattern, the
+# flags, and the change count of the buffer, so a cached list is never stale.
+# The returned list is shared and must not be modified.
 def find_search_occurrences(view, pattern: str, flags: int) -> list:
-    return view.find_all(pattern, flags)
+    occurrences = get_cached_search_occurrences(view, pattern, flags)
+    if occurrences is None:
+        occurrences = view.find_all(pattern, flags)
+        _cache_search_occurrences(view, (pattern, flags, view.change_count()), occurrences)
+
+    return occurrences
+
+
+# Finds the occurrences of a literal pattern that extends a literal prefix by
+# narrowing down the cached occurrences of the prefix: every occurrence of the
+# pattern begins at an occurrence of the prefix, unless the occurrences of the
+# prefix can overlap, so only the text following each of them needs checking.
+# The occurrences found are cached.
+#
+# Returns:
+#   list: The occurrences, or None if they can't be narrowed down (the prefix
+#       isn't a literal prefix of the pattern or its occurrences aren't cached),
+#       in which case the buffer has to be searched in full.
+def narrow_search_occurrences(view, prefix: str, pattern: str, flags: int):
+    candidates = get_cached_search_occurrences(view, prefix, flags)
+    if candidates is None:
+        return None
+
+    occurrences = _narrow_occurrences(view, candidates, prefix, pattern, flags)
+    if occurrences is not None:
+        _cache_search_occurrences(view, (pattern, flags, view.change_count()), occurrences)
+
+    return occurrences
+
+
+# Narrows down the occurrences of a literal prefix of a pattern, see
+# narrow_search_occurrences(), to the occurrences of the pattern.
+#
+# Returns:
+#   list: The occurrences, or None if they can't be narrowed down.
+def _narrow_occurrences(view, candidates: list, prefix: str, pattern: str, flags: int):
+    if not flags & LITERAL or len(prefix) >= len(pattern) or not pattern.startswith(prefix):
+        return None
+
+    ignorecase = bool(flags & IGNORECASE)
+    if ignorecase:
+        # Case folding of non-ASCII characters can change their length.
+        if not pattern.isascii():
+            return None
+
+        needle = pattern.lower()
+    else:
+        needle = pattern
+
+    if _can_overlap(needle[:len(prefix)]):
+        return None
+
+    occurrences = []
+    if candidates:
+        size = len(pattern)
+        begin = candidates[0].a
+        end = min(candidates[-1].a + size, view.size())
+        if end - begin > _NARROW_MAX_SPAN:
+            return None
+
+        text = view.substr(Region(begin, end))
+
+        # The occurrences of the pattern itself may overlap, in which case a
+        # search only finds the first of the overlapping ones.
+        pt = begin
+        for candidate in candidates:
+            i = candidate.a - begin
+            match = text[i:i + size]
+            if candidate.a >= pt and (match.lower() if ignorecase else match) == needle:
+                occurrences.append(Region(candidate.a, candidate.a + size))
+                pt = candidate.a + size
+
+    return occurrences
+
+
+# Returns True if an occurrence of the text can overlap the next one, i.e. if
+# a proper suffix of the text is also a prefix of it.
+def _can_overlap(text: str) -> bool:
+    return any(text.startswith(text[i:]) for i in range(1, len(text)))
+
+
+# Like view_find_all_in_range(), but the occurrences are taken from the cache
+# when possible. Occurrences found for the whole buffer are cached.
+def find_search_occurrences_in_range(view, pattern: str, flags: int, pos: int, endpos: int) -> list:
+    if pos <= 0 and endpos >= view.size():
+        occurrences = find_search_occurrences(view, pattern, flags)
+    else:
+        occurrences = get_cached_search_occurrences(view, pattern, flags)
+
+    if occurrences is not None:
+        i = bisect_occurrences(occurrences, pos)
+
+        # The cached occurrences are only the ones a search from pos would find
+        # if the previous occurrence doesn't overlap pos.
+        if i == 0 or occurrences[i - 1].b <= pos:
+            return occurrences[i:_bisect_occurrence_ends(occurrences, endpos)]
+
+    return view_find_all_in_range(view, pattern, pos, endpos, flags)
+
+
+# Returns the index of the first occurrence that begins at or after pt. The
+# occurrences must be sorted and must not overlap.
+def bisect_occurrences(occurrences: list, pt: int) -> int:
+    lo = 0
+    hi = len(occurrences)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if occurrences[mid].a < pt:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    return lo
+
+
+# Returns the index of the first occurrence that ends after pt.
+def _bisect_occurrence_ends(occurrences: list, pt: int) -> int:
+    lo = 0
+    hi = len(occurrences)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if occurrences[mid].b <= pt:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    return lo
+
+
+# Returns None if the occurrences of the pattern are not cached.
+def get_cached_search_occurrences(view, pattern: str, flags: int):
+    cache = get_search_occurrences_cache(view)
+    key = (pattern, flags, view.change_count())
+    occurrences = cache.get(key)
+    if occurrences is not None:
+        cache.move_to_end(key)
+
+    return occurrences
+
+
+def _cache_search_occurrences(view, key: tuple, occurrences: list) -> None:
+    if len(occurrences) > _OCCURRENCES_CACHE_MAX_REGIONS:
+        return
+
+    cache = get_search_occurrences_cache(view)
+
+    # Occurrences from older versions of the buffer can never be used again.
+    for stale_key in [k for k in cache if k[2] != key[2]]:
+        del cache[stale_key]
 
+    cache[key] = occurrences
 
-def find_word_search_occurrences(view, pattern: str, flags: int) -> list:
-    return view.find_all(pattern, flags)
+    size = sum(len(v) for v in cache.values())
+    while len(cache) > _OCCURRENCES_CACHE_SIZE or size > _OCCURRENCES_CACHE_MAX_REGIONS:
+        size -= len(cache.popitem(last=False)[1])
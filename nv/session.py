@@ -15,20 +15,52 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
 from collections import defaultdict
 from collections import deque
 from json import JSONEncoder
 import json
 import os
+import tempfile
+import threading
 import traceback
 
-from sublime import version
+from sublime import load_settings
 from sublime import packages_path
+from sublime import set_timeout
+from sublime import set_timeout_async
+from sublime import version
 
 _session = {}  # type: dict
 
 _views = defaultdict(dict)  # type: dict
 
+_command_states = {}  # type: dict
+
+_search_occurrences = {}  # type: dict
+
+_line_indexes = {}  # type: dict
+
+_bracket_indexes = {}  # type: dict
+
+_setting_caches = {}  # type: dict
+
+# Whether the setting caches are cleared when the preferences change, see
+# get_setting_cache().
+_setting_caches_listening = False
+
+# Whether a runtime save of the session is scheduled, see
+# _schedule_save_session().
+_save_session_pending = False
+
+# Each serialized session is numbered, and writes of the session file are
+# serialized by a lock, so a runtime save still queued on the async thread
+# can't overwrite a newer session, e.g. the one saved on exit. See
+# _write_session().
+_save_session_lock = threading.Lock()
+_save_session_generation = 0
+_saved_session_generation = 0
+
 
 _VERSION = int(version())
 
@@ -55,10 +87,11 @@ else:
         return packages_path()
 
     def session_on_exit() -> None:
-        pass
+        if _save_session_pending:
+            save_session()
 
     def maybe_do_runtime_save_session() -> None:
-        save_session()
+        _schedule_save_session()
 
 
 def _get_session_file() -> str:
@@ -70,8 +103,35 @@ def _get_session_file() -> str:
 
 
 def session_on_close(view) -> None:
+    view_id = view.id()
+
     try:
-        del _views[view.id()]
+        del _views[view_id]
+    except KeyError:
+        pass
+
+    try:
+        del _command_states[view_id]
+    except KeyError:
+        pass
+
+    try:
+        del _search_occurrences[view_id]
+    except KeyError:
+        pass
+
+    try:
+        del _line_indexes[view_id]
+    except KeyError:
+        pass
+
+    try:
+        del _bracket_indexes[view_id]
+    except KeyError:
+        pass
+
+    try:
+        del _setting_caches[view_id]
     except KeyError:
         pass
 
@@ -144,8 +204,73 @@ def load_session() -> None:
 
 
 def save_session() -> None:
-    with open(_get_session_file(), 'w', encoding='utf-8') as f:
-        f.write(json.dumps(_session, cls=_JsonSessionEncoder))
+    global _save_session_pending
+    _save_session_pending = False
+    _write_session(_get_session_file(), _dump_session(), _next_save_session_generation())
+
+
+# Runtime saves are write-behind: a burst of changes is coalesced into a single
+# save after a delay (the "vintageous_session_save_delay" setting) so that
+# saving never happens in the middle of handling a key.
+def _schedule_save_session() -> None:
+    global _save_session_pending
+    if _save_session_pending:
+        return
+
+    _save_session_pending = True
+    delay = load_settings('Preferences.sublime-settings').get('vintageous_session_save_delay', 1000)
+    set_timeout(_save_pending_session, delay)
+
+
+def _save_pending_session() -> None:
+    global _save_session_pending
+    if not _save_session_pending:
+        return
+
+    _save_session_pending = False
+
+    # The session is serialized on the main thread, because that's where it's
+    # modified, but it's written to the file in the background.
+    session_file = _get_session_file()
+    content = _dump_session()
+    generation = _next_save_session_generation()
+    set_timeout_async(lambda: _write_session(session_file, content, generation))
+
+
+def _dump_session() -> str:
+    return json.dumps(_session, cls=_JsonSessionEncoder)
+
+
+def _next_save_session_generation() -> int:
+    # Sessions are only serialized on the main thread.
+    global _save_session_generation
+    _save_session_generation += 1
+
+    return _save_session_generation
+
+
+def _write_session(session_file: str, content: str, generation: int) -> None:
+    global _saved_session_generation
+    with _save_session_lock:
+        if generation < _saved_session_generation:
+            return
+
+        _write_session_file(session_file, content)
+        _saved_session_generation = generation
+
+
+def _write_session_file(session_file: str, content: str) -> None:
+    # The session is written to a temporary file that then replaces the session
+    # file, so a crash while writing can't leave a truncated session behind.
+    fd, temp_file = tempfile.mkstemp(prefix='neovintageous.session.', suffix='.tmp', dir=os.path.dirname(session_file))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        os.replace(temp_file, session_file)
+    except Exception:
+        os.remove(temp_file)
+        raise
 
 
 # Some sessions contain types that are not JSON serializable e.g. registers use
@@ -185,3 +310,101 @@ def get_session_view_value(view, name: str, default=None):
 
 def set_session_view_value(view, name: str, value) -> None:
     _views[view.id()][name] = value
+
+
+class CommandState:
+    """The command being built in a view e.g. the "2d3w" in "2d3w".
+
+    The command state is accessed many times per key press, so it's held in
+    memory as plain attributes rather than as serialized session values. It's
+    volatile; it shouldn't be persisted between sessions.
+    """
+
+    __slots__ = (
+        'action',
+        'action_count',
+        'capture_register',
+        'motion',
+        'motion_count',
+        'partial_sequence',
+        'register',
+        'sequence',
+    )
+
+    def __init__(self):
+        self.action = None
+        self.action_count = ''
+        self.capture_register = False
+        self.motion = None
+        self.motion_count = ''
+        self.partial_sequence = ''
+        self.register = '"'
+        self.sequence = ''
+
+
+def get_command_state(view) -> CommandState:
+    try:
+        return _command_states[view.id()]
+    except KeyError:
+        state = _command_states[view.id()] = CommandState()
+
+        return state
+
+
+# The search occurrences cache of a view, see find_search_occurrences(). Like
+# the command state, it's volatile and held in memory only.
+def get_search_occurrences_cache(view) -> OrderedDict:
+    try:
+        return _search_occurrences[view.id()]
+    except KeyError:
+        cache = _search_occurrences[view.id()] = OrderedDict()
+
+        return cache
+
+
+# The line completion index of a view, see get_line_completions(). Like the
+# command state, it's volatile and held in memory only.
+def get_line_index(view) -> dict:
+    try:
+        return _line_indexes[view.id()]
+    except KeyError:
+        index = _line_indexes[view.id()] = {'change_count': None, 'lines': [], 'buckets': {}}
+
+        return index
+
+
+# The bracket indexes of a view by bracket pair, see nv.vi.brackets. They're
+# only valid for the change count they were built for.
+def get_bracket_index_cache(view) -> dict:
+    try:
+        return _bracket_indexes[view.id()]
+    except KeyError:
+        cache = _bracket_indexes[view.id()] = {}
+
+        return cache
+
+
+# The cached settings of a view, see nv.settings.get_setting(). A cache is
+# cleared whenever the settings of its view, or the preferences, change.
+def get_setting_cache(view) -> dict:
+    try:
+        return _setting_caches[view.id()]
+    except KeyError:
+        global _setting_caches_listening
+        if not _setting_caches_listening:
+            preferences = load_settings('Preferences.sublime-settings')
+            preferences.clear_on_change('NeoVintageous.settings')
+            preferences.add_on_change('NeoVintageous.settings', clear_setting_caches)
+            _setting_caches_listening = True
+
+        cache = _setting_caches[view.id()] = {}
+        settings = view.settings()
+        settings.clear_on_change('NeoVintageous.settings')
+        settings.add_on_change('NeoVintageous.settings', cache.clear)
+
+        return cache
+
+
+def clear_setting_caches() -> None:
+    for cache in _setting_caches.values():
+        cache.clear()
@@ -15,33 +15,89 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import Counter
 import os
 
+from sublime import View
 from sublime import active_window
 
 from NeoVintageous.nv.polyfill import toggle_preference
+from NeoVintageous.nv.session import get_command_state
 from NeoVintageous.nv.session import get_session_value
 from NeoVintageous.nv.session import get_session_view_value
+from NeoVintageous.nv.session import get_setting_cache
 from NeoVintageous.nv.session import set_session_value
 from NeoVintageous.nv.session import set_session_view_value
 from NeoVintageous.nv.vim import DIRECTION_DOWN
 from NeoVintageous.nv.vim import UNKNOWN
 
 
+# The settings keys by setting name e.g. "vintageous_use_sys_clipboard" for
+# "use_sys_clipboard".
+_keys = {}  # type: dict
+
+# The setting cache hits and misses by settings key, see get_view_setting().
+_cache_hits = Counter()  # type: Counter
+_cache_misses = Counter()  # type: Counter
+
+
+def _key(name: str) -> str:
+    try:
+        return _keys[name]
+    except KeyError:
+        key = _keys[name] = 'vintageous_%s' % name
+
+        return key
+
+
+def get_view_setting(view, key: str, default=None):
+    # The settings of views are cached until they change, see
+    # get_setting_cache(). Anything else, e.g. a window, is read directly.
+    if not isinstance(view, View):
+        return view.settings().get(key, default)
+
+    cache = get_setting_cache(view)
+    try:
+        value = cache[key]
+        _cache_hits[key] += 1
+    except KeyError:
+        value = cache[key] = view.settings().get(key)
+        _cache_misses[key] += 1
+
+    return default if value is None else value
+
+
 def get_setting(view, name: str, default=None):
-    return view.settings().get('vintageous_%s' % name, default)
+    return get_view_setting(view, _key(name), default)
 
 
 def set_setting(view, name: str, value) -> None:
-    view.settings().set('vintageous_%s' % name, value)
+    key = _key(name)
+    view.settings().set(key, value)
+    if isinstance(view, View):
+        get_setting_cache(view)[key] = value
 
 
 def reset_setting(view, name: str) -> None:
-    view.settings().erase('vintageous_%s' % name)
+    key = _key(name)
+    view.settings().erase(key)
+    if isinstance(view, View):
+        get_setting_cache(view).pop(key, None)
+
+
+def get_setting_cache_stats() -> dict:
+    # Returns:
+    #   dict: {key: (hits, misses)} of the settings read through the cache.
+    return {key: (_cache_hits[key], _cache_misses[key]) for key in _cache_hits.keys() | _cache_misses.keys()}
+
+
+def clear_setting_cache_stats() -> None:
+    _cache_hits.clear()
+    _cache_misses.clear()
 
 
 def _get_private(obj, name: str, default=None):
-    return obj.settings().get('_vintageous_%s' % name, default)
+    return get_view_setting(obj, '_vintageous_%s' % name, default)
 
 
 def _set_private(obj, name: str, value) -> None:
@@ -59,9 +115,11 @@ def set_internal_setting(obj, name: str, value) -> None:
 # @deprecated since v1.32 use get_setting() instead.
 def get_setting_neo(view, name: str):
     # @deprecated since v1.32 neovintageous_* settings.
-    # The following is for backward compatibility.
-    if view.settings().has('neovintageous_%s' % name):
-        return view.settings().get('neovintageous_%s' % name)
+    # The following is for backward compatibility. An old setting that is set
+    # to null is ignored, like a missing one.
+    value = get_view_setting(view, 'neovintageous_%s' % name)
+    if value is not None:
+        return value
 
     return get_setting(view, name)
 
@@ -70,19 +128,20 @@ def get_setting_neo(view, name: str):
 def get_setting_hly(view, name: str):
     # @deprecated since v1.32 highlightedyank* settings.
     # The following is for backward compatibility.
-    old_name = name.replace('highlighted_yank', 'highlightedyank')
-    if view.settings().has(old_name):
-        return view.settings().get(old_name)
+    # An old setting that is set to null is ignored, like a missing one.
+    value = get_view_setting(view, name.replace('highlighted_yank', 'highlightedyank'))
+    if value is not None:
+        return value
 
     return get_setting(view, name)
 
 
 def get_action_count(view) -> str:
-    return get_session_view_value(view, 'action_count', '')
+    return get_command_state(view).action_count
 
 
 def set_action_count(view, value) -> None:
-    set_session_view_value(view, 'action_count', str(value))
+    get_command_state(view).action_count = str(value)
 
 
 def get_cmdline_cwd() -> str:
@@ -242,11 +301,11 @@ def set_mode(view, value: str) -> None:
 
 
 def get_motion_count(view) -> str:
-    return get_session_view_value(view, 'motion_count', '')
+    return get_command_state(view).motion_count
 
 
 def set_motion_count(view, value) -> None:
-    set_session_view_value(view, 'motion_count', str(value))
+    get_command_state(view).motion_count = str(value)
 
 
 # This setting isn't reset automatically. nv_enter_normal_mode mode must take care
@@ -275,11 +334,11 @@ def set_interactive(view, value: bool) -> None:
 # Sometimes we need to store a partial sequence to obtain the commands' full
 # name. Such is the case of `gD`, for example.
 def get_partial_sequence(view) -> str:
-    return get_session_view_value(view, 'partial_sequence', '')
+    return get_command_state(view).partial_sequence
 
 
 def set_partial_sequence(view, value: str) -> None:
-    set_session_view_value(view, 'partial_sequence', value)
+    get_command_state(view).partial_sequence = value
 
 
 # Indicate whether nv_process_notation is running.
@@ -297,21 +356,35 @@ def set_processing_notation(view, value: bool) -> None:
     return set_session_view_value(view, 'processing_notation', value)
 
 
+# Indicate whether the edits to the view are being glued into one undo step,
+# e.g. while a macro is played back, see glue_undo_groups(). Unlike processing
+# notation, it doesn't change how repeat data is captured.
+#
+# This property is *VOLATILE*; it shouldn't be persisted between sessions.
+def is_gluing_undo_groups(view) -> bool:
+    return get_session_view_value(view, 'gluing_undo_groups', False)
+
+
+def set_gluing_undo_groups(view, value: bool) -> None:
+    set_session_view_value(view, 'gluing_undo_groups', value)
+
+
 def get_register(view) -> str:
-    return get_session_view_value(view, 'register', '"')
+    return get_command_state(view).register
 
 
 def set_register(view, value: str) -> None:
-    set_session_view_value(view, 'register', value)
-    set_capture_register(view, False)
+    state = get_command_state(view)
+    state.register = value
+    state.capture_register = False
 
 
 def get_capture_register(view) -> bool:
-    return get_session_view_value(view, 'capture_register', False)
+    return get_command_state(view).capture_register
 
 
 def set_capture_register(view, value: bool) -> None:
-    set_session_view_value(view, 'capture_register', value)
+    get_command_state(view).capture_register = value
 
 
 def get_xpos(view) -> int:
@@ -322,7 +395,7 @@ def set_xpos(view, value: int) -> None:
     set_session_view_value(view, 'xpos', value)
 
 
-def set_repeat_data(view, data) -> None:
+def set_repeat_data(view, data, command: dict = None) -> None:
     # :param data:
     #   The repeat data.
     #   A tuple or list.
@@ -352,13 +425,22 @@ def set_repeat_data(view, data) -> None:
     #   ( "vi", "x", "mode_normal", (0, 4, "mode_visual") )
     #   ( "native", ("sequence", {"commands": [["insert", {"characters": "fizz"}], ["left_delete", None]]}), "mode_insert", None )  # noqa: 501
     #
+    # :param command:
+    #   The translated command of a "vi" repeat, if it can be replayed without
+    #   feeding the keys again. See evaluate_state().
+    #
     set_session_view_value(view, 'repeat_data', data)
+    set_session_view_value(view, 'repeat_command', command)
 
 
 def get_repeat_data(view):
     return get_session_view_value(view, 'repeat_data')
 
 
+def get_repeat_command(view):
+    return get_session_view_value(view, 'repeat_command')
+
+
 # Some commands gather input through input panels. An input panel is a view,
 # but when it's closed, the previous view gets activated and init code runs.
 # This setting can be used to inhibit running the init code when activated.
@@ -371,15 +453,15 @@ def set_reset_during_init(view, value: bool) -> None:
 
 
 def get_sequence(view) -> str:
-    return get_session_view_value(view, 'sequence', '')
+    return get_command_state(view).sequence
 
 
 def set_sequence(view, value: str) -> None:
-    set_session_view_value(view, 'sequence', value)
+    get_command_state(view).sequence = value
 
 
 def append_sequence(view, value: str) -> None:
-    set_sequence(view, get_sequence(view) + value)
+    get_command_state(view).sequence += value
 
 
 # Indicate that editing commands should be grouped together. They should be
@@ -15,13 +15,19 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from threading import Event
+from threading import Lock
+from threading import Thread
 import sys
 import traceback
 
 from sublime import platform
 from sublime import Region
+from sublime import set_timeout
 
 from NeoVintageous.nv.polyfill import set_selection
+from NeoVintageous.nv.polyfill import status_message
+from NeoVintageous.nv.settings import get_setting
 
 if sys.platform.startswith('win') and platform() == 'windows':
     from NeoVintageous.nv import shell_windows as _shell
@@ -32,6 +38,9 @@ elif sys.platform.startswith('darwin') and platform() == 'osx':
 else:
     raise ImportError('no os specific module found')
 
+# The running background filter of each view, see _filter_thru_shell_async().
+_filters = {}  # type: dict
+
 
 def open(view) -> None:
     try:
@@ -49,14 +58,29 @@ def read(view, cmd: str) -> str:
     return ''
 
 
+def _is_async_filter(view, regions) -> bool:
+    size = get_setting(view, 'shell_filter_async_size')
+    if size is None:
+        return False
+
+    return sum(r.size() for r in regions) >= size
+
+
 def filter_thru_shell(view, edit, regions, cmd: str) -> None:
+    if _is_async_filter(view, regions):
+        return _filter_thru_shell_async(view, regions, cmd)
+
+    replace_filtered_regions(view, edit, regions, [_shell.filter_region(view, view.substr(r), cmd) for r in regions])
+
+
+def replace_filtered_regions(view, edit, regions, outputs: list) -> None:
     # Maintain text size delta as we replace each selection going forward. We
     # can't simply go in reverse because cursor positions will be incorrect.
     accumulated_delta = 0
     new_points = []
-    for r in regions:
+    for r, output in zip(regions, outputs):
         r_shifted = Region(r.begin() + accumulated_delta, r.end() + accumulated_delta)
-        rv = _shell.filter_region(view, view.substr(r_shifted), cmd).rstrip() + '\n'
+        rv = output.rstrip() + '\n'
         view.replace(edit, r_shifted, rv)
         new_points.append(r_shifted.a)
         accumulated_delta += len(rv) - r_shifted.size()
@@ -64,3 +88,96 @@ def filter_thru_shell(view, edit, regions, cmd: str) -> None:
     # Switch to normal mode and move cursor(s) to beginning of replacement(s).
     view.run_command('nv_enter_normal_mode')
     set_selection(view, new_points)
+
+
+def is_filtering(view) -> bool:
+    return view.id() in _filters
+
+
+def cancel_filter(view) -> None:
+    try:
+        _filters.pop(view.id())['cancelled'].set()
+    except KeyError:
+        pass
+    else:
+        view.erase_status('vim-filter')
+        status_message('Interrupted')
+
+
+# Filter the regions on worker threads, one per region, and replace them in a
+# single edit when all of them are done. The buffer is left untouched if the
+# filter is cancelled, see cancel_filter(), fails, or the buffer is changed
+# meanwhile.
+def _filter_thru_shell_async(view, regions, cmd: str) -> None:
+    cancel_filter(view)
+    view.run_command('nv_enter_normal_mode')
+
+    # Everything is read from the view here: the workers don't access it.
+    regions = [Region(r.begin(), r.end()) for r in regions]
+    texts = [view.substr(r) for r in regions]
+    filter_cmd = _shell.build_filter_cmd(view, cmd)
+    outputs = [None] * len(regions)  # type: list
+    errors = [None] * len(regions)  # type: list
+    progress = [0.0] * len(regions)
+    lock = Lock()
+
+    job = {
+        'cancelled': Event(),
+        'change_count': view.change_count(),
+        'remaining': len(regions),
+    }
+
+    _filters[view.id()] = job
+
+    def on_done() -> None:
+        if _filters.get(view.id()) is not job:
+            return
+
+        del _filters[view.id()]
+        view.erase_status('vim-filter')
+
+        if not view.is_valid():
+            return
+
+        if job['cancelled'].is_set():
+            return status_message('Interrupted')
+
+        for error in errors:
+            if error:
+                return status_message('Filter failed: %s', str(error) or error.__class__.__name__)
+
+        if view.change_count() != job['change_count']:
+            return status_message('Buffer changed while filtering, output discarded')
+
+        view.run_command('nv_view', {
+            'action': 'replace_filtered_regions',
+            'regions': [(r.a, r.b) for r in regions],
+            'outputs': outputs
+        })
+
+    def run(i: int) -> None:
+        def on_progress(written: int, total: int) -> None:
+            progress[i] = written / total
+
+        try:
+            outputs[i] = _shell.filter_region_streamed(filter_cmd, texts[i], job['cancelled'], on_progress)
+        except Exception as e:
+            traceback.print_exc()
+            errors[i] = e
+
+        with lock:
+            job['remaining'] -= 1
+            if job['remaining'] == 0:
+                set_timeout(on_done)
+
+    def show_progress() -> None:
+        if _filters.get(view.id()) is job:
+            done = sum(p * len(text) for p, text in zip(progress, texts))
+            total = sum(len(text) for text in texts) or 1
+            view.set_status('vim-filter', 'Filtering {}%'.format(int(done * 100 / total)))
+            set_timeout(show_progress, 100)
+
+    for i in range(len(regions)):
+        Thread(target=run, args=(i,), daemon=True).start()
+
+    show_progress()
@@ -28,3 +28,11 @@ def read(view, cmd: str) -> str:
 
 def filter_region(view, text: str, cmd: str) -> str:
     return shell_unixlike.filter_region(view, text, cmd)
+
+
+def build_filter_cmd(view, cmd: str) -> list:
+    return shell_unixlike.build_filter_cmd(view, cmd)
+
+
+def filter_region_streamed(filter_cmd: list, text: str, cancelled, on_progress=None):
+    return shell_unixlike.filter_region_streamed(filter_cmd, text, cancelled, on_progress)
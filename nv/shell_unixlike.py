@@ -16,11 +16,15 @@
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
+import signal
 import subprocess
+import threading
 
 from NeoVintageous.nv.settings import get_setting
 from NeoVintageous.nv.utils import build_shell_cmd
 
+_CHUNK_SIZE = 65536
+
 
 def open(view) -> None:
     term = get_setting(view, 'terminal', os.environ.get('TERM'))
@@ -56,3 +60,78 @@ def filter_region(view, text: str, cmd: str) -> str:
     out, _ = p.communicate(text.encode('utf-8'))
 
     return out.decode('utf-8', errors='backslashreplace')
+
+
+def build_filter_cmd(view, cmd: str) -> list:
+    return build_shell_cmd(view, cmd)
+
+
+def filter_region_streamed(filter_cmd: list, text: str, cancelled: threading.Event, on_progress=None):
+    # Like filter_region(), but STDIN and STDOUT are streamed in chunks so that
+    # it can run on a worker thread without holding the whole output twice.
+    # The view isn't accessed, see build_filter_cmd().
+    #
+    # Args:
+    #   :filter_cmd (list): The command, see build_filter_cmd().
+    #   :cancelled (threading.Event): The process is killed when it's set.
+    #   :on_progress (callable): Called with the number of bytes written so far
+    #       and the total number of bytes.
+    #
+    # Returns:
+    #   str|None: None if cancelled.
+    p = subprocess.Popen(filter_cmd,
+                         stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE,
+                         stderr=subprocess.STDOUT,
+                         start_new_session=True)
+
+    data = text.encode('utf-8')
+
+    def write() -> None:
+        try:
+            for i in range(0, len(data), _CHUNK_SIZE):
+                if cancelled.is_set():
+                    break
+
+                p.stdin.write(data[i:i + _CHUNK_SIZE])
+                if on_progress:
+                    on_progress(min(i + _CHUNK_SIZE, len(data)), len(data))
+        except OSError:
+            # The process exited without reading all of its input.
+            pass
+        finally:
+            try:
+                p.stdin.close()
+            except OSError:
+                pass
+
+    out = []  # type: list
+
+    def read() -> None:
+        for chunk in iter(lambda: p.stdout.read1(_CHUNK_SIZE), b''):
+            out.append(chunk)
+
+    writer = threading.Thread(target=write, daemon=True)
+    reader = threading.Thread(target=read, daemon=True)
+    writer.start()
+    reader.start()
+
+    while reader.is_alive():
+        if cancelled.wait(0.05):
+            # Kill the whole process group: the children of the shell, e.g. in
+            # a pipeline, would otherwise keep STDOUT open.
+            try:
+                os.killpg(p.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            break
+
+    reader.join()
+    writer.join()
+    p.stdout.close()
+    p.wait()
+
+    if cancelled.is_set():
+        return None
+
+    return b''.join(out).decode('utf-8', errors='backslashreplace')
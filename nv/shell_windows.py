@@ -62,6 +62,10 @@ def read(view, cmd: str) -> str:
 
 
 def filter_region(view, txt: str, cmd: str) -> str:
+    return _filter_region(txt, cmd)
+
+
+def _filter_region(txt: str, cmd: str) -> str:
     try:
         contents = tempfile.NamedTemporaryFile(suffix='.txt', delete=False)
         contents.write(txt.encode('utf-8'))
@@ -90,6 +94,21 @@ def filter_region(view, txt: str, cmd: str) -> str:
         os.remove(contents.name)
 
 
+def build_filter_cmd(view, cmd: str) -> str:
+    return cmd
+
+
+# The text is passed to the command through a temporary file, so it's not
+# streamed, but it still runs on the worker thread it's called from. The view
+# isn't accessed, see build_filter_cmd().
+def filter_region_streamed(filter_cmd: str, txt: str, cancelled, on_progress=None):
+    out = _filter_region(txt, filter_cmd)
+    if cancelled.is_set():
+        return None
+
+    return out
+
+
 def _get_startup_info():
     # Hide the child process window.
     startupinfo = subprocess.STARTUPINFO()
@@ -15,21 +15,27 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from copy import copy
+from copy import deepcopy
 import logging
 
 from sublime import active_window
 
 from NeoVintageous.nv import macros
-from NeoVintageous.nv import plugin
 from NeoVintageous.nv.macros import add_macro_step
 from NeoVintageous.nv.polyfill import run_window_command
-from NeoVintageous.nv.session import get_session_view_value
-from NeoVintageous.nv.session import set_session_view_value
+from NeoVintageous.nv.profiler import RESET_COMMAND_DATA
+from NeoVintageous.nv.profiler import RUN_COMMAND
+from NeoVintageous.nv.profiler import TRANSLATE
+from NeoVintageous.nv.profiler import profiling
+from NeoVintageous.nv.session import get_command_state
+from NeoVintageous.nv.settings import get_count
 from NeoVintageous.nv.settings import get_glue_until_normal_mode
 from NeoVintageous.nv.settings import get_mode
 from NeoVintageous.nv.settings import get_reset_during_init
 from NeoVintageous.nv.settings import get_sequence
 from NeoVintageous.nv.settings import get_setting
+from NeoVintageous.nv.settings import is_gluing_undo_groups
 from NeoVintageous.nv.settings import is_interactive
 from NeoVintageous.nv.settings import is_processing_notation
 from NeoVintageous.nv.settings import set_action_count
@@ -46,9 +52,10 @@ from NeoVintageous.nv.utils import get_visual_repeat_data
 from NeoVintageous.nv.utils import is_view
 from NeoVintageous.nv.utils import save_previous_selection
 from NeoVintageous.nv.utils import update_xpos
-from NeoVintageous.nv.vi import cmd_defs
 from NeoVintageous.nv.vi.cmd_base import ViMotionDef
 from NeoVintageous.nv.vi.cmd_base import ViOperatorDef
+from NeoVintageous.nv.vi.cmd_defs import ViRepeatCharSearchBackward
+from NeoVintageous.nv.vi.cmd_defs import ViRepeatCharSearchForward
 from NeoVintageous.nv.vi.cmd_defs import ViToggleMacroRecorder
 from NeoVintageous.nv.vim import INSERT
 from NeoVintageous.nv.vim import INTERNAL_NORMAL
@@ -159,39 +166,40 @@ def _scroll_into_active_view() -> None:
             _scroll_into_view(view, get_mode(view))
 
 
-def _create_definition(view, name: str):
-    cmd = get_session_view_value(view, name)
-    if cmd:
-        cls = getattr(cmd_defs, cmd['name'], None)
+def _copy_definition(current, value):
+    # Command definitions are registered as shared instances, so the stored
+    # command needs to be a copy of them, otherwise the input collected by a
+    # command e.g. the "x" in "fx" would leak into subsequent commands.
+    if value is None or value is current:
+        return value
 
-        if cls is None:
-            cls = plugin.classes.get(cmd['name'], None)
-
-            if cls is None:
-                raise ValueError('unknown %s: %s' % (name, cmd))
-
-        return cls.from_json(cmd['data'])
+    return copy(value)
 
 
 def get_action(view):
-    return _create_definition(view, 'action')
+    return get_command_state(view).action
 
 
 def set_action(view, value) -> None:
-    serialized = value.serialize() if value else None
-    set_session_view_value(view, 'action', serialized)
+    state = get_command_state(view)
+    state.action = _copy_definition(state.action, value)
 
 
 def get_motion(view):
-    return _create_definition(view, 'motion')
+    return get_command_state(view).motion
 
 
 def set_motion(view, value) -> None:
-    serialized = value.serialize() if value else None
-    set_session_view_value(view, 'motion', serialized)
+    state = get_command_state(view)
+    state.motion = _copy_definition(state.motion, value)
 
 
 def reset_command_data(view) -> None:
+    with profiling(view, RESET_COMMAND_DATA):
+        _reset_command_data(view)
+
+
+def _reset_command_data(view) -> None:
     # Resets all temp data needed to build a command or partial command.
     motion = get_motion(view)
     action = get_action(view)
@@ -268,8 +276,9 @@ def evaluate_state(view) -> None:
         # example the motion commands can be used after an operator command,
         # to have the command operate on the text that was moved over.
 
-        action_cmd = action.translate(view)
-        motion_cmd = motion.translate(view)
+        with profiling(view, TRANSLATE):
+            action_cmd = action.translate(view)
+            motion_cmd = motion.translate(view)
 
         _log.debug('action: %s', action_cmd)
         _log.debug('motion: %s', motion_cmd)
@@ -290,15 +299,18 @@ def evaluate_state(view) -> None:
         # don't need to worry about grouping edits to the buffer.
         args['motion'] = motion_cmd
 
-        if get_glue_until_normal_mode(view) and not is_processing_notation(view):
+        if get_glue_until_normal_mode(view) and not is_processing_notation(view) and not is_gluing_undo_groups(view):
             run_window_command('mark_undo_groups_for_gluing')
 
         add_macro_step(view, action_cmd['action'], args)
 
-        run_window_command(action_cmd['action'], args)
+        repeat_command = _get_repeat_command(view, action, motion, action_cmd, motion_cmd['motion_args'])
+
+        with profiling(view, RUN_COMMAND, action_cmd['action']):
+            run_window_command(action_cmd['action'], args)
 
         if is_interactive(view) and get_action(view).repeatable:
-            set_repeat_data(view, ('vi', str(get_sequence(view)), get_mode(view), None))
+            set_repeat_data(view, ('vi', str(get_sequence(view)), get_mode(view), None), repeat_command)
 
         reset_command_data(view)
 
@@ -308,16 +320,19 @@ def evaluate_state(view) -> None:
 
         # Evaluate motion: Run it.
 
-        motion_cmd = motion.translate(view)
+        with profiling(view, TRANSLATE):
+            motion_cmd = motion.translate(view)
 
         _log.debug('motion: %s', motion_cmd)
 
         add_macro_step(view, motion_cmd['motion'], motion_cmd['motion_args'])
 
-        run_motion(view, motion_cmd)
+        with profiling(view, RUN_COMMAND, motion_cmd['motion']):
+            run_motion(view, motion_cmd)
 
     if action:
-        action_cmd = action.translate(view)
+        with profiling(view, TRANSLATE):
+            action_cmd = action.translate(view)
 
         _log.debug('action: %s', action_cmd)
 
@@ -340,7 +355,7 @@ def evaluate_state(view) -> None:
         # grouped atomically, but not inside a sequence like
         # iXXX<Esc>llaYYY<Esc>, where we want to group the whole sequence
         # instead.
-        if get_glue_until_normal_mode(view) and not is_processing_notation(view):
+        if get_glue_until_normal_mode(view) and not is_processing_notation(view) and not is_gluing_undo_groups(view):
             run_window_command('mark_undo_groups_for_gluing')
 
         sequence = get_sequence(view)
@@ -349,10 +364,16 @@ def evaluate_state(view) -> None:
 
         add_macro_step(view, action_cmd['action'], action_cmd['action_args'])
 
-        run_action(active_window(), action_cmd)
+        if action.repeatable and not visual_repeat_data:
+            repeat_command = _get_repeat_command(view, action, None, action_cmd, action_cmd['action_args'])
+        else:
+            repeat_command = None
+
+        with profiling(view, RUN_COMMAND, action_cmd['action']):
+            run_action(active_window(), action_cmd)
 
         if not (is_processing_notation(view) and get_glue_until_normal_mode(view)) and action.repeatable:
-            set_repeat_data(view, ('vi', sequence, get_mode(view), visual_repeat_data))
+            set_repeat_data(view, ('vi', sequence, get_mode(view), visual_repeat_data), repeat_command)
 
     if get_mode(view) == INTERNAL_NORMAL:
         set_mode(view, NORMAL)
@@ -360,6 +381,76 @@ def evaluate_state(view) -> None:
     reset_command_data(view)
 
 
+def _get_repeat_command(view, action: ViOperatorDef, motion: ViMotionDef, action_cmd: dict, count_args: dict):
+    # Capture a translated command so that "." can replay it directly instead
+    # of feeding its keys again. See run_repeat_command().
+    #
+    # Args:
+    #   :count_args (dict): The args that hold the count of the command.
+    #
+    # Returns:
+    #   dict|None: None if the command can only be repeated by its keys, for
+    #       example commands that collect input or enter insert mode, or whose
+    #       motion is translated from state that can change before the repeat.
+    if get_mode(view) != INTERNAL_NORMAL or action.glue_until_normal_mode:
+        return None
+
+    # The ";" and "," motions search for the last searched character at the
+    # time of the repeat, not at the time of the command.
+    if isinstance(motion, (ViRepeatCharSearchForward, ViRepeatCharSearchBackward)):
+        return None
+
+    for command in (action, motion):
+        if command and command.input_parser and command.input_parser.is_panel():
+            return None
+
+    if count_args.get('count') != get_count(view):
+        return None
+
+    return {
+        'action': action_cmd['action'],
+        'action_args': deepcopy(action_cmd['action_args']),
+        'updates_xpos': _must_update_xpos(motion, action),
+        'scroll_into_view': _should_scroll_into_view(motion, action),
+    }
+
+
+def run_repeat_command(view, command: dict, count: int = None) -> dict:
+    # Replay a command captured by evaluate_state() for ".". Like in Vim, a
+    # count replaces the count of the command, for example "3." after "d2w"
+    # deletes three words, and is used by subsequent repeats.
+    #
+    # Args:
+    #   :command (dict): See _get_repeat_command().
+    #   :count (int):
+    #
+    # Returns:
+    #   dict: The command that was run.
+    if count:
+        command = deepcopy(command)
+        args = command['action_args']
+        if 'motion' in args:
+            args['motion']['motion_args']['count'] = count
+        else:
+            args['count'] = count
+
+    set_mode(view, INTERNAL_NORMAL)
+
+    with profiling(view, RUN_COMMAND, command['action']):
+        run_window_command(command['action'], command['action_args'])
+
+    if get_mode(view) == INTERNAL_NORMAL:
+        set_mode(view, NORMAL)
+
+    if command['updates_xpos']:
+        update_xpos(view)
+
+    if command['scroll_into_view']:
+        _scroll_into_active_view()
+
+    return command
+
+
 def _should_reset_mode(view, mode: str) -> bool:
     return mode == UNKNOWN or get_setting(view, 'reset_mode_when_switching_tabs')
 
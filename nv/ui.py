@@ -91,10 +91,21 @@ def _ui_bell(*msg: str) -> None:
         do_blink()
 
 
+# The number of times the bell has been rung. Errors ring the bell, so callers
+# can tell whether a command failed by comparing the count before and after.
+_bell_count = 0
+
+
 def ui_bell(*args: str) -> None:
+    global _bell_count
+    _bell_count += 1
     _ui_bell(*args)
 
 
+def ui_bell_count() -> int:
+    return _bell_count
+
+
 _REGION_FLAGS = {
     'fill': DRAW_NO_OUTLINE,
     'outline': DRAW_NO_FILL,
@@ -52,7 +52,10 @@ from NeoVintageous.nv.polyfill import spell_undo
 from NeoVintageous.nv.settings import get_cmdline_cwd
 from NeoVintageous.nv.settings import get_mode
 from NeoVintageous.nv.settings import get_setting
+from NeoVintageous.nv.settings import get_view_setting
 from NeoVintageous.nv.settings import get_visual_block_direction
+from NeoVintageous.nv.settings import is_gluing_undo_groups
+from NeoVintageous.nv.settings import set_gluing_undo_groups
 from NeoVintageous.nv.settings import set_mode
 from NeoVintageous.nv.settings import set_processing_notation
 from NeoVintageous.nv.settings import set_visual_block_direction
@@ -74,13 +77,11 @@ def is_view(view) -> bool:
     if not isinstance(view, View):
         return False
 
-    settings = view.settings()
-
-    if settings.get('is_widget', False):
+    if get_view_setting(view, 'is_widget', False):
         return False
 
     # Useful for plugins to disable NeoVintageous for specific views.
-    if settings.get('__vi_external_disable', False):
+    if get_view_setting(view, '__vi_external_disable', False):
         return False
 
     return True
@@ -358,17 +359,28 @@ def gluing_undo_groups(view):
     set_processing_notation(view, True)
     view.run_command('mark_undo_groups_for_gluing')
 
-    yield
-
-    view.run_command('glue_marked_undo_groups')
-    set_processing_notation(view, False)
+    try:
+        yield
+    finally:
+        view.run_command('glue_marked_undo_groups')
+        set_processing_notation(view, False)
 
 
 @contextmanager
 def glue_undo_groups(view):
+    # Nested edits that would glue their own undo groups, like an insert, and
+    # nested calls are glued by the outermost call instead.
+    if is_gluing_undo_groups(view):
+        yield
+        return
+
+    set_gluing_undo_groups(view, True)
     view.run_command('mark_undo_groups_for_gluing')
-    yield
-    view.run_command('glue_marked_undo_groups')
+    try:
+        yield
+    finally:
+        view.run_command('glue_marked_undo_groups')
+        set_gluing_undo_groups(view, False)
 
 
 @contextmanager
@@ -69,3 +69,12 @@ def set(name: str, value: str) -> None:
 
 def clear_variables() -> None:
     _variables.clear()
+
+
+def dump_variables() -> dict:
+    return dict(_variables)
+
+
+def load_variables(variables: dict) -> None:
+    _variables.clear()
+    _variables.update(variables)
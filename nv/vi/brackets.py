@@ -0,0 +1,149 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+# An index of the unescaped brackets of a view, built in one pass and rebuilt
+# when the view changes.
+#
+# The brackets of a pair are indexed by nesting depth: an opening bracket is
+# filed under the depth after it, and a closing bracket under the depth before
+# it. The innermost opening bracket enclosing a point is then the last one at
+# or before the point that is filed under the depth at the point, and likewise
+# for the closing bracket, so lookups are binary searches. Unbalanced closing
+# brackets make the depth negative, which makes them enclose everything before
+# them, as unbalanced opening brackets enclose everything after them.
+
+from bisect import bisect_left
+from bisect import bisect_right
+import re
+
+from NeoVintageous.nv.polyfill import view_to_str
+from NeoVintageous.nv.session import get_bracket_index_cache
+from NeoVintageous.nv.settings import get_setting
+
+# Brackets in these scopes are ignored if the
+# "vintageous_brackets_ignore_strings_and_comments" setting is enabled.
+_IGNORED_SCOPES = 'string, comment'
+
+
+def _build_index(view, opening: str, closing: str, ignore_strings_and_comments: bool) -> dict:
+    # A bracket preceded by a backslash is escaped.
+    pattern = re.compile('(?<!\\\\)[{}]'.format(re.escape(opening + closing)))
+
+    ignored = []  # type: list
+    if ignore_strings_and_comments:
+        for region in view.find_by_selector(_IGNORED_SCOPES):
+            ignored.append(region.begin())
+            ignored.append(region.end())
+
+    positions = []  # type: list
+    depths = []  # type: list
+    is_opening = []  # type: list
+    openings = {}  # type: dict
+    closings = {}  # type: dict
+    depth = 0
+    for match in pattern.finditer(view_to_str(view)):
+        pt = match.start()
+
+        # The ignored regions are sorted, so the point is in one of them if
+        # there is an odd number of region boundaries at or before it.
+        if ignored and bisect_right(ignored, pt) % 2:
+            continue
+
+        if match.group() == opening:
+            depth += 1
+            openings.setdefault(depth, []).append(pt)
+            is_opening.append(True)
+        else:
+            closings.setdefault(depth, []).append(pt)
+            depth -= 1
+            is_opening.append(False)
+
+        positions.append(pt)
+        depths.append(depth)
+
+    return {
+        'positions': positions,
+        'depths': depths,
+        'is_opening': is_opening,
+        'openings': openings,
+        'closings': closings,
+    }
+
+
+def _get_index(view, opening: str, closing: str) -> dict:
+    ignore_strings_and_comments = bool(get_setting(view, 'brackets_ignore_strings_and_comments'))
+    key = (opening, closing, ignore_strings_and_comments)
+    cache = get_bracket_index_cache(view)
+    change_count = view.change_count()
+
+    try:
+        cached_change_count, index = cache[key]
+        if cached_change_count == change_count:
+            return index
+    except KeyError:
+        pass
+
+    index = _build_index(view, opening, closing, ignore_strings_and_comments)
+    cache[key] = (change_count, index)
+
+    return index
+
+
+def _get_depth(index: dict, pt: int) -> int:
+    # The depth inside a bracket at pt, or after the brackets before pt.
+    positions = index['positions']
+    i = bisect_left(positions, pt)
+    if i < len(positions) and positions[i] == pt and index['is_opening'][i]:
+        return index['depths'][i]
+
+    return index['depths'][i - 1] if i > 0 else 0
+
+
+def find_enclosing_opening_bracket(view, pt: int, opening: str, closing: str, count: int = 1):
+    # Find the opening bracket of the count-th bracket pair enclosing pt. A
+    # bracket at pt encloses pt.
+    #
+    # Args:
+    #   :opening (str): The opening bracket character.
+    #   :closing (str): The closing bracket character.
+    #
+    # Returns:
+    #   int|None: The point of the bracket.
+    index = _get_index(view, opening, closing)
+    openings = index['openings'].get(_get_depth(index, pt) - count + 1)
+    if openings:
+        i = bisect_right(openings, pt)
+        if i > 0:
+            return openings[i - 1]
+
+    return None
+
+
+def find_enclosing_closing_bracket(view, pt: int, opening: str, closing: str, count: int = 1):
+    # Find the closing bracket of the count-th bracket pair enclosing pt. A
+    # bracket at pt encloses pt.
+    #
+    # Returns:
+    #   int|None: The point of the bracket.
+    index = _get_index(view, opening, closing)
+    closings = index['closings'].get(_get_depth(index, pt) - count + 1)
+    if closings:
+        i = bisect_left(closings, pt)
+        if i < len(closings):
+            return closings[i]
+
+    return None
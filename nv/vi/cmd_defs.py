@@ -947,7 +947,12 @@ class ViRepeat(ViOperatorDef):
     def init(self):
         self.updates_xpos = True
         self.scroll_into_view = True
-        self.command = 'nv_vi_dot'
+
+    def translate(self, view):
+        # A count of 0 means no count, so that "1." can be told apart from ".".
+        return translate_action(view, 'nv_vi_dot', {
+            'count': get_count(view, default=0)
+        })
 
 
 @assign(seqs.CTRL_Y, ACTION_MODES)
@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import namedtuple
 import re
 
 from NeoVintageous.nv import variables
@@ -28,14 +29,44 @@ from NeoVintageous.nv.vim import VISUAL_BLOCK
 from NeoVintageous.nv.vim import VISUAL_LINE
 
 
+_Deferred = namedtuple('_Deferred', 'cls args kwargs')
+
+
+class DeferredDefs(dict):
+    """
+    A mapping of key sequences to command definitions.
+
+    Definitions are registered as deferred and instantiated on their first
+    lookup, so registering the ~300 command definitions at startup doesn't
+    instantiate any of them.
+    """
+
+    def defer(self, seq: str, cls, args: tuple, kwargs: dict) -> None:
+        dict.__setitem__(self, seq, _Deferred(cls, args, kwargs))
+
+    def __getitem__(self, seq: str):
+        value = dict.__getitem__(self, seq)
+        if isinstance(value, _Deferred):
+            value = value.cls(*value.args, **value.kwargs)
+            dict.__setitem__(self, seq, value)
+
+        return value
+
+    def get(self, seq: str, default=None):
+        try:
+            return self[seq]
+        except KeyError:
+            return default
+
+
 mappings = {
-    INSERT: {},
-    NORMAL: {},
-    OPERATOR_PENDING: {},
-    SELECT: {},
-    VISUAL: {},
-    VISUAL_BLOCK: {},
-    VISUAL_LINE: {}
+    INSERT: DeferredDefs(),
+    NORMAL: DeferredDefs(),
+    OPERATOR_PENDING: DeferredDefs(),
+    SELECT: DeferredDefs(),
+    VISUAL: DeferredDefs(),
+    VISUAL_BLOCK: DeferredDefs(),
+    VISUAL_LINE: DeferredDefs()
 }  # type: dict
 
 
@@ -251,7 +282,8 @@ def assign(seq: str, modes, *args, **kwargs):
     The registered key sequence must be known to NeoVintageous. The
     registered command must be a ViMotionDef or ViOperatorDef.
 
-    The decorated class is instantiated with `*args` and `**kwargs`.
+    The decorated class is instantiated with `*args` and `**kwargs` the
+    first time the sequence is looked up.
 
     @keys
       A list of (`mode:tuple`, `sequence:string`) pairs to map the decorated
@@ -259,6 +291,6 @@ def assign(seq: str, modes, *args, **kwargs):
     """
     def inner(cls):
         for mode in modes:
-            mappings[mode][seq] = cls(*args, **kwargs)
+            mappings[mode].defer(seq, cls, args, kwargs)
         return cls
     return inner
@@ -18,6 +18,9 @@
 from sublime import Region
 
 from NeoVintageous.nv.options import get_option
+from NeoVintageous.nv.polyfill import view_rfind_in_range
+from NeoVintageous.nv.search import bisect_occurrences
+from NeoVintageous.nv.search import get_cached_search_occurrences
 
 
 # DEPRECATED Use view_find_in_range()
@@ -53,8 +56,10 @@ def find_wrapping(view, term: str, start: int, end: int, flags: int = 0, times:
     except IndexError:
         return
 
+    occurrences = get_cached_search_occurrences(view, term, flags)
+
     for x in range(times):
-        match = find_in_range(view, term, start, end, flags)
+        match = _find_in_range(view, occurrences, term, start, end, flags)
         # make sure we wrap around the end of the buffer
         if not match:
             if not get_option(view, 'wrapscan'):
@@ -66,7 +71,7 @@ def find_wrapping(view, term: str, start: int, end: int, flags: int = 0, times:
             # See https://github.com/NeoVintageous/NeoVintageous/issues/223.
             end = current_sel.a
             end = view.word(current_sel.a).b
-            match = find_in_range(view, term, start, end, flags)
+            match = _find_in_range(view, occurrences, term, start, end, flags)
             if not match:
                 return
 
@@ -81,9 +86,11 @@ def reverse_find_wrapping(view, term: str, start: int, end: int, flags: int = 0,
     except IndexError:
         return
 
+    occurrences = get_cached_search_occurrences(view, term, flags)
+
     # Search wrapping around the end of the buffer.
     for x in range(times):
-        match = reverse_search(view, term, start, end, flags)
+        match = _reverse_search(view, occurrences, term, start, end, flags)
         # Start searching in the lower half of the buffer if we aren't doing it yet.
         if not match and start <= current_sel.b:
             if not get_option(view, 'wrapscan'):
@@ -94,7 +101,7 @@ def reverse_find_wrapping(view, term: str, start: int, end: int, flags: int = 0,
             # See https://github.com/NeoVintageous/NeoVintageous/issues/223.
             start = view.word(current_sel.b).a
             end = view.size()
-            match = reverse_search(view, term, start, end, flags)
+            match = _reverse_search(view, occurrences, term, start, end, flags)
             if not match:
                 return
         # No luck in the whole buffer.
@@ -106,16 +113,41 @@ def reverse_find_wrapping(view, term: str, start: int, end: int, flags: int = 0,
     return match
 
 
-def find_last_in_range(view, term: str, start: int, end: int, flags: int = 0):
-    found = find_in_range(view, term, start, end, flags)
-    last_found = found
-    while found:
-        found = find_in_range(view, term, found.b, end, flags)
-        if not found or found.b > end:
-            break
-        last_found = found if found else last_found
+# Like find_in_range(), but resolved by bisection when the occurrences of the
+# term are cached, see get_cached_search_occurrences().
+def _find_in_range(view, occurrences, term: str, start: int, end: int, flags: int):
+    if occurrences is not None:
+        i = bisect_occurrences(occurrences, start)
+
+        # The cached occurrence is only the match a search from the start would
+        # find if the previous occurrence doesn't overlap the start.
+        if i == 0 or occurrences[i - 1].b <= start:
+            if i < len(occurrences) and occurrences[i] and occurrences[i].b <= end:
+                return occurrences[i]
+
+            return None
+
+    return find_in_range(view, term, start, end, flags)
+
 
-    return last_found
+# Like reverse_search(), but resolved by bisection when the occurrences of the
+# term are cached, see get_cached_search_occurrences().
+def _reverse_search(view, occurrences, term: str, start: int, end: int, flags: int):
+    if occurrences is None:
+        return reverse_search(view, term, start, end, flags)
+
+    if start < 0 or end > view.size():
+        return None
+
+    # The last occurrence that ends at or before the end.
+    i = bisect_occurrences(occurrences, end + 1) - 1
+    if i >= 0 and occurrences[i].b > end:
+        i -= 1
+
+    if i >= 0 and occurrences[i].a >= view.line(start).a:
+        return occurrences[i]
+
+    return None
 
 
 # The @start position is linewise.
@@ -143,53 +175,11 @@ def reverse_search(view, term: str, start: int, end: int, flags: int = 0):
     if start < 0 or end > view.size():
         return None
 
-    lo_line = view.full_line(start)
-    hi_line = view.full_line(end)
-
-    while True:
-        low_row, hi_row = view.rowcol(lo_line.a)[0], view.rowcol(hi_line.a)[0]
-        middle_row = (low_row + hi_row) // 2
-
-        middle_line = view.full_line(view.text_point(middle_row, 0))
-
-        lo_region = Region(lo_line.a, middle_line.b)
-        hi_region = Region(middle_line.b, min(hi_line.b, end))
-
-        if find_in_range(view, term, hi_region.a, hi_region.b, flags):
-            lo_line = view.full_line(middle_line.b)
-        elif find_in_range(view, term, lo_region.a, lo_region.b, flags):
-            hi_line = view.full_line(middle_line.a)
-        else:
-            return None
-
-        if lo_line == hi_line:
-            # we found the line we were looking for, now extract the match.
-            return find_last_in_range(view, term, hi_line.a, min(hi_line.b, end), flags)
+    return view_rfind_in_range(view, term, view.line(start).a, end, flags)
 
 
 def reverse_search_by_pt(view, term: str, start: int, end: int, flags: int = 0):
     if start < 0 or end > view.size():
         return None
 
-    lo_line = view.full_line(start)
-    hi_line = view.full_line(end)
-
-    while True:
-        low_row, hi_row = view.rowcol(lo_line.a)[0], view.rowcol(hi_line.a)[0]
-        middle_row = (low_row + hi_row) // 2
-
-        middle_line = view.full_line(view.text_point(middle_row, 0))
-
-        lo_region = Region(lo_line.a, middle_line.b)
-        hi_region = Region(middle_line.b, min(hi_line.b, end))
-
-        if find_in_range(view, term, hi_region.a, hi_region.b, flags):
-            lo_line = view.full_line(middle_line.b)
-        elif find_in_range(view, term, lo_region.a, lo_region.b, flags):
-            hi_line = view.full_line(middle_line.a)
-        else:
-            return None
-
-        if lo_line == hi_line:
-            # we found the line we were looking for, now extract the match.
-            return find_last_in_range(view, term, max(hi_line.a, start), min(hi_line.b, end), flags)
+    return view_rfind_in_range(view, term, start, end, flags)
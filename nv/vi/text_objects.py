@@ -39,8 +39,11 @@ from NeoVintageous.nv.utils import next_non_blank
 from NeoVintageous.nv.utils import next_non_ws
 from NeoVintageous.nv.utils import prev_non_blank
 from NeoVintageous.nv.utils import prev_non_ws
+from NeoVintageous.nv.vi.brackets import find_enclosing_closing_bracket
+from NeoVintageous.nv.vi.brackets import find_enclosing_opening_bracket
 from NeoVintageous.nv.vi.search import find_in_range
 from NeoVintageous.nv.vi.search import reverse_search_by_pt
+from NeoVintageous.nv.vi.units import LineWindow
 from NeoVintageous.nv.vi.units import word_starts
 
 
@@ -456,109 +459,19 @@ def get_text_object_region(view, s: Region, text_object: str, inclusive: bool =
 
 
 def find_next_lone_bracket(view, start: int, items, unbalanced: int = 0):
-    # TODO: Extract common functionality from here and the % motion instead of
-    # duplicating code.
-    new_start = start
-    for i in range(unbalanced or 1):
-        next_closing_bracket = find_in_range(
-            view,
-            items[1],
-            start=new_start,
-            end=view.size(),
-            flags=IGNORECASE
-        )
-
-        if next_closing_bracket is None:
-            # Unbalanced items; nothing we can do.
-            return
-
-        while view.substr(next_closing_bracket.begin() - 1) == '\\':
-            next_closing_bracket = find_in_range(view, items[1],
-                                                 start=next_closing_bracket.end(),
-                                                 end=view.size(),
-                                                 flags=IGNORECASE)
-            if next_closing_bracket is None:
-                return
-
-        new_start = next_closing_bracket.end()
-
-    if view.substr(start) == items[0][-1]:
-        start += 1
-
-    nested = 0
-    while True:
-        next_opening_bracket = find_in_range(view, items[0],
-                                             start=start,
-                                             end=next_closing_bracket.b,
-                                             flags=IGNORECASE)
-        if not next_opening_bracket:
-            break
-
-        nested += 1
-        start = next_opening_bracket.end()
-
-    if nested > 0:
-        return find_next_lone_bracket(view, next_closing_bracket.end(),
-                                      items,
-                                      nested)
-    else:
-        return next_closing_bracket
+    # Find the closing bracket enclosing start. If unbalanced is given, find the
+    # closing bracket of the unbalanced-th enclosing bracket pair.
+    pt = find_enclosing_closing_bracket(view, start, items[0][-1], items[1][-1], unbalanced or 1)
+    if pt is not None:
+        return Region(pt, pt + 1)
 
 
 def find_prev_lone_bracket(view, start: int, tags, unbalanced: int = 0):
-    # TODO: Extract common functionality from here and the % motion instead of
-    # duplicating code.
-
-    # XXX: refactor this
-    if view.substr(start) == (tags[0][1] if len(tags[0]) > 1 else tags[0]):
-        if not unbalanced and view.substr(start - 1) != '\\':
-            return Region(start, start + 1)
-
-    new_start = start
-    for i in range(unbalanced or 1):
-        prev_opening_bracket = reverse_search_by_pt(view, tags[0],
-                                                    start=0,
-                                                    end=new_start,
-                                                    flags=IGNORECASE)
-
-        if prev_opening_bracket is None:
-            # Unbalanced tags; nothing we can do.
-            return
-
-        while view.substr(prev_opening_bracket.begin() - 1) == '\\':
-            prev_opening_bracket = reverse_search_by_pt(
-                view,
-                tags[0],
-                start=0,
-                end=prev_opening_bracket.begin(),
-                flags=IGNORECASE
-            )
-
-            if prev_opening_bracket is None:
-                return
-
-        new_start = prev_opening_bracket.begin()
-
-    nested = 0
-    while True:
-        next_closing_bracket = reverse_search_by_pt(view,
-                                                    tags[1],
-                                                    start=prev_opening_bracket.a,
-                                                    end=start,
-                                                    flags=IGNORECASE)
-        if not next_closing_bracket:
-            break
-
-        nested += 1
-        start = next_closing_bracket.begin()
-
-    if nested > 0:
-        return find_prev_lone_bracket(view,
-                                      prev_opening_bracket.begin(),
-                                      tags,
-                                      nested)
-    else:
-        return prev_opening_bracket
+    # Find the opening bracket enclosing start. If unbalanced is given, find the
+    # opening bracket of the unbalanced-th enclosing bracket pair.
+    pt = find_enclosing_opening_bracket(view, start, tags[0][-1], tags[1][-1], unbalanced or 1)
+    if pt is not None:
+        return Region(pt, pt + 1)
 
 
 def find_paragraph_text_object(view, s: Region, inclusive: bool = True, count: int = 1) -> Region:
@@ -568,9 +481,10 @@ def find_paragraph_text_object(view, s: Region, inclusive: bool = True, count: i
     # inner paragraph (the opposite).
     begin = None
     end = s.a
+    lines = LineWindow(view, end)
     for _ in range(count):
-        b1, e1 = find_inner_paragraph(view, end)
-        b2, end = find_inner_paragraph(view, e1) if inclusive else (b1, e1)
+        b1, e1 = find_inner_paragraph(view, end, lines)
+        b2, end = find_inner_paragraph(view, e1, lines) if inclusive else (b1, e1)
         if begin is None:
             begin = b1
 
@@ -637,7 +551,7 @@ def find_sentences_backward(view, start_pt: int, count: int = 1) -> Region:
     return sen
 
 
-def find_inner_paragraph(view, initial_loc):
+def find_inner_paragraph(view, initial_loc, lines: LineWindow = None):
     """
     Take a location, as an integer.
 
@@ -645,55 +559,74 @@ def find_inner_paragraph(view, initial_loc):
     corresponding to that location. An inner paragraph consists of a set of
     contiguous lines all having the same whitespace status (a line either
     consists entirely of whitespace characters or it does not).
+
+    A LineWindow can be passed to reuse the lines read by previous calls.
     """
+    if lines is None:
+        lines = LineWindow(view, initial_loc)
+
+    row = view.rowcol(initial_loc)[0]
+
     # Determine whether the initial point lies in an all-whitespace line.
-    def is_whitespace(region):
-        return len(view.substr(region).strip()) == 0
+    def is_whitespace(row):
+        return len(lines.text(row).strip()) == 0
 
-    iws = is_whitespace(view.line(initial_loc))
+    iws = is_whitespace(row)
 
     # Search backward finding all lines with similar whitespace status.
     # This will give use the value for begin.
-    p = initial_loc
+    r = row
     while True:
-        line = view.line(p)
-        if is_whitespace(line) != iws:
+        if is_whitespace(r) != iws:
+            p = lines.end(r)
             break
-        elif line.begin() == 0:
+        elif r == 0:
             p = 0
             break
 
-        p = line.begin() - 1
+        r -= 1
 
     begin = p + 1 if p > 0 else p
 
     # To get the value for end, we do the same thing, this time searching forward.
+    r = row
     p = initial_loc
     while True:
-        line = view.line(p)
-        if is_whitespace(line) != iws:
+        if is_whitespace(r) != iws:
             break
 
-        p = line.end() + 1
+        p = lines.end(r) + 1
 
-        if p >= view.size():
+        if p >= lines.size:
             break
 
+        r += 1
+
     end = p
 
     return (begin, end)
 
 
 def resolve_indent_text_object(view, s: Region, inclusive: bool = True, big: bool = False):
-    # Look for the minimum indentation in the current visual region.
+    # Look for the minimum indentation in the current visual region. The level
+    # of a line only depends on its leading whitespace, so it's looked up once
+    # for each distinct indentation.
     idnt = 1000
     idnt_pt = None
-    for line in view.lines(s):
-        if not re.match('^\\s*$', view.substr(line)):
-            level = view.indentation_level(line.a)
+    levels = {}  # type: dict
+    lines = LineWindow(view, s.begin())
+    for row in range(lines.row, view.rowcol(s.end())[0] + 1):
+        text = lines.text(row)
+        if not re.match('^\\s*$', text):
+            indent = text[:len(text) - len(text.lstrip())]
+            try:
+                level = levels[indent]
+            except KeyError:
+                level = levels[indent] = view.indentation_level(lines.start(row))
+
             if level < idnt:
-                idnt = min(idnt, level)
-                idnt_pt = line.a
+                idnt = level
+                idnt_pt = lines.start(row)
 
     # If the selection has no indentation at all, find which indentation level
     # is the largest, the previous non blank before tphe cursor or the next non
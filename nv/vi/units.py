@@ -235,107 +235,199 @@ def inner_lines(view, s: Region, count: int = 1) -> Region:
     return Region(begin, view.line(end).b)
 
 
+# The size of the first read of a LineWindow. Each further read in the same
+# direction doubles in size.
+_LINE_WINDOW_SIZE = 4096
+
+
+class LineWindow():
+    # The lines of a view around a point, read with a single substr() and then
+    # extended as lines outside of it are requested. Walking over lines this
+    # way avoids a view.line() and view.substr() call for every line.
+
+    def __init__(self, view, pt: int):
+        self.view = view
+        self.size = view.size()
+        self.last_row = view.rowcol(self.size)[0]
+        self.row = view.rowcol(pt)[0]
+        self._first_row = self.row
+        self._begin = self._end = view.text_point(self.row, 0)
+        self._starts = []  # type: list
+        self._texts = []  # type: list
+        self._forward_size = _LINE_WINDOW_SIZE
+        self._backward_size = _LINE_WINDOW_SIZE
+        self._read_forward()
+
+    def _read_forward(self) -> None:
+        end = min(self.size, self._end + self._forward_size)
+        self._forward_size *= 2
+        lines = self.view.substr(Region(self._end, end)).split('\n')
+        if end < self.size:
+            if len(lines) == 1:
+                return self._read_forward()
+
+            # The last line is incomplete.
+            lines.pop()
+
+        pt = self._end
+        for text in lines:
+            self._starts.append(pt)
+            self._texts.append(text)
+            pt += len(text) + 1
+
+        self._end = pt
+
+    def _read_backward(self) -> None:
+        begin = max(0, self._begin - self._backward_size)
+        self._backward_size *= 2
+        lines = self.view.substr(Region(begin, self._begin - 1)).split('\n')
+        if begin > 0:
+            if len(lines) == 1:
+                return self._read_backward()
+
+            # The first line is incomplete.
+            lines.pop(0)
+
+        starts = []
+        pt = self._begin
+        for text in reversed(lines):
+            pt -= len(text) + 1
+            starts.append(pt)
+
+        starts.reverse()
+        self._starts = starts + self._starts
+        self._texts = lines + self._texts
+        self._first_row -= len(lines)
+        self._begin = pt
+
+    def _index(self, row: int) -> int:
+        while row < self._first_row:
+            self._read_backward()
+
+        while row >= self._first_row + len(self._texts):
+            self._read_forward()
+
+        return row - self._first_row
+
+    def text(self, row: int) -> str:
+        i = self._index(row)
+
+        return self._texts[i]
+
+    def start(self, row: int) -> int:
+        i = self._index(row)
+
+        return self._starts[i]
+
+    def end(self, row: int) -> int:
+        i = self._index(row)
+
+        return self._starts[i] + len(self._texts[i])
+
+    def is_empty(self, row: int) -> bool:
+        return not self.text(row)
+
+
 def next_paragraph_start(view, pt: int, count: int = 1) -> int:
     skip_empty = count > 1
+    lines = LineWindow(view, pt)
+    row = lines.row
 
-    if row_at(view, pt) == last_row(view):
-        if not view.line(view.size()).empty():
-            return view.size() - 1
+    if row == lines.last_row:
+        if not lines.is_empty(row):
+            return lines.size - 1
 
-        return view.size()
+        return lines.size
 
     # skip empty rows before moving for the first time
-    current_row = row_at(view, pt)
-    if (view.line(view.text_point(current_row + 1, 0)).empty() and view.line(pt).empty()):
-        pt, _ = _next_non_empty_row(view, pt)
+    if lines.is_empty(row + 1) and lines.is_empty(row):
+        row, eof = _next_non_empty_row(lines, row)
+        pt = lines.size if eof else lines.start(row)
 
     for i in range(count):
-        pt, eof = _next_empty_row(view, pt)
+        row, eof = _next_empty_row(lines, row)
         if eof:
-            if view.line(pt).empty():
-                return pt
+            if lines.is_empty(lines.last_row):
+                return lines.size
 
-            return pt - 1
+            return lines.size - 1
+
+        pt = lines.start(row)
 
         if skip_empty and (i != (count - 1)):
-            pt, eof = _next_non_empty_row(view, pt)
+            row, eof = _next_non_empty_row(lines, row)
             if eof:
-                if not view.line(pt).empty():
-                    return pt - 1
+                if not lines.is_empty(lines.last_row):
+                    return lines.size - 1
+
+                return lines.size
 
-                return pt
+            pt = lines.start(row)
 
     return pt
 
 
-def _next_empty_row(view, pt: int) -> tuple:
-    r = row_at(view, pt)
+def _next_empty_row(lines: LineWindow, row: int) -> tuple:
     while True:
-        r += 1
-        pt = view.text_point(r, 0)
-        if row_at(view, pt) == last_row(view):
-            return view.size(), True
+        row += 1
+        if row >= lines.last_row:
+            return lines.last_row, True
 
-        if view.line(pt).empty():
-            return pt, False
+        if lines.is_empty(row):
+            return row, False
 
 
-def _next_non_empty_row(view, pt: int) -> tuple:
-    r = row_at(view, pt)
+def _next_non_empty_row(lines: LineWindow, row: int) -> tuple:
     while True:
-        r += 1
-        reg = view.line(view.text_point(r, 0))
-        if r >= last_row(view):
-            return view.size(), True
+        row += 1
+        if row >= lines.last_row:
+            return lines.last_row, True
 
-        if not reg.empty():
-            return reg.a, False
+        if not lines.is_empty(row):
+            return row, False
 
 
 def prev_paragraph_start(view, pt: int, count: int = 1, skip_empty: bool = True) -> int:
+    lines = LineWindow(view, pt)
+    row = lines.row
+
     # first row?
-    if row_at(view, pt) == 0:
+    if row == 0:
         return 0
 
-    current_row = row_at(view, pt)
-    if (view.line(view.text_point(current_row - 1, 0)).empty() and view.line(view.text_point(current_row, 0)).empty()):
-        pt, bof = _prev_non_empty_row(view, pt)
+    if lines.is_empty(row - 1) and lines.is_empty(row):
+        row, bof = _prev_non_empty_row(lines, row)
         if bof:
             return 0
 
     for i in range(count):
-        pt, bof = _prev_empty_row(view, pt)
+        row, bof = _prev_empty_row(lines, row)
         if bof:
             return 0
 
         if skip_empty and (count > 1) and (i != count - 1):
-            pt, bof = _prev_non_empty_row(view, pt)
+            row, bof = _prev_non_empty_row(lines, row)
             if bof:
-                return pt
+                return 0
 
-    return view.text_point(row_at(view, pt), 0)
+    return lines.start(row)
 
 
-def _prev_empty_row(view, pt: int) -> tuple:
-    r = row_at(view, pt)
+def _prev_empty_row(lines: LineWindow, row: int) -> tuple:
     while True:
-        r -= 1
-        if r == 0:
+        row -= 1
+        if row <= 0:
             return 0, True
 
-        pt = view.text_point(r, 0)
-        if view.line(pt).empty():
-            return pt, False
+        if lines.is_empty(row):
+            return row, False
 
 
-def _prev_non_empty_row(view, pt: int) -> tuple:
-    r = row_at(view, pt)
+def _prev_non_empty_row(lines: LineWindow, row: int) -> tuple:
     while True:
-        r -= 1
-        reg = view.line(view.text_point(r, 0))
-        # stop if we hit the first row
-        if r <= 0:
+        row -= 1
+        if row <= 0:
             return 0, True
 
-        if not reg.empty():
-            return reg.a, False
+        if not lines.is_empty(row):
+            return row, False
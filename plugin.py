@@ -61,13 +61,12 @@ try:
     # Commands.
     from NeoVintageous.nv.commands import *  # noqa: F401,F403
 
-    # Plugins.
+    # Plugins. The plugins that only register key mappings are imported on
+    # demand, see NeoVintageous.nv.plugin.
     from NeoVintageous.nv.plugin_abolish import *  # noqa: F401,F403
     from NeoVintageous.nv.plugin_commentary import *  # noqa: F401,F403
     from NeoVintageous.nv.plugin_input_method import *  # noqa: F401,F403
-    from NeoVintageous.nv.plugin_multiple_cursors import *  # noqa: F401,F403
     from NeoVintageous.nv.plugin_sneak import *  # noqa: F401,F403
-    from NeoVintageous.nv.plugin_sublime import *  # noqa: F401,F403
     from NeoVintageous.nv.plugin_surround import *  # noqa: F401,F403
     from NeoVintageous.nv.plugin_unimpaired import *  # noqa: F401,F403
 
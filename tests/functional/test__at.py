@@ -77,3 +77,35 @@ class Test_at(unittest.FunctionalTestCase):
         self.assertNormal('fi|zz')
         self.assertStatusLineIsNormal()
         self.assertSessionEmpty()
+
+    @unittest.mock_session()
+    def test_count(self):
+        self.normal('|abcdef')
+        self.feed('n_qa')
+        self.feed('n_x')
+        self.feed('n_q')
+        self.assertNormal('|bcdef')
+        self.feed('n_3@a')
+        self.assertNormal('|ef')
+
+    @unittest.mock_session()
+    def test_count_is_undone_in_one_go(self):
+        self.normal('|abcdef')
+        self.feed('n_qa')
+        self.feed('n_x')
+        self.feed('n_q')
+        self.feed('n_3@a')
+        self.assertNormal('|ef')
+        self.feed('n_u')
+        self.assertNormal('|bcdef')
+
+    @unittest.mock_session()
+    def test_visual_line_runs_macro_on_each_line(self):
+        self.normal('|a1\nb2\nc3\nd4\n')
+        self.feed('n_qa')
+        self.feed('n_x')
+        self.feed('n_q')
+        self.assertNormal('|1\nb2\nc3\nd4\n')
+        self.vline('1\n|b2\nc3\n|d4\n')
+        self.feed('V_@a')
+        self.assertNormal('1\n2\n|3\nd4\n')
@@ -36,6 +36,46 @@ class Test_dot(unittest.FunctionalTestCase):
         self.feed('3.')
         self.assertNormal('one |seven')
 
+    @unittest.mock.patch('NeoVintageous.nv.process_notation.ProcessNotationHandler.handle')
+    def test_n_repeat_dw_replays_the_command_without_feeding_keys(self, handle):
+        self.normal('one |two three four five six seven')
+        self.feed('dw')
+        self.feed('.')
+        self.assertNormal('one |four five six seven')
+        self.feed('2.')
+        self.assertNormal('one |six seven')
+        handle.assert_not_called()
+
+    def test_n_repeat_count_replaces_count(self):
+        self.normal('|abcdefghijkl')
+        self.feed('2x')
+        self.assertNormal('|cdefghijkl')
+        self.feed('.')
+        self.assertNormal('|efghijkl')
+        self.feed('3.')
+        self.assertNormal('|hijkl')
+        self.feed('.')
+        self.assertNormal('|kl')
+
+    def test_n_repeat_count_of_one_replaces_count(self):
+        self.normal('|abcdefghijkl')
+        self.feed('x')
+        self.feed('3.')
+        self.assertNormal('|efghijkl')
+        self.feed('1.')
+        self.assertNormal('|fghijkl')
+        self.feed('.')
+        self.assertNormal('|ghijkl')
+
+    def test_n_repeat_dd(self):
+        self.normal('1\n|2\n3\n4\n5\n6\n')
+        self.feed('dd')
+        self.assertNormal('1\n|3\n4\n5\n6\n')
+        self.feed('.')
+        self.assertNormal('1\n|4\n5\n6\n')
+        self.feed('2.')
+        self.assertNormal('1\n|6\n')
+
     def test_v_repeat_d(self):
         self.normal('one |two three four five six seven')
         self.feed('v')
@@ -120,6 +160,15 @@ class Test_dot(unittest.FunctionalTestCase):
         self.feed('.')
         self.assertNormal('x\n|x\n')
 
+    def test_repeat_char_search_motion_uses_the_last_char_search(self):
+        self.normal('|1a2a3b4b5b')
+        self.feed('fa')
+        self.feed('d;')
+        self.assertNormal('1|3b4b5b')
+        self.feed('fb')
+        self.feed('.')
+        self.assertNormal('13|5b')
+
     @unittest.mock_bell()
     def test_repeat_rings_bell_in_visual_mode(self):
         self.normal('fi|xzz')
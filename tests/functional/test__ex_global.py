@@ -33,13 +33,63 @@ class Test_ex_global(unittest.FunctionalTestCase):
         self.eq('|fizz\nxyz\nbuzz\nfizz\nxyz\nbuzz\n', ':global/^x/d', 'fizz\nbuzz\nfizz\n|buzz\n')
         self.eq('|fizz\nxyz\nbuzz\n', ':global/^./d', '|')
         self.eq('|fizz\nxyz\nbuzz\n', ':global/^/d', '|')
-        self.eq('|fizz\n\nbuzz\nfizz\n\n\n\n\n\nbuzz\n', ':global/^$/d', 'fizz\nbuzz\nfizz\nbuz|z\n')
-        self.eq('|fizz\n\nbuzz\nfizz\n\n\n\n\n\nbuzz\n', ':%global/^$/d', 'fizz\nbuzz\nfizz\nbuz|z\n')
+        # As in Vim, the cursor is left on the first non-blank of the line after the last deleted line.
+        self.eq('|fizz\n\nbuzz\nfizz\n\n\n\n\n\nbuzz\n', ':global/^$/d', 'fizz\nbuzz\nfizz\n|buzz\n')
+        self.eq('|fizz\n\nbuzz\nfizz\n\n\n\n\n\nbuzz\n', ':%global/^$/d', 'fizz\nbuzz\nfizz\n|buzz\n')
         self.eq('|1\nx2\n3\n4\nx5\n6\nx7\nx8\n9\n0', ':3,7g/^x/d', '1\nx2\n3\n4\n6\n|x8\n9\n0')
+        self.eq('|fizz\nxyz\n    buzz\n', ':g/^x/d', 'fizz\n    |buzz\n')
+        self.eq('|fizz\nxyz\n\t\tbuzz\nxyz\n', ':g/^x/d', 'fizz\n\t\tbuzz\n|')
 
     def test_global_not_match_delete(self):
         self.eq('|fizz\nxyz\nbuzz\n', ':global!/^x/d', 'xyz\n|')
         self.eq('|fizz\nxyz\nbuzz\nfizz\nxyz\nbuzz\n', ':global!/^x/d', 'xyz\nxyz\n|')
+        self.eq('|fizz\nxyz\nbuzz\n', ':vglobal/^x/d', 'xyz\n|')
+        self.eq('|fizz\nxyz\nbuzz\n', ':v/^x/d', 'xyz\n|')
+        self.eq('|fizz\nxyz\nbuzz\n', ':global!/^q/d', '|')
+
+    def test_global_delete_line_with_many_matches_once(self):
+        self.eq('|fizz\nxyz\nbuzz\nabc\n', ':global/z/d', '|abc\n')
+        self.eq('|fizz\nxyz\nbuzz\nabc\n', ':global/z/p', '|fizz\nxyz\nbuzz\nabc\n')
+        self.assertExPrintOutput('fizz\nxyz\nbuzz\n')
+
+    @unittest.mock.patch('NeoVintageous.nv.ex_cmds._MAX_GLOBAL_DELETE_ERASES', 1)
+    def test_global_delete_many_runs_of_lines(self):
+        self.eq('|x1\nx2\ny\nx3\ny\nx4\n', ':global/^x/d', 'y\ny\n|')
+
+    def test_global_substitute(self):
+        self.normal('|xa a\nya\nxa\n')
+        self.feed(':global/^x/s/a/b/')
+        self.assertContent('xb a\nya\nxb\n')
+        self.normal('|xa a\nya\nxa\n')
+        self.feed(':global/^x/s/a/b/g')
+        self.assertContent('xb b\nya\nxb\n')
+
+    def test_global_move(self):
+        self.normal('|1\n2\n3\n4\n')
+        self.feed(':global/^/m0')
+        self.assertContent('4\n3\n2\n1\n')
+
+    def test_global_copy(self):
+        self.normal('|x1\ny\nx2\n')
+        self.feed(':global/^x/copy $')
+        self.assertContent('x1\ny\nx2\nx1\nx2\n')
+
+    def test_global_command_with_range(self):
+        self.normal('|x\n1\nx\n2\n3\n')
+        self.feed(':global/^x/.,+1d')
+        self.assertContent('3\n')
+
+    def test_global_skips_lines_deleted_by_previous_commands(self):
+        self.normal('|x1\nx2\nx3\nx4\ny\n')
+        self.feed(':global/^x/.,+1d')
+        self.assertContent('y\n')
+
+    def test_global_is_undone_in_one_go(self):
+        self.normal('|1\n2\n3\n4\n')
+        self.feed(':global/^/m0')
+        self.assertContent('4\n3\n2\n1\n')
+        self.feed('u')
+        self.assertContent('1\n2\n3\n4\n')
 
     @unittest.mock_status_message()
     def test_global_delete_pattern_not_found(self):
@@ -64,17 +114,18 @@ class Test_ex_global(unittest.FunctionalTestCase):
         self.assertStatusMessage('E35: No previous regular expression')
 
     @unittest.mock_status_message()
-    def test_global_command_not_supported(self):
+    def test_global_recursive(self):
         self.normal('|fizz\nxyz\nbuzz\n')
-        self.feed(':global/^/nohlsearch')
+        self.feed(':global/^/global/x/d')
         self.assertNormal('|fizz\nxyz\nbuzz\n')
-        self.assertStatusMessage('Command not supported: nohlsearch')
+        self.assertStatusMessage('E147: Cannot do :global recursive')
 
     def test_issue_78_with_range(self):
-        self.eq('|1\n2\n3\n4\n5\n6\n7\n8\n9\n0', ':3,6g/^/d', '1\n2\n|8\n9\n0')
+        # Only the lines in the range are deleted, as in Vim.
+        self.eq('|1\n2\n3\n4\n5\n6\n7\n8\n9\n0', ':3,6g/^/d', '1\n2\n|7\n8\n9\n0')
 
     def test_issue_78_delete(self):
-        self.eq('|fizz\n\nbuzz\n', ':global/^$/d', 'fizz\nbuz|z\n')
+        self.eq('|fizz\n\nbuzz\n', ':global/^$/d', 'fizz\n|buzz\n')
 
     def test_issue_78_print_with_newline(self):
         self.eq('|1\n2\n3\n', ':g/\\d/p', '|1\n2\n3\n')
@@ -0,0 +1,61 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+from NeoVintageous.tests import unittest
+
+from NeoVintageous.nv.profiler import clear_profile
+from NeoVintageous.nv.profiler import get_profile_stats
+
+
+class Test_ex_profile(unittest.ResetCommandLineOutput, unittest.FunctionalTestCase):
+
+    def setUp(self):
+        super().setUp()
+        clear_profile()
+        patcher = unittest.mock.patch('NeoVintageous.nv.profiler._enabled', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        clear_profile()
+        super().tearDown()
+
+    def test_dump(self):
+        self.normal('fi|zz\nbuzz')
+        self.feed('n_j')
+        self.feed(':profile dump')
+        output = self.commandLineOutput()
+        self.assertTrue(output.startswith('Phase'))
+        self.assertIn('\nresolve ', output)
+        self.assertIn('\nnv_vi_j ', output)
+
+    def test_clear(self):
+        self.normal('fi|zz\nbuzz')
+        self.feed('n_j')
+        self.assertTrue(get_profile_stats()['phases'])
+        self.feed(':profile clear')
+        self.assertEqual({'phases': {}, 'commands': {}}, get_profile_stats())
+
+    @unittest.mock_bell()
+    def test_argument_required(self):
+        self.feed(':profile')
+        self.assertBell('E471: Argument required')
+
+    @unittest.mock_bell()
+    def test_invalid_argument(self):
+        self.feed(':profile foobar')
+        self.assertBell('E475: Invalid argument: %s', 'foobar')
@@ -20,6 +20,24 @@ from sublime import platform
 from NeoVintageous.tests import unittest
 
 
+class _DeferredThread():
+
+    threads = []  # type: list
+
+    def __init__(self, target, args=(), daemon=None):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.threads.append(self)
+
+    @classmethod
+    def run_all(cls):
+        while cls.threads:
+            thread = cls.threads.pop(0)
+            thread.target(*thread.args)
+
+
 @unittest.mock.patch.dict('NeoVintageous.nv.session._session', {}, clear=True)
 class TestExShellOut(unittest.ResetCommandLineOutput, unittest.FunctionalTestCase):
 
@@ -137,3 +155,62 @@ class TestExShellOut(unittest.ResetCommandLineOutput, unittest.FunctionalTestCas
     def test_empty_file_name_replacement_emits_status_message(self):
         self.feed(':!ls %')
         self.assertStatusMessage('E499: Empty file name for \'%\' or \'#\', only works with ":p:h"')
+
+
+@unittest.skipIf(platform() == 'windows', 'Test does not work on Windows')
+@unittest.mock.patch.dict('NeoVintageous.nv.session._session', {}, clear=True)
+@unittest.mock.patch('NeoVintageous.nv.shell.set_timeout', lambda f, delay=0: f() if delay == 0 else None)
+@unittest.mock.patch('NeoVintageous.nv.shell.Thread', _DeferredThread)
+class TestExShellOutAsync(unittest.FunctionalTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.set_setting('shell_filter_async_size', 0)
+
+    def test_filter(self):
+        self.normal('1\n|3\n2\n4\n')
+        self.feed(':.,+1!sort')
+        self.assertNormal('1\n|3\n2\n4\n')
+        _DeferredThread.run_all()
+        self.assertNormal('1\n|2\n3\n4\n')
+
+    def test_filter_is_undone_in_one_go(self):
+        self.normal('1\n|3\n2\n4\n')
+        self.feed(':.,+1!sort')
+        _DeferredThread.run_all()
+        self.feed('u')
+        self.assertContent('1\n3\n2\n4\n')
+
+    @unittest.mock_status_message()
+    def test_esc_cancels_filter(self):
+        self.normal('1\n|3\n2\n4\n')
+        self.feed(':.,+1!sort')
+        self.feed('<Esc>')
+        _DeferredThread.run_all()
+        self.assertNormal('1\n|3\n2\n4\n')
+        self.assertStatusMessage('Interrupted')
+
+    @unittest.mock_status_message()
+    @unittest.mock.patch('NeoVintageous.nv.shell._shell.filter_region_streamed')
+    def test_worker_error_is_reported(self, filter_region_streamed):
+        filter_region_streamed.side_effect = OSError('[Errno 2] No such file or directory')
+        self.normal('1\n|3\n2\n4\n')
+        self.feed(':.,+1!sort')
+        _DeferredThread.run_all()
+        self.assertNormal('1\n|3\n2\n4\n')
+        self.assertStatusMessage('Filter failed: [Errno 2] No such file or directory')
+
+    @unittest.mock_status_message()
+    def test_output_is_discarded_when_buffer_changes(self):
+        self.normal('1\n|3\n2\n4\n')
+        self.feed(':.,+1!sort')
+        self.feed('x')
+        _DeferredThread.run_all()
+        self.assertNormal('1\n|\n2\n4\n')
+        self.assertStatusMessage('Buffer changed while filtering, output discarded')
+
+    def test_below_size_filters_synchronously(self):
+        self.set_setting('shell_filter_async_size', 100)
+        self.normal('1\n|3\n2\n4\n')
+        self.feed(':.,+1!sort')
+        self.assertNormal('1\n|2\n3\n4\n')
@@ -79,6 +79,14 @@ class Test_ex_substitute(unittest.FunctionalTestCase):
         self.set_option('smartcase', False)
         self.eq('|fizz FIZZ fIzZ', ':s/FIZZ/x/g', '|fizz x fIzZ')
 
+    def test_i_flag_overrides_smartcase(self):
+        self.set_option('ignorecase', True)
+        self.set_option('smartcase', True)
+        self.eq('|fizz FIZZ fIzZ', ':s/FIZZ/x/gi', '|x x x')
+        self.eq('|fizz FIZZ fIzZ', ':s/fizz/x/gI', '|x FIZZ fIzZ')
+        self.set_option('ignorecase', False)
+        self.eq('|fizz FIZZ fIzZ', ':s/FIZZ/x/gi', '|x x x')
+
     def test_ranges(self):
         self.eq('axxa\n|bxxb\ncxxc\n', ':1,$substitute/x/y/', 'ayxa\nbyxb\n|cyxc\n')
         self.eq('axxa\n|bxxb\ncxxc\n', ':1,$substitute/x/y/g', 'ayya\nbyyb\n|cyyc\n')
@@ -124,3 +132,57 @@ class Test_ex_substitute(unittest.FunctionalTestCase):
         self.assertNormal('|345\nfizz')
         self.feed(':&&')
         self.assertNormal('|45\nfizz')
+
+    @unittest.mock_status_message()
+    def test_report(self):
+        self.eq('axxa\n|bxxb\ncxxc\n', ':%substitute/x/y/g', 'ayya\nbyyb\n|cyyc\n')
+        self.assertStatusMessage('6 substitutions on 3 lines')
+        self.eq('|xxxx\n', ':substitute/x/y/g', '|yyyy\n')
+        self.assertStatusMessage('4 substitutions on 1 line')
+
+    @unittest.mock_status_message()
+    def test_report_is_not_shown_for_substitutions_within_report_option(self):
+        self.eq('axxa\n|bxxb\ncxxc\n', ':substitute/x/y/g', 'axxa\n|byyb\ncxxc\n')
+        self.assertNoStatusMessage()
+        self.set_option('report', 0)
+        self.eq('axxa\n|bxxb\ncxxc\n', ':substitute/x/y/', 'axxa\n|byxb\ncxxc\n')
+        self.assertStatusMessage('1 substitution on 1 line')
+
+    def test_matches_do_not_span_lines(self):
+        self.eq('a \n|b\na \n', ':%substitute/a\\s*/x/', 'x\nb\n|x\n')
+        self.eq('a\n|b\na\n', ':%substitute/[^b]\\+/x/g', 'x\nb\n|x\n')
+
+    def test_buffer_anchors(self):
+        self.eq('xa\n|a\nxa\n', ':%substitute/\\%^x/y/', 'ya\na\n|xa\n')
+        self.eq('xa\n|a\nxa\n', ':%substitute/\\%^x\\|a$/y/', 'ya\ny\n|xy\n')
+        self.eq('ax\n|ax\nax\n', ':%substitute/x\\%$/y/', 'ax\nax\n|ay\n')
+        self.eq('ax\n|ax\nax', ':%substitute/x\\%$/y/', 'ax\nax\n|ay')
+        self.eq('a \n|a \na \n', ':%substitute/a\\s*\\%$/y/', 'a \na \n|y\n')
+
+    @unittest.mock_status_message()
+    def test_buffer_anchors_outside_range(self):
+        self.eq('xa\n|xa\nxa\n', ':2,3substitute/\\%^x/y/', 'xa\n|xa\nxa\n')
+        self.assertStatusMessage('E486: Pattern not found: \\%^x')
+        self.eq('ax\n|ax\nax\n', ':1,2substitute/x\\%$/y/', 'ax\n|ax\nax\n')
+        self.assertStatusMessage('E486: Pattern not found: x\\%$')
+
+    def test_vim_patterns(self):
+        self.eq('|foo foobar\n', ':s/\\<foo\\>/x/g', '|x foobar\n')
+        self.eq('|a1 b22\n', ':s/\\d\\+/#/g', '|a# b#\n')
+        self.eq('|ab ab\n', ':s/\\v(a)(b)/\\2\\1/g', '|ba ba\n')
+        self.eq('|a+b\n', ':s/a+b/x/', '|x\n')
+        self.eq('|foobar\n', ':s/foo\\zsbar/x/', '|foox\n')
+        self.eq('|  foo foo\n', ':s/^\\s*\\zsfoo/x/', '  |x foo\n')
+        self.eq('|foo bar bar\n', ':s/foo.*\\zsbar/x/', '|foo bar x\n')
+        self.eq('|aaaa\n', ':s/a\\zsa/x/g', '|axax\n')
+        self.eq('|xx yy\n', ':s/\\(.\\)\\zs\\1/-/g', '|x- y-\n')
+        self.eq('|aAa\n', ':s/a\\c/x/g', '|xxx\n')
+
+    def test_in_visual_area(self):
+        self.eq('x |x x| x\n', ":'<,'>s/\\%Vx/y/g", 'n_|x y y x\n')
+        self.eq('x |x x| x\n', ":'<,'>s/\\%Vx/y/", 'n_|x y x x\n')
+
+    def test_large_range(self):
+        self.eq('|' + ('x\n' * 500), ':%substitute/x/y/', ('y\n' * 499) + '|y\n')
+        self.eq('|' + ('  xx\n' * 500), ':%substitute/x/yy/g', ('  yyyy\n' * 499) + '  |yyyy\n')
+        self.eq('|' + ('a\nx\n' * 300), ':%substitute/x/y/', ('a\ny\n' * 299) + 'a\n|y\n')
@@ -15,8 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
+import os
+import tempfile
+
 from NeoVintageous.tests import unittest
 
+from NeoVintageous.nv.ex import completions
+from NeoVintageous.nv.ex.completions import _iter_paths
+from NeoVintageous.nv.ex.completions import _list_dir
 from NeoVintageous.nv.ex.completions import _wants_fs_completions
 from NeoVintageous.nv.ex.completions import _wants_setting_completions
 
@@ -48,3 +55,47 @@ class TestWantsCompletions(unittest.TestCase):
     def test_does_not_want_fs_completions(self):
         self.assertFalse(_wants_fs_completions(':write'))
         self.assertFalse(_wants_fs_completions('foobar'))
+
+
+class TestFsCompletionPaths(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, '')
+        for name in ('abc', 'bar', '.hidden'):
+            os.mkdir(os.path.join(self.dir, name))
+        for name in ('ab.txt', 'foo.txt', '.dotfile'):
+            self.touch(name)
+        patcher = unittest.mock.patch.object(completions, '_dir_cache', OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def touch(self, name: str, mtime: int = 1) -> None:
+        with open(os.path.join(self.dir, name), 'w'):
+            pass
+
+        os.utime(self.dir, (mtime, mtime))
+
+    def test_iter_paths(self):
+        self.assertEqual(list(_iter_paths(None, self.dir)), ['ab.txt', 'abc/', 'bar/', 'foo.txt'])
+        self.assertEqual(list(_iter_paths(None, self.dir, only_dirs=True)), ['abc/', 'bar/'])
+        self.assertEqual(list(_iter_paths('ab', self.dir)), ['ab.txt', 'abc/'])
+        self.assertEqual(list(_iter_paths('.', self.dir)), ['.dotfile', '.hidden/'])
+        self.assertEqual(list(_iter_paths('x', self.dir)), [])
+        self.assertEqual(list(_iter_paths('nope/', self.dir)), [])
+
+    def test_list_dir_is_cached_until_the_directory_changes(self):
+        with unittest.mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            self.assertEqual(_list_dir(self.dir), _list_dir(self.dir))
+            self.assertEqual(scandir.call_count, 1)
+            self.touch('new.txt', mtime=2)
+            self.assertIn(('new.txt', False), _list_dir(self.dir))
+            self.assertEqual(scandir.call_count, 2)
+
+    @unittest.mock.patch('NeoVintageous.nv.ex.completions._DIR_CACHE_SIZE', 1)
+    def test_list_dir_evicts_least_recently_used(self):
+        _list_dir(self.dir)
+        _list_dir(os.path.join(self.dir, 'abc'))
+        self.assertEqual(list(completions._dir_cache), [os.path.join(self.dir, 'abc')])
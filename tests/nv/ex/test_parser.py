@@ -34,6 +34,24 @@ from NeoVintageous.nv.ex.tokens import TokenSearchForward
 from NeoVintageous.nv.ex.tokens import TokenSemicolon
 
 
+class TestParseCommandLineCache(unittest.TestCase):
+
+    def test_returns_copies(self):
+        parsed = parse_command_line('3,5write')
+        parsed.command.params['window'] = 'fizz'
+        parsed.command.forced = True
+
+        parsed = parse_command_line('3,5write')
+        self.assertEqual(parsed.command.params, {'++': '', 'cmd': '', '>>': False, 'file_name': ''})
+        self.assertFalse(parsed.command.forced)
+        self.assertEqual(parsed.line_range, RangeNode([TokenDigits('3')], [TokenDigits('5')], TokenComma()))
+
+    def test_errors_are_not_cached(self):
+        for i in range(2):
+            with self.assertRaisesRegex(Exception, 'E492: Not an editor command: foobar'):
+                parse_command_line('foobar')
+
+
 class TestParsedCommandLine(unittest.TestCase):
 
     def test_can_instantiate(self):
@@ -19,6 +19,8 @@ import unittest
 
 from NeoVintageous.nv.ex.scanner import Scanner
 from NeoVintageous.nv.ex.scanner import _ScannerState
+from NeoVintageous.nv.ex.scanner import _get_routes
+from NeoVintageous.nv.ex.scanner import _route_first_chars
 from NeoVintageous.nv.ex.scanner import _scan_command
 from NeoVintageous.nv.ex.tokens import TokenComma
 from NeoVintageous.nv.ex.tokens import TokenCommand
@@ -477,6 +479,44 @@ class TestScannerWriteCommand(unittest.TestCase):
         self.assertEqual([TokenCommand('write', addressable=True, params=params), TokenEof()], tokens)
 
 
+class TestRouteIndex(unittest.TestCase):
+
+    def test_route_first_chars(self):
+        self.assertEqual(_route_first_chars('q'), {'q'})
+        self.assertEqual(_route_first_chars('&&?'), {'&'})
+        self.assertEqual(_route_first_chars('!(?=.+)'), {'!'})
+        self.assertEqual(_route_first_chars('b(?:uffer)?'), {'b'})
+        self.assertEqual(_route_first_chars('q(?!a)(?:uit)?'), {'q'})
+        self.assertEqual(_route_first_chars('(?:files|ls|buffers)!?'), {'f', 'l', 'b'})
+        self.assertEqual(_route_first_chars('tab(?:new|e(?:dit)?)'), {'t'})
+        self.assertEqual(_route_first_chars('(?:a(?:b|c)|d)'), {'a', 'd'})
+        self.assertEqual(_route_first_chars('(?:(?:a)|b)c'), {'a', 'b'})
+        self.assertEqual(_route_first_chars('a|b'), {'a', 'b'})
+
+    def test_route_first_chars_returns_none_when_unknown(self):
+        self.assertIsNone(_route_first_chars(''))
+        self.assertIsNone(_route_first_chars('.'))
+        self.assertIsNone(_route_first_chars('\\w+'))
+        self.assertIsNone(_route_first_chars('[ab]'))
+        self.assertIsNone(_route_first_chars('q?uit'))
+        self.assertIsNone(_route_first_chars('(?:a|)'))
+        self.assertIsNone(_route_first_chars('(?:a|.b)'))
+        self.assertIsNone(_route_first_chars('(?=a)'))
+        self.assertIsNone(_route_first_chars('(?:a|b)?x'))
+        self.assertIsNone(_route_first_chars('(?:a|b)*x'))
+        self.assertIsNone(_route_first_chars('(?:a|b'))
+        self.assertIsNone(_route_first_chars('(?:[)]|a)'))
+        self.assertIsNone(_route_first_chars('a|\\|b'))
+
+    def test_get_routes(self):
+        patterns = [route.pattern for route, command in _get_routes('q')]
+        self.assertEqual(patterns, ['qa(?:ll)?', 'quita(?:ll)?', 'q(?!a)(?:uit)?'])
+        patterns = [route.pattern for route, command in _get_routes('l')]
+        self.assertEqual(patterns, ['(?:files|ls|buffers)!?', 'let\\s'])
+        self.assertEqual(_get_routes('Z'), [])
+        self.assertEqual(_get_routes(''), [])
+
+
 class TestExCommands(unittest.TestCase):
 
     def assertCommand(self, sources: list, expected: tuple) -> None:
@@ -536,6 +576,8 @@ class TestExCommands(unittest.TestCase):
         self.assertCommand(['global/^/', 'g/^/'], cmd('global', params={'pattern': '^'}, addressable=True))
         self.assertCommand(['global/^/y', 'g/^/y'], cmd('global', params={'pattern': '^', 'cmd': 'y'}, addressable=True))  # noqa: E501
         self.assertCommand(['global/x/y', 'g/x/y'], cmd('global', params={'pattern': 'x', 'cmd': 'y'}, addressable=True))  # noqa: E501
+        self.assertCommand(['vglobal/x/y', 'v/x/y'], cmd('global', params={'pattern': 'x', 'cmd': 'y'}, forced=True, addressable=True))  # noqa: E501
+        self.assertCommand(['vglobal#x#', 'v#x#'], cmd('global', params={'pattern': 'x'}, forced=True, addressable=True))  # noqa: E501
         self.assertCommand(['help fizz', 'h fizz'], cmd('help', params={'subject': 'fizz'}))
         self.assertCommand(['help!', 'h!'], cmd('help', params={'subject': None}, forced=True))
         self.assertCommand(['help', 'h'], cmd('help', params={'subject': None}))
@@ -573,6 +615,8 @@ class TestExCommands(unittest.TestCase):
         self.assertCommand(['print l#', 'p l#'], cmd('print', params={'flags': ['l', '#']}, addressable=True, cooperates_with_global=True))  # noqa: E501
         self.assertCommand(['print l', 'p l'], cmd('print', params={'flags': ['l']}, addressable=True, cooperates_with_global=True))  # noqa: E501
         self.assertCommand(['print', 'p'], cmd('print', addressable=True, cooperates_with_global=True))  # noqa: E501
+        self.assertCommand(['profile dump', 'prof dump'], cmd('profile', params={'action': 'dump'}))
+        self.assertCommand(['profile', 'prof'], cmd('profile'))
         self.assertCommand(['pwd', 'pw'], cmd('pwd'))
         self.assertCommand(['qall!', 'qa!'], cmd('qall', forced=True))
         self.assertCommand(['qall', 'qa'], cmd('qall'))
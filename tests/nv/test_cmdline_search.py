@@ -0,0 +1,71 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+from NeoVintageous.tests import unittest
+
+from NeoVintageous.nv.cmdline_search import CmdlineSearch
+
+
+@unittest.mock.patch('NeoVintageous.nv.cmdline_search.set_timeout')
+@unittest.mock.patch('NeoVintageous.nv.cmdline_search.perf_counter', return_value=1.0)
+class TestCmdlineSearch(unittest.ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.search = CmdlineSearch(self.view, forward=True)
+        patcher = unittest.mock.patch.object(self.search, '_incsearch')
+        self.incsearch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_timeouts(self, set_timeout) -> None:
+        for args, kwargs in set_timeout.call_args_list:
+            args[0]()
+
+    def test_first_change_is_searched_immediately(self, perf_counter, set_timeout):
+        self.search.on_change('f')
+        self.incsearch.assert_called_once_with('f')
+        self.assertEqual(0, set_timeout.call_count)
+
+    def test_fast_changes_are_coalesced(self, perf_counter, set_timeout):
+        self.search.on_change('f')
+        self.search.on_change('fi')
+        self.search.on_change('fiz')
+        self.incsearch.assert_called_once_with('f')
+        self.run_timeouts(set_timeout)
+        self.assertEqual([unittest.mock.call('f'), unittest.mock.call('fiz')], self.incsearch.call_args_list)
+
+    def test_slow_changes_are_searched_immediately(self, perf_counter, set_timeout):
+        self.search.on_change('f')
+        perf_counter.return_value = 2.0
+        self.search.on_change('fi')
+        self.assertEqual([unittest.mock.call('f'), unittest.mock.call('fi')], self.incsearch.call_args_list)
+        self.assertEqual(0, set_timeout.call_count)
+
+    def test_done_cancels_pending_search(self, perf_counter, set_timeout):
+        self.search.on_change('f')
+        self.search.on_change('fi')
+        with unittest.mock.patch('NeoVintageous.nv.cmdline_search.evaluate_state'):
+            self.search.on_done('fi')
+        self.run_timeouts(set_timeout)
+        self.incsearch.assert_called_once_with('f')
+
+    def test_cancel_cancels_pending_search(self, perf_counter, set_timeout):
+        self.search.on_change('f')
+        self.search.on_change('fi')
+        self.search.on_cancel()
+        self.run_timeouts(set_timeout)
+        self.incsearch.assert_called_once_with('f')
@@ -70,11 +70,10 @@ class TestCommandModeAware(unittest.ViewTestCase):
         self.settings().set('command_mode', True)
         for key in self.KEYS:
             self.events.on_query_context(self.view, key, OP_EQUAL, True, True)
-        self.assertEqual(is_view.call_count, 2)
+        self.assertEqual(is_view.call_count, 1)
         self.settings().set('command_mode', False)
-        for key in self.KEYS:
-            self.events.on_query_context(self.view, key, OP_EQUAL, True, True)
-        self.assertEqual(is_view.call_count, 3)
+        self.events.on_query_context(self.view, 'vi_command_mode_aware', OP_EQUAL, True, True)
+        self.assertEqual(is_view.call_count, 1)
 
 
 class TestInsertModeAware(unittest.ViewTestCase):
@@ -125,11 +124,21 @@ class TestInsertModeAware(unittest.ViewTestCase):
         self.settings().set('command_mode', False)
         for key in self.KEYS:
             self.events.on_query_context(self.view, key, OP_EQUAL, True, False)
-        self.assertEqual(is_view.call_count, 2)
+        self.assertEqual(is_view.call_count, 1)
         self.settings().set('command_mode', True)
-        for key in self.KEYS:
-            self.events.on_query_context(self.view, key, OP_EQUAL, True, False)
-        self.assertEqual(is_view.call_count, 3)
+        self.events.on_query_context(self.view, 'vi_insert_mode_aware', OP_EQUAL, True, False)
+        self.assertEqual(is_view.call_count, 1)
+
+    @unittest.mock.patch('NeoVintageous.nv.events.is_view')
+    def test_is_view_is_memoised_until_the_settings_change(self, is_view):
+        is_view.return_value = True
+        self.settings().set('command_mode', False)
+        for i in range(3):
+            self.assertTrue(self.events.on_query_context(self.view, 'vi_insert_mode_aware', OP_EQUAL, True, False))
+        self.assertEqual(is_view.call_count, 1)
+        self.settings().set('__vi_external_disable', False)
+        self.assertTrue(self.events.on_query_context(self.view, 'vi_insert_mode_aware', OP_EQUAL, True, False))
+        self.assertEqual(is_view.call_count, 2)
 
     def test_query_contexts_can_be_disabled_by_external_plugins(self):
         self.settings().set('command_mode', True)
@@ -215,6 +224,15 @@ class TestOnQueryContextHandleKey(unittest.ViewTestCase):
         self.set_setting('handle_keys', {'V_<C-u>': False})
         self.assertEqual(True, self.events.on_query_context(self.view, 'nv_handle_key', OP_EQUAL, '<C-u>', True))
 
+    def test_key_for_all_modes_takes_precedence(self):
+        self.normal('fi|zz')
+        self.set_setting('handle_keys', {'<C-u>': True, 'n_<C-u>': False, 'n_<C-d>': False})
+        self.assertEqual(True, self.events.on_query_context(self.view, 'nv_handle_key', OP_EQUAL, '<C-u>', True))
+        self.assertEqual(False, self.events.on_query_context(self.view, 'nv_handle_key', OP_EQUAL, '<C-d>', True))
+        self.assertEqual(False, self.events.on_query_context(self.view, 'nv_handle_key', OP_EQUAL, 'n_<C-d>', True))
+        self.visual('fi|zz')
+        self.assertEqual(True, self.events.on_query_context(self.view, 'nv_handle_key', OP_EQUAL, '<C-d>', True))
+
 
 class TestFalseForUnsupportedOperators(unittest.ViewTestCase):
 
@@ -276,6 +276,7 @@ class TestRoutes(unittest.TestCase):
         self.assertRoute('_ex_route_onoremap', ['onoremap', 'ono'])
         self.assertRoute('_ex_route_ounmap', ['ounmap', 'ou'])
         self.assertRoute('_ex_route_print', ['print', 'p'])
+        self.assertRoute('_ex_route_profile', ['profile', 'prof'])
         self.assertRoute('_ex_route_pwd', ['pwd', 'pw'])
         self.assertRoute('_ex_route_qall', ['qall', 'qa'])
         self.assertRoute('_ex_route_qall', ['quitall', 'quita'])
@@ -305,6 +306,7 @@ class TestRoutes(unittest.TestCase):
         self.assertRoute('_ex_route_vnoremap', ['vnoremap', 'vn'])
         self.assertRoute('_ex_route_vsplit', ['vsplit', 'vs'])
         self.assertRoute('_ex_route_vunmap', ['vunmap', 'vu'])
+        self.assertRoute('_ex_route_vglobal', ['vglobal', 'v'])
         self.assertRoute('_ex_route_wall', ['wall', 'wa'])
         self.assertRoute('_ex_route_wq', ['wq', 'exit', 'exi', 'xit', 'x'])
         self.assertRoute('_ex_route_wqall', ['wqall', 'wqa', 'xall', 'xa'])
@@ -45,7 +45,7 @@ _patch_storage = unittest.mock.patch('NeoVintageous.nv.history._storage',
                                      new_callable=lambda: {k: {'num': 0, 'items': {}} for k in _storage_struct_})
 
 
-_patch_max_items = lambda n: unittest.mock.patch('NeoVintageous.nv.history._MAX_ITEMS', n)  # noqa: E731
+_patch_max_items = lambda n: unittest.mock.patch.dict('NeoVintageous.nv.options._session', {'history': n})  # noqa: E731
 
 
 @unittest.mock.patch.dict('NeoVintageous.nv.session._session', {})
@@ -366,6 +366,63 @@ class TestHistory(unittest.TestCase):
             _HIST_DEBUG: {'num': 0, 'items': {}}
         })
 
+    @_patch_max_items(3)
+    @_patch_storage
+    def test_history_option_size_evicts_oldest(self, _storage):
+        for item in ('c1', 'c2', 'c3', 'c1', 'c4', 'c5'):
+            self.assertTrue(history_add(':', item))
+
+        self.assertEqual(_storage[_HIST_CMD], {'num': 6, 'items': {4: 'c1', 5: 'c4', 6: 'c5'}})
+        self.assertTrue(history_add(':', 'c2'))
+        self.assertEqual(_storage[_HIST_CMD], {'num': 7, 'items': {5: 'c4', 6: 'c5', 7: 'c2'}})
+
+    @_patch_max_items(20000)
+    @_patch_storage
+    def test_history_option_size_is_capped(self, _storage):
+        for i in range(10005):
+            history_add(':', str(i))
+
+        self.assertEqual(10000, history_len(':'))
+        self.assertEqual(10005, history_nr(':'))
+        self.assertEqual('5', history_get(':', -10000))
+
+    @_patch_max_items(-1)
+    @_patch_storage
+    def test_history_option_size_negative(self, _storage):
+        self.assertFalse(history_add(':', 'c1'))
+        self.assertEqual(0, history_len(':'))
+
+    @_patch_storage
+    def test_history_add_moves_duplicate_to_newest(self, _storage):
+        self.assertTrue(history_add(':', 'a'))
+        self.assertTrue(history_add(':', 'b'))
+        self.assertTrue(history_add(':', 'c'))
+        self.assertTrue(history_add(':', 'a'))
+        self.assertEqual(_storage[_HIST_CMD], {'num': 4, 'items': {2: 'b', 3: 'c', 4: 'a'}})
+        self.assertEqual('a', history_get(':', -1))
+        self.assertEqual('c', history_get(':', -2))
+        self.assertEqual('b', history_get(':', -3))
+        self.assertEqual('', history_get(':', -4))
+        self.assertTrue(history_del(':', -2))
+        self.assertTrue(history_add(':', 'c'))
+        self.assertTrue(history_add(':', 'b'))
+        self.assertEqual(_storage[_HIST_CMD], {'num': 6, 'items': {4: 'a', 5: 'c', 6: 'b'}})
+
+    @_patch_storage
+    def test_history_add_after_storage_is_replaced(self, _storage):
+        self.assertTrue(history_add(':', 'a'))
+
+        # Loading a session replaces the items with unordered plain dicts.
+        _storage[_HIST_CMD] = {'num': 9, 'items': {9: 'x', 3: 'a', 5: 'y', 7: 'a'}}
+
+        self.assertEqual('x', history_get(':'))
+        self.assertEqual('a', history_get(':', -2))
+        self.assertEqual(9, history_nr(':'))
+        self.assertTrue(history_add(':', 'a'))
+        self.assertEqual(_storage[_HIST_CMD], {'num': 10, 'items': {5: 'y', 9: 'x', 10: 'a'}})
+        self.assertTrue(history_add(':', 'y'))
+        self.assertEqual(_storage[_HIST_CMD], {'num': 11, 'items': {9: 'x', 10: 'a', 11: 'y'}})
+
     @_patch_storage
     def test_history(self, _storage):
         self.assertTrue(history_add(':', 'a'))
@@ -0,0 +1,148 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+from collections import namedtuple
+
+from NeoVintageous.tests import unittest
+
+from NeoVintageous.nv.line_completion import _add_lines
+from NeoVintageous.nv.line_completion import get_line_completions
+from NeoVintageous.nv.line_completion import update_line_index
+from NeoVintageous.nv.session import _line_indexes
+from NeoVintageous.nv.session import get_line_index
+
+
+position = namedtuple('position', 'row col')
+change = namedtuple('change', 'a b str')
+
+
+class TestGetLineCompletions(unittest.ViewTestCase):
+
+    def completions(self, prefix: str, **kwargs) -> list:
+        return get_line_completions(self.view, prefix, self.view.sel()[0].b, **kwargs)
+
+    def test_nearest_line_above_is_first(self):
+        self.insert('fizz 1\n    fizz 2\nbuzz\nfi|\nfizz 3\n')
+        self.assertEqual(self.completions('fi'), ['fizz 2', 'fizz 1', 'fizz 3'])
+
+    def test_matches_are_unique(self):
+        self.insert('fizz\nfizz\n  fizz\nbuzz\nfi|\n')
+        self.assertEqual(self.completions('fi'), ['fizz'])
+
+    def test_empty_prefix_matches_all_lines(self):
+        self.insert('a\n\nb\n|\nc\n')
+        self.assertEqual(self.completions(''), ['b', 'a', 'c'])
+
+    def test_no_matches(self):
+        self.insert('fizz\nbuzz\nx|\n')
+        self.assertEqual(self.completions('x'), [])
+
+    def test_limit(self):
+        self.insert('a1\na2\na3\na4\na|')
+        self.assertEqual(self.completions('a', limit=2), ['a4', 'a3'])
+
+    def test_index_is_updated_when_the_view_changes(self):
+        self.insert('fizz 1\nbuzz\nfizz 2\nfi|')
+        self.assertEqual(self.completions('fi'), ['fizz 2', 'fizz 1'])
+        self.insert('fizz 1\nfizz 3\nbuzz\nfi|')
+        self.assertEqual(self.completions('fi'), ['fizz 3', 'fizz 1'])
+        self.insert('buzz\nfi|')
+        self.assertEqual(self.completions('fi'), [])
+
+    def test_complete_w_includes_other_views_in_window(self):
+        other = self.view.window().new_file()
+        try:
+            other.run_command('append', {'characters': 'fizz x\nfizz y\nfizz y\n'})
+            self.insert('fizz 1\nfi|')
+            self.assertEqual(self.completions('fi'), ['fizz 1'])
+            self.set_option('complete', '.,w', setting=False)
+            self.assertEqual(self.completions('fi'), ['fizz 1', 'fizz y', 'fizz x'])
+        finally:
+            other.set_scratch(True)
+            other.close()
+
+
+class _View():
+
+    def __init__(self, text: str):
+        self.text = text
+        self.changes = 0
+
+    def id(self) -> int:
+        return -1
+
+    def change_count(self) -> int:
+        return self.changes
+
+    def size(self) -> int:
+        return len(self.text)
+
+    def rowcol(self, pt: int) -> tuple:
+        return (self.text.count('\n', 0, pt), pt - self.text.rfind('\n', 0, pt) - 1)
+
+
+class TestUpdateLineIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.view = _View('fizz\n  buzz\nfizz')
+        index = get_line_index(self.view)
+        index['lines'] = self.view.text.split('\n')
+        _add_lines(index['buckets'], index['lines'])
+        index['change_count'] = 0
+
+    def tearDown(self):
+        del _line_indexes[self.view.id()]
+
+    def edit(self, text: str, *changes) -> dict:
+        self.view.text = text
+        self.view.changes += len(changes)
+        update_line_index(self.view, list(changes))
+
+        return get_line_index(self.view)
+
+    def assertIndex(self, index: dict, lines: list) -> None:
+        buckets = {}  # type: dict
+        _add_lines(buckets, lines)
+        self.assertEqual(index['lines'], lines)
+        self.assertEqual({k: dict(v) for k, v in index['buckets'].items() if v}, buckets)
+        self.assertEqual(index['change_count'], self.view.changes)
+
+    def test_insert_lines(self):
+        index = self.edit('fizz\n  bu\nx\nyzz\nfizz', change(position(1, 4), position(1, 4), '\nx\ny'))
+        self.assertIndex(index, ['fizz', '  bu', 'x', 'yzz', 'fizz'])
+
+    def test_delete_lines(self):
+        index = self.edit('fizz', change(position(0, 4), position(2, 4), ''))
+        self.assertIndex(index, ['fizz'])
+
+    def test_changes_are_applied_in_order(self):
+        index = self.edit(
+            'a\nfizz\n  buzz\nfuzz',
+            change(position(2, 1), position(2, 2), 'u'),
+            change(position(0, 0), position(0, 0), 'a\n'),
+        )
+        self.assertIndex(index, ['a', 'fizz', '  buzz', 'fuzz'])
+
+    def test_index_is_discarded_when_it_doesnt_match_the_view(self):
+        index = self.edit('fizz\n  buzz\nfizz\n', change(position(0, 0), position(0, 0), 'x'))
+        self.assertEqual(index['change_count'], None)
+        self.assertEqual(index['lines'], [])
+        self.assertEqual(index['buckets'], {})
+
+    def test_index_that_isnt_built_is_ignored(self):
+        get_line_index(self.view)['change_count'] = None
+        index = self.edit('x', change(position(0, 0), position(2, 4), 'x'))
+        self.assertEqual(index['lines'], ['fizz', '  buzz', 'fizz'])
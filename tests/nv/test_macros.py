@@ -18,6 +18,7 @@
 from NeoVintageous.tests import unittest
 
 from NeoVintageous.nv.macros import add_macro_step
+from NeoVintageous.nv.macros import get_compiled
 from NeoVintageous.nv.macros import get_recorded
 from NeoVintageous.nv.macros import is_readable
 from NeoVintageous.nv.macros import is_recording
@@ -73,3 +74,29 @@ class TestMacros(unittest.ViewTestCase):
         self.assertIsNone(get_recorded('a'))
         self.assertIsNone(get_recorded('b'))
         self.assertSessionEmpty()
+
+    @unittest.mock_session()
+    def test_get_compiled(self):
+        self.assertIsNone(get_compiled('a'))
+        start_recording('a')
+        add_macro_step(self.view, 'nv_vi_j', {'mode': 'mode_normal', 'count': 1, 'xpos': 0})
+        add_macro_step(self.view, 'nv_vi_d', {'mode': 'mode_normal', 'motion': {
+            'motion': 'nv_vi_k', 'motion_args': {'mode': 'mode_internal_normal', 'xpos': 0}}})
+        add_macro_step(self.view, 'nv_vi_x', {'mode': 'mode_normal'})
+        stop_recording()
+
+        plan = get_compiled('a')
+        self.assertEqual([cmd for cmd, args, xpos_args in plan], ['nv_vi_j', 'nv_vi_d', 'nv_vi_x'])
+        self.assertIs(plan[0][2], plan[0][1])
+        self.assertIs(plan[1][2], plan[1][1]['motion']['motion_args'])
+        self.assertIsNone(plan[2][2])
+        self.assertIs(plan, get_compiled('a'))
+
+        # Playing the plan must not modify the recording.
+        plan[0][1]['xpos'] = 7
+        self.assertEqual(0, get_recorded('a')[0][1]['xpos'])
+
+        start_recording('a')
+        add_macro_step(self.view, 'nv_vi_x', {'mode': 'mode_normal'})
+        stop_recording()
+        self.assertEqual([('nv_vi_x', {'mode': 'mode_normal'}, None)], get_compiled('a'))
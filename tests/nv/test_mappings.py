@@ -34,6 +34,7 @@ from NeoVintageous.nv.mappings import clear_mappings
 from NeoVintageous.nv.mappings import mappings_add
 from NeoVintageous.nv.mappings import mappings_remove
 from NeoVintageous.nv.mappings import mappings_resolve
+from NeoVintageous.nv.plugin import load_enabled_plugins
 from NeoVintageous.nv.plugin_commentary import CommentaryLines
 from NeoVintageous.nv.plugin_sneak import SneakS
 from NeoVintageous.nv.plugin_surround import SurroundS
@@ -279,6 +280,29 @@ class TestMappings(unittest.ViewTestCase):
         self.assertFalse(_has_partial_matches(self.view, unittest.NORMAL, 'fj1'))
         self.assertTrue(_has_partial_matches(self.view, unittest.NORMAL, 't'))
 
+    @unittest.mock_mappings()
+    def test_find_partial_match_after_remove(self):
+        mappings_add(unittest.NORMAL, 'abc', 'x')
+        mappings_add(unittest.NORMAL, 'ab', 'x')
+        mappings_add(unittest.NORMAL, 'FileType', 'js ad x')
+        mappings_add(unittest.NORMAL, '<C-w>a', 'x')
+        self.assertTrue(_has_partial_matches(self.view, unittest.NORMAL, 'ab'))
+        self.assertTrue(_has_partial_matches(self.view, unittest.NORMAL, '<C-w>'))
+        mappings_remove(unittest.NORMAL, 'abc')
+        self.assertTrue(_has_partial_matches(self.view, unittest.NORMAL, 'ab'))
+        self.assertFalse(_has_partial_matches(self.view, unittest.NORMAL, 'abc'))
+        mappings_remove(unittest.NORMAL, 'ab')
+        self.assertFalse(_has_partial_matches(self.view, unittest.NORMAL, 'ab'))
+        self.assertFalse(_has_partial_matches(self.view, unittest.NORMAL, 'a'))
+        self.assignFileName('test.js')
+        self.assertTrue(_has_partial_matches(self.view, unittest.NORMAL, 'a'))
+        mappings_remove(unittest.NORMAL, 'ad')
+        self.assertFalse(_has_partial_matches(self.view, unittest.NORMAL, 'a'))
+        self.assertTrue(_has_partial_matches(self.view, unittest.NORMAL, ''))
+        clear_mappings()
+        self.assertFalse(_has_partial_matches(self.view, unittest.NORMAL, ''))
+        self.assertFalse(_has_partial_matches(self.view, unittest.NORMAL, '<C-w>'))
+
     @unittest.mock_mappings()
     def test_find_full_match(self):
         self.assertEqual(_find_full_match(self.view, unittest.NORMAL, ''), None)
@@ -513,3 +537,32 @@ class TestSeqToCommand(unittest.TestCase):
             def settings(self):
                 pass
         self.assertIsInstance(_seq_to_command(seq='foobar', view=View(), mode='a'), CommandNotFound)
+
+
+class TestLoadEnabledPlugins(unittest.ViewTestCase):
+
+    @unittest.mock.patch('NeoVintageous.nv.plugin._loaded_plugins', new_callable=set)
+    @unittest.mock.patch('NeoVintageous.nv.plugin.import_module')
+    def test_imports_enabled_plugins_once(self, import_module, loaded_plugins):
+        self.set_setting('enable_multiple_cursors', True)
+        self.set_setting('enable_sublime', False)
+        load_enabled_plugins(self.view)
+        load_enabled_plugins(self.view)
+        import_module.assert_called_once_with('NeoVintageous.nv.plugin_multiple_cursors')
+        self.set_setting('enable_sublime', True)
+        load_enabled_plugins(self.view)
+        import_module.assert_called_with('NeoVintageous.nv.plugin_sublime')
+        self.assertEqual(import_module.call_count, 2)
+
+    @unittest.mock.patch('NeoVintageous.nv.plugin._loaded_plugins', new_callable=set)
+    @unittest.mock.patch('NeoVintageous.nv.plugin.import_module')
+    def test_disabled_plugins_are_checked_again_when_settings_change(self, import_module, loaded_plugins):
+        self.set_setting('enable_multiple_cursors', False)
+        self.set_setting('enable_sublime', False)
+        load_enabled_plugins(self.view)
+        with unittest.mock.patch('NeoVintageous.nv.plugin._get_setting') as get_setting:
+            load_enabled_plugins(self.view)
+            get_setting.assert_not_called()
+        self.set_setting('enable_sublime', True)
+        load_enabled_plugins(self.view)
+        import_module.assert_called_once_with('NeoVintageous.nv.plugin_sublime')
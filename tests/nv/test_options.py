@@ -237,6 +237,7 @@ class TestCompletions(unittest.TestCase):
         completions = list(get_option_completions())
 
         self.assertTrue('belloff' in completions)
+        self.assertTrue('history' in completions)
         self.assertTrue('hlsearch' in completions)
         self.assertTrue('ignorecase' in completions)
         self.assertTrue('list' in completions)
@@ -0,0 +1,63 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+from NeoVintageous.tests import unittest
+
+from NeoVintageous.nv.output import OutputSink
+
+
+class TestOutputSink(unittest.ViewTestCase):
+
+    def test_write_is_buffered_until_flushed(self):
+        output = OutputSink(self.view)
+        output.write('fizz\n')
+        output.write('buzz\n')
+        self.assertContent('')
+        output.flush()
+        self.assertContent('fizz\nbuzz\n')
+        output.flush()
+        self.assertContent('fizz\nbuzz\n')
+
+    def test_flush_appends_to_read_only_views(self):
+        self.view.set_read_only(True)
+        output = OutputSink(self.view)
+        output.write('fizz')
+        output.flush()
+        self.view.set_read_only(False)
+        self.assertContent('fizz')
+
+    def test_stream_small_output(self):
+        output = OutputSink(self.view)
+        output.write('fizz\nbuzz')
+        output.stream()
+        self.assertContent('fizz\nbuzz')
+
+    @unittest.mock.patch('NeoVintageous.nv.output._CHUNK_SIZE', 8)
+    @unittest.mock.patch('NeoVintageous.nv.output.set_timeout')
+    def test_stream_large_output_in_chunks_ending_at_line_breaks(self, set_timeout):
+        output = OutputSink(self.view)
+        output.write('1\n22\n333\n4444\n55555\n666666666666\n7')
+        output.stream()
+        self.assertContent('1\n22\n')
+        self.assertEqual('Writing output... 14%', self.view.get_status('vim-output'))
+        while set_timeout.call_args:
+            callback = set_timeout.call_args[0][0]
+            set_timeout.reset_mock()
+            callback()
+
+        self.assertContent('1\n22\n333\n4444\n55555\n666666666666\n7')
+        self.assertEqual('', self.view.get_status('vim-output'))
@@ -0,0 +1,166 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+import re
+
+from sublime import IGNORECASE
+from sublime import LITERAL
+
+from NeoVintageous.tests import unittest
+
+from NeoVintageous.nv import pattern
+from NeoVintageous.nv.pattern import translate_pattern
+
+
+class TestTranslatePattern(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = unittest.mock.patch.object(pattern, '_translate_cache', OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertTranslation(self, vim_pattern: str, expected: str, magic: bool = True) -> None:
+        translated = translate_pattern(vim_pattern, magic)
+        self.assertEqual(translated.pattern, expected)
+        self.assertEqual(translated.regex, expected)
+        self.assertEqual(translated.flags, 0)
+        re.compile(expected)
+
+    def assertLiteralTranslation(self, vim_pattern: str, expected: str, magic: bool = True) -> None:
+        translated = translate_pattern(vim_pattern, magic)
+        self.assertEqual(translated.pattern, expected)
+        self.assertEqual(translated.flags, LITERAL)
+        self.assertTrue(re.fullmatch(translated.regex, expected))
+
+    def test_magic(self):
+        self.assertTranslation('a.b*', 'a.b*')
+        self.assertTranslation('^a$', '^a$')
+        self.assertTranslation('a\\+b\\=c\\?', 'a+b?c?')
+        self.assertTranslation('\\(a\\|b\\)\\1', '(a|b)\\1')
+        self.assertTranslation('\\%(a\\)', '(?:a)')
+        self.assertLiteralTranslation('a+b?(c|d){2}', 'a+b?(c|d){2}')
+        self.assertLiteralTranslation('a\\.b\\*', 'a.b*')
+        self.assertLiteralTranslation('a^b$c', 'a^b$c')
+        self.assertLiteralTranslation('*a', '*a')
+        self.assertLiteralTranslation('[a', '[a')
+
+    def test_nomagic(self):
+        self.assertLiteralTranslation('a.b*[c]', 'a.b*[c]', magic=False)
+        self.assertTranslation('^a\\.b\\*$', '^a.b*$', magic=False)
+        self.assertTranslation('\\M^a\\.', '^a.')
+
+    def test_very_magic(self):
+        self.assertTranslation('\\v(a|b)+c?d=e{2,}', '(a|b)+c?d?e{2,}')
+        self.assertTranslation('\\v<a>', '\\b(?=\\w)a\\b(?<=\\w)')
+        self.assertTranslation('\\v%(a)', '(?:a)')
+        self.assertLiteralTranslation('\\va\\(b\\)\\{', 'a(b){')
+
+    def test_very_nomagic(self):
+        self.assertLiteralTranslation('\\V^a.b*$', '^a.b*$')
+        self.assertTranslation('\\V\\^a\\.\\$', '^a.$')
+
+    def test_word_boundaries(self):
+        self.assertTranslation('\\<a\\>', '\\b(?=\\w)a\\b(?<=\\w)')
+
+    def test_brace_multis(self):
+        self.assertTranslation('a\\{2}', 'a{2}')
+        self.assertTranslation('a\\{2,3}', 'a{2,3}')
+        self.assertTranslation('a\\{,3}', 'a{0,3}')
+        self.assertTranslation('a\\{2,}', 'a{2,}')
+        self.assertTranslation('a\\{}', 'a*')
+        self.assertTranslation('a\\{-}', 'a*?')
+        self.assertTranslation('a\\{-2,3}', 'a{2,3}?')
+        self.assertTranslation('a\\{2,3\\}', 'a{2,3}')
+
+    def assertMatchStartTranslation(self, vim_pattern: str, expected_pattern: str, expected_regex: str,
+                                    expected_match_start_regex: str) -> None:
+        translated = translate_pattern(vim_pattern)
+        self.assertEqual(translated.pattern, expected_pattern)
+        self.assertEqual(translated.regex, expected_regex)
+        self.assertEqual(translated.match_start_regex, expected_match_start_regex)
+        re.compile(expected_regex)
+
+    def test_match_start_and_end(self):
+        self.assertTranslation('a\\zeb', 'a(?=b)')
+        self.assertMatchStartTranslation('a\\zsb', 'a\\Kb', 'ab', 'a(?=b)')
+        self.assertMatchStartTranslation('a\\zsb\\zec', 'a\\Kb(?=c)', 'ab(?=c)', 'a(?=b(?=c))')
+
+    def test_match_start_after_variable_width_text(self):
+        self.assertMatchStartTranslation('^\\s*\\zsfoo', '^[ \\t]*\\Kfoo', '^[ \\t]*foo', '^[ \\t]*(?=foo)')
+        self.assertMatchStartTranslation('foo.*\\zsbar', 'foo.*\\Kbar', 'foo.*bar', 'foo.*(?=bar)')
+        self.assertMatchStartTranslation('\\(x\\)\\zs\\1', '(x)\\K\\1', '(x)\\1', '(x)(?=\\1)')
+
+    def test_match_start_in_group_or_alternative_is_a_lookbehind(self):
+        self.assertMatchStartTranslation('\\(a\\zsb\\)', '(a\\Kb)', '((?<=a)b)', None)
+        self.assertMatchStartTranslation('a\\zsb\\|c', 'a\\Kb|c', '(?<=a)b|c', None)
+
+    def test_lookarounds(self):
+        self.assertTranslation('\\(a\\)\\@<=b', '(?<=(a))b')
+        self.assertTranslation('\\(a\\)\\@<!b', '(?<!(a))b')
+        self.assertTranslation('a\\(b\\)\\@=', 'a(?=(b))')
+        self.assertTranslation('a\\(b\\)\\@!', 'a(?!(b))')
+        self.assertTranslation('.*a\\&.*b', '(?=.*a).*b')
+
+    def test_character_classes(self):
+        self.assertTranslation('\\d\\s\\w', '[0-9][ \\t][0-9A-Za-z_]')
+        self.assertTranslation('\\D\\S', '[^0-9\\n][^ \\t\\n]')
+        self.assertTranslation('\\_s\\_S\\_.', '[ \\t\\n][^ \\t][\\s\\S]')
+
+    def test_collections(self):
+        self.assertTranslation('[a-z]', '[a-z]')
+        self.assertTranslation('[^a-z]', '[^a-z\\n]')
+        self.assertTranslation('\\_[a-z]', '[a-z\\n]')
+        self.assertTranslation('[]a-]', '[\\]a\\-]')
+        self.assertTranslation('[[:alpha:][:digit:]]', '[A-Za-z0-9]')
+        self.assertTranslation('[\\t\\]\\\\]', '[\t\\]\\\\]')
+
+    def test_optional_sequence(self):
+        self.assertTranslation('fu\\%[nc]', 'fu(?:n(?:c)?)?')
+
+    def test_character_codes(self):
+        self.assertLiteralTranslation('\\%d97\\%x62\\%u0063', 'abc')
+
+    def test_in_visual_area(self):
+        translated = translate_pattern('\\%Va')
+        self.assertEqual(translated.pattern, 'a')
+        self.assertTrue(translated.in_visual)
+
+    def test_case(self):
+        self.assertEqual(translate_pattern('a', True, True, False).flags, LITERAL | IGNORECASE)
+        self.assertEqual(translate_pattern('A', True, True, False).flags, LITERAL | IGNORECASE)
+        self.assertEqual(translate_pattern('A', True, True, True).flags, LITERAL)
+        self.assertEqual(translate_pattern('\\Sa', True, True, True).flags, IGNORECASE)
+        self.assertEqual(translate_pattern('a\\c', True, False, False).flags, LITERAL | IGNORECASE)
+        self.assertEqual(translate_pattern('a\\C', True, True, False).flags, LITERAL)
+        self.assertEqual(translate_pattern('a\\C\\c', True, False, False).flags, LITERAL | IGNORECASE)
+
+    def test_translations_are_cached(self):
+        with unittest.mock.patch('NeoVintageous.nv.pattern._translate', wraps=pattern._translate) as translate:
+            self.assertIs(translate_pattern('a.'), translate_pattern('a.'))
+            self.assertEqual(translate.call_count, 1)
+            translate_pattern('a.', False)
+            self.assertEqual(translate.call_count, 2)
+
+    @unittest.mock.patch('NeoVintageous.nv.pattern._TRANSLATE_CACHE_SIZE', 2)
+    def test_cache_evicts_least_recently_used(self):
+        translate_pattern('a')
+        translate_pattern('b')
+        translate_pattern('a')
+        translate_pattern('c')
+        self.assertEqual([key[0] for key in pattern._translate_cache], ['a', 'c'])
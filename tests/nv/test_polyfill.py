@@ -20,6 +20,9 @@ from NeoVintageous.tests import unittest
 
 from NeoVintageous.nv.polyfill import view_find
 from NeoVintageous.nv.polyfill import view_find_in_range
+from NeoVintageous.nv.polyfill import view_rfind_all
+from NeoVintageous.nv.polyfill import view_rfind_all_in_range
+from NeoVintageous.nv.polyfill import view_rfind_in_range
 
 
 class TestViewFind(unittest.ViewTestCase):
@@ -54,3 +57,61 @@ class TestViewFindInRange(unittest.ViewTestCase):
         self.normal('|fizz buzz')
         self.assertIsNone(view_find_in_range(self.view, 'x', 0, 9))
         self.assertIsNone(view_find_in_range(self.view, 'u', 1, 6))
+
+
+class TestViewRfindInRange(unittest.ViewTestCase):
+
+    def test_match(self):
+        self.normal('|fizz buzz')
+        self.assertRegion(view_rfind_in_range(self.view, 'z', 0, 9), (8, 9))
+        self.assertRegion(view_rfind_in_range(self.view, 'z', 0, 8), (7, 8))
+        self.assertRegion(view_rfind_in_range(self.view, 'z', 0, 7), (3, 4))
+        self.assertRegion(view_rfind_in_range(self.view, 'f', 0, 9), (0, 1))
+
+    def test_no_match(self):
+        self.normal('|fizz buzz')
+        self.assertIsNone(view_rfind_in_range(self.view, 'x', 0, 9))
+        self.assertIsNone(view_rfind_in_range(self.view, 'f', 1, 9))
+        self.assertIsNone(view_rfind_in_range(self.view, 'b', 0, 5))
+
+    def test_zero_length_match(self):
+        self.normal('|fizz buzz\nfizz')
+        self.assertRegion(view_rfind_in_range(self.view, '^', 0, 14), (10, 10))
+        self.assertRegion(view_rfind_in_range(self.view, '^', 0, 9), (0, 0))
+
+    @unittest.mock.patch('NeoVintageous.nv.polyfill._RFIND_WINDOW_SIZE', 4)
+    def test_match_across_windows(self):
+        self.normal('|fizz\nbuzz\nbuzz\nbuzz\nbuzz\nbuzz')
+        self.assertRegion(view_rfind_in_range(self.view, 'f', 0, self.view.size()), (0, 1))
+        self.assertRegion(view_rfind_in_range(self.view, 'z+\\n', 0, self.view.size()), (22, 25))
+
+    @unittest.mock.patch('NeoVintageous.nv.polyfill._RFIND_WINDOW_SIZE', 4)
+    def test_windows_are_fixed_size(self):
+        self.normal('|fizz\nbuzz\nbuzz\nbuzz\nbuzz\nbuzz')
+        with unittest.mock.patch.object(self.view, 'substr', wraps=self.view.substr) as substr:
+            self.assertRegion(view_rfind_in_range(self.view, 'f', 0, self.view.size()), (0, 1))
+            for args, kwargs in substr.call_args_list:
+                self.assertLessEqual(args[0].size(), 14)
+
+    def test_pattern_python_cant_compile(self):
+        self.normal('|fizz buzz')
+        self.assertRegion(view_rfind_in_range(self.view, '(?<z>z)', 0, 9), (8, 9))
+        self.assertRegion(view_rfind_in_range(self.view, '(?<z>z)', 0, 7), (3, 4))
+
+    def test_posix_class(self):
+        self.normal('|fizz 12 buzz')
+        self.assertRegion(view_rfind_in_range(self.view, '[[:digit:]]', 0, 13), (6, 7))
+        self.assertRegion(view_rfind_in_range(self.view, '[[:alpha:]]+', 0, 4), (0, 4))
+
+
+class TestViewRfindAllInRange(unittest.ViewTestCase):
+
+    @unittest.mock.patch('NeoVintageous.nv.polyfill._RFIND_WINDOW_SIZE', 4)
+    def test_match_across_windows(self):
+        self.normal('|a\nxa\naa\nxxxxxxxxxa\na')
+        self.assertEqual([(19, 20), (17, 18), (6, 7), (5, 6), (3, 4), (0, 1)], [
+            (r.a, r.b) for r in view_rfind_all_in_range(self.view, 'a', 0, self.view.size())])
+        self.assertEqual([(6, 7), (5, 6), (3, 4)], [
+            (r.a, r.b) for r in view_rfind_all_in_range(self.view, 'a', 2, 8)])
+        self.assertEqual([(6, 7), (5, 6), (3, 4), (0, 1)], [
+            (r.a, r.b) for r in view_rfind_all(self.view, 'a', 8)])
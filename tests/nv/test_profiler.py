@@ -0,0 +1,195 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+
+from NeoVintageous.tests import unittest
+
+from NeoVintageous.nv import profiler
+from NeoVintageous.nv.process_notation import ProcessNotationHandler
+from NeoVintageous.nv.profiler import RESET_COMMAND_DATA
+from NeoVintageous.nv.profiler import RESOLVE
+from NeoVintageous.nv.profiler import RUN_COMMAND
+from NeoVintageous.nv.profiler import TRANSLATE
+from NeoVintageous.nv.profiler import clear_profile
+from NeoVintageous.nv.profiler import count_query_context
+from NeoVintageous.nv.profiler import format_profile_stats
+from NeoVintageous.nv.profiler import get_profile_stats
+from NeoVintageous.nv.profiler import get_query_context_stats
+from NeoVintageous.nv.profiler import profiling
+
+
+class TestProfiler(unittest.ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        clear_profile()
+
+    def tearDown(self):
+        clear_profile()
+        super().tearDown()
+
+    @unittest.mock.patch('NeoVintageous.nv.profiler._enabled', False)
+    def test_disabled_by_default(self):
+        with profiling(self.view, RESOLVE):
+            pass
+
+        self.assertEqual({'phases': {}, 'commands': {}}, get_profile_stats())
+        self.assertEqual('No timings recorded', format_profile_stats())
+
+    @unittest.mock.patch('NeoVintageous.nv.profiler._enabled', True)
+    def test_enabled(self):
+        with profiling(self.view, RESOLVE):
+            pass
+
+        with profiling(self.view, RUN_COMMAND, 'nv_vi_w'):
+            pass
+
+        stats = get_profile_stats()
+        self.assertEqual(1, stats['phases'][RESOLVE]['count'])
+        self.assertEqual(1, stats['phases'][RUN_COMMAND]['count'])
+        self.assertEqual(['nv_vi_w'], list(stats['commands'].keys()))
+
+    @unittest.mock.patch('NeoVintageous.nv.profiler._enabled', None)
+    @unittest.mock.patch('NeoVintageous.nv.profiler.load_settings')
+    def test_enabled_by_preference(self, load_settings):
+        preferences = load_settings.return_value
+        preferences.get.return_value = True
+        with unittest.mock.patch('NeoVintageous.nv.profiler._ENV_ENABLED', False):
+            with profiling(self.view, TRANSLATE):
+                pass
+
+            self.assertEqual(1, get_profile_stats()['phases'][TRANSLATE]['count'])
+            preferences.get.assert_called_once_with('vintageous_profile')
+
+            # The preference is only read again when the preferences change.
+            with profiling(self.view, TRANSLATE):
+                pass
+
+            self.assertEqual(2, get_profile_stats()['phases'][TRANSLATE]['count'])
+            self.assertEqual(1, preferences.get.call_count)
+            preferences.add_on_change.assert_called_once_with('NeoVintageous.profiler', profiler._update_enabled)
+            preferences.get.return_value = False
+            profiler._update_enabled()
+            with profiling(self.view, TRANSLATE):
+                pass
+
+            self.assertEqual(2, get_profile_stats()['phases'][TRANSLATE]['count'])
+
+    @unittest.mock.patch('NeoVintageous.nv.profiler._enabled', None)
+    @unittest.mock.patch('NeoVintageous.nv.profiler.load_settings')
+    def test_enabled_by_env(self, load_settings):
+        load_settings.return_value.get.return_value = False
+        with unittest.mock.patch('NeoVintageous.nv.profiler._ENV_ENABLED', True):
+            with profiling(self.view, TRANSLATE):
+                pass
+
+        self.assertEqual(1, get_profile_stats()['phases'][TRANSLATE]['count'])
+
+    @unittest.mock.patch('NeoVintageous.nv.profiler._enabled', True)
+    @unittest.mock.patch('NeoVintageous.nv.profiler._timings', profiler.deque(maxlen=3))
+    def test_ring_buffer_is_bounded(self):
+        for i in range(10):
+            with profiling(self.view, RESOLVE):
+                pass
+
+        self.assertEqual(3, get_profile_stats()['phases'][RESOLVE]['count'])
+
+    def test_percentiles(self):
+        profiler._timings.extend((RESOLVE, '', i / 1000) for i in range(1, 101))
+        stats = get_profile_stats()['phases'][RESOLVE]
+        self.assertEqual(100, stats['count'])
+        self.assertAlmostEqual(0.050, stats['p50'])
+        self.assertAlmostEqual(0.095, stats['p95'])
+        self.assertAlmostEqual(0.099, stats['p99'])
+
+    @unittest.mock.patch('NeoVintageous.nv.profiler._enabled', True)
+    def test_counts_query_contexts_per_key(self):
+        with profiling(self.view, RESOLVE):
+            pass
+
+        with profiling(self.view, RESOLVE):
+            pass
+
+        for i in range(3):
+            count_query_context('vi_command_mode_aware')
+
+        self.assertEqual({'vi_command_mode_aware': (3, 1.5)}, get_query_context_stats())
+        self.assertRegex(format_profile_stats(), '\nQuery context +calls +per key\nvi_command_mode_aware +3 +1.5\n')
+        clear_profile()
+        self.assertEqual({}, get_query_context_stats())
+
+    @unittest.mock.patch('NeoVintageous.nv.profiler._enabled', False)
+    def test_query_contexts_are_not_counted_when_disabled(self):
+        count_query_context('vi_command_mode_aware')
+
+        self.assertEqual({}, get_query_context_stats())
+
+    def test_format(self):
+        profiler._timings.append((RESOLVE, '', 0.001))
+        profiler._timings.append((RUN_COMMAND, 'nv_vi_j', 0.002))
+        output = format_profile_stats()
+        self.assertRegex(output, '^Phase +count +p50 ms +p95 ms +p99 ms\n')
+        self.assertRegex(output, '\nresolve +1 +1.000 +1.000 +1.000\n')
+        self.assertRegex(output, '\nrun_command +1 +2.000 +2.000 +2.000\n')
+        self.assertRegex(output, '\nCommand +count +p50 ms +p95 ms +p99 ms\nnv_vi_j +1 +2.000 +2.000 +2.000$')
+
+
+# Recorded key streams replayed against a fixture buffer. Rather than timing
+# the replay, which is unreliable on shared machines, the benchmark bounds the
+# number of pipeline phases run per key: it's meant to catch gross regressions
+# in the key-dispatch pipeline, such as keys being resolved or commands being
+# run more than once, not to measure it precisely.
+_REPLAY_FIXTURE = ''.join('line {} fizz buzz (foo, [bar]) {{baz}}\n'.format(i) for i in range(2000))
+_REPLAY_MAX_RESOLVES_PER_KEY = 2
+_REPLAY_MAX_PHASES_PER_KEY = 8
+_REPLAY_KEY_STREAMS = (
+    'wwwwwbbbbbeeeee',
+    'jjjjjkkkkk10j5kG',
+    'gg50Gggdd',
+    '3ddjdwx',
+    'yyjpkP',
+    'ci(xyz<Esc>',
+    'fzFf;,',
+)
+
+
+class TestProfilerReplayBenchmark(unittest.ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        clear_profile()
+        patcher = unittest.mock.patch('NeoVintageous.nv.profiler._enabled', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        clear_profile()
+        super().tearDown()
+
+    def test_replay(self):
+        for keys in _REPLAY_KEY_STREAMS:
+            self.normal('|' + _REPLAY_FIXTURE)
+            clear_profile()
+
+            ProcessNotationHandler(self.view, keys, 0, False).handle()
+
+            stats = get_profile_stats()
+            for phase in (RESOLVE, TRANSLATE, RUN_COMMAND, RESET_COMMAND_DATA):
+                self.assertIn(phase, stats['phases'], keys)
+
+            phases = sum(summary['count'] for summary in stats['phases'].values())
+            self.assertLessEqual(stats['phases'][RESOLVE]['count'], len(keys) * _REPLAY_MAX_RESOLVES_PER_KEY, keys)
+            self.assertLessEqual(phases, len(keys) * _REPLAY_MAX_PHASES_PER_KEY, keys)
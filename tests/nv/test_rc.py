@@ -15,10 +15,18 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+import json
+import os
+import tempfile
+
 from NeoVintageous.tests import unittest
 
+from NeoVintageous.nv import rc
+from NeoVintageous.nv.mappings import _mappings
+from NeoVintageous.nv.options import get_option
 from NeoVintageous.nv.rc import _parse_line
 from NeoVintageous.nv.rc import _PARSE_LINE_PATTERN
+from NeoVintageous.nv.variables import get as get_variable
 
 
 class TestRcfile(unittest.TestCase):
@@ -167,3 +175,93 @@ class TestRcfile(unittest.TestCase):
 
         for value, expected in tests:
             self.assertEqual(expected, _parse_line(value))
+
+
+@unittest.mock.patch.dict('NeoVintageous.nv.options._session', {}, clear=True)
+@unittest.mock.patch.dict('NeoVintageous.nv.variables._variables', {}, clear=True)
+class TestCompiledRc(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rc_file = os.path.join(self.tmp.name, '.neovintageousrc')
+        self.compiled_file = os.path.join(self.tmp.name, 'neovintageousrc.compiled')
+        patcher = unittest.mock.patch.multiple(
+            rc,
+            _file_path=lambda: self.rc_file,
+            _compiled_file_path=lambda: self.compiled_file
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_rc(self, content: str, mtime: int) -> None:
+        with open(self.rc_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        os.utime(self.rc_file, (mtime, mtime))
+
+    def compiled(self) -> dict:
+        with open(self.compiled_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @unittest.mock_mappings()
+    def test_rc_is_compiled(self):
+        self.write_rc('let mapleader=,\nnnoremap <leader>x dd\nset nohlsearch\n', 1000)
+        rc.reload_rc()
+        compiled = self.compiled()
+        self.assertEqual(compiled['mappings'][unittest.NORMAL], {',x': 'dd'})
+        self.assertEqual(compiled['variables'], {'mapleader': ','})
+        self.assertEqual(compiled['options'], [{'option': 'nohlsearch', 'value': None}])
+
+    @unittest.mock_mappings()
+    def test_compiled_rc_is_loaded_without_running_ex_commands(self):
+        self.write_rc('let mapleader=,\nnnoremap <leader>x dd\nset nohlsearch\n', 1000)
+        rc.reload_rc()
+        with unittest.mock.patch('NeoVintageous.nv.ex_cmds.do_ex_cmdline') as do_ex_cmdline:
+            rc.reload_rc()
+            self.assertEqual(do_ex_cmdline.call_count, 0)
+
+        self.assertEqual(_mappings[unittest.NORMAL], {',x': 'dd'})
+        self.assertEqual(get_variable('mapleader'), ',')
+        self.assertEqual(get_option(None, 'hlsearch'), False)
+
+    @unittest.mock_mappings()
+    def test_compiled_rc_is_loaded_if_only_mtime_changed(self):
+        self.write_rc('nnoremap x dd\n', 1000)
+        rc.reload_rc()
+        self.write_rc('nnoremap x dd\n', 2000)
+        with unittest.mock.patch('NeoVintageous.nv.ex_cmds.do_ex_cmdline') as do_ex_cmdline:
+            rc.reload_rc()
+            self.assertEqual(do_ex_cmdline.call_count, 0)
+
+        self.assertEqual(_mappings[unittest.NORMAL], {'x': 'dd'})
+        self.assertEqual(self.compiled()['rc_mtime'], 2000)
+
+    @unittest.mock_mappings()
+    def test_rc_is_compiled_again_when_changed(self):
+        self.write_rc('nnoremap x dd\n', 1000)
+        rc.reload_rc()
+        self.write_rc('nnoremap y dd\n', 2000)
+        rc.reload_rc()
+        self.assertEqual(_mappings[unittest.NORMAL], {'y': 'dd'})
+        self.assertEqual(self.compiled()['mappings'][unittest.NORMAL], {'y': 'dd'})
+
+    @unittest.mock_mappings()
+    @unittest.mock.patch('NeoVintageous.nv.rc.message')
+    def test_rc_with_errors_is_not_compiled(self, message):
+        self.write_rc('nnoremap x dd\nnoremap x|y abc\n', 1000)
+        rc.reload_rc()
+        self.assertEqual(_mappings[unittest.NORMAL], {'x': 'dd'})
+        self.assertFalse(os.path.exists(self.compiled_file))
+
+    @unittest.mock_mappings()
+    @unittest.mock.patch('NeoVintageous.nv.rc.message')
+    def test_rc_with_invalid_commands_is_not_compiled(self, message):
+        for line in ('nnoremap x', 'let x'):
+            self.write_rc('nnoremap x dd\n{}\n'.format(line), 1000)
+            rc.reload_rc()
+            self.assertEqual(_mappings[unittest.NORMAL], {'x': 'dd'})
+            self.assertFalse(os.path.exists(self.compiled_file), line)
+            self.assertEqual(message.call_count, 1, line)
+            message.reset_mock()
@@ -15,8 +15,17 @@
 # You should have received a copy of the GNU General Public License
 # along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
 
+from sublime import IGNORECASE
+from sublime import LITERAL
+
 from NeoVintageous.tests import unittest
 
+from NeoVintageous.nv.search import clear_search_highlighting
+from NeoVintageous.nv.search import find_search_occurrences
+from NeoVintageous.nv.search import find_search_occurrences_in_range
+from NeoVintageous.nv.search import get_cached_search_occurrences
+from NeoVintageous.nv.search import highlight_search
+from NeoVintageous.nv.search import narrow_search_occurrences
 from NeoVintageous.nv.search import process_search_pattern
 from NeoVintageous.nv.search import process_word_search_pattern
 
@@ -41,13 +50,28 @@ class Test_flags(unittest.ViewTestCase):
         self.set_option('ignorecase', False)
         self.set_option('magic', True)
         self.assertEqual(('[0-9]', 0), process_search_pattern(self.view, '[0-9]'))
-        literals = ('[', ']', '(', ')', '\'[', '"[')
+        literals = ('[', ']', '(', ')', '\'[', '"[', 'x?', '(x|y)', 'x+')
         for literal in literals:
             self.assertEqual((literal, 1), process_search_pattern(self.view, literal))
 
-        regex = ('[0-9]+', '.+', '^', '.*', 'x?', '(x|y)')
-        for literal in regex:
-            self.assertEqual((literal, 0), process_search_pattern(self.view, literal))
+        regex = {
+            '[0-9]\\+': '[0-9]+',
+            '.*': '.*',
+            '^': '^',
+            'x\\?': 'x?',
+            '\\(x\\|y\\)': '(x|y)',
+            '\\<x\\>': '\\b(?=\\w)x\\b(?<=\\w)',
+        }
+        for pattern, expected in regex.items():
+            self.assertEqual((expected, 0), process_search_pattern(self.view, pattern))
+
+    def test_process_search_pattern_smartcase(self):
+        self.set_option('ignorecase', True)
+        self.set_option('smartcase', True)
+        self.assertEqual(('fizz', 3), process_search_pattern(self.view, 'fizz'))
+        self.assertEqual(('Fizz', 1), process_search_pattern(self.view, 'Fizz'))
+        self.assertEqual(('[^ \\t\\n]izz', 2), process_search_pattern(self.view, '\\Sizz'))
+        self.assertEqual(('Fizz', 3), process_search_pattern(self.view, 'Fizz\\c'))
 
     def test_process_search_pattern_with_modes(self):
         self.set_option('ignorecase', False)
@@ -71,3 +95,152 @@ class Test_flags(unittest.ViewTestCase):
         self.set_option('magic', False)
         self.set_option('ignorecase', True)
         self.assertEqual(('\\bfizz\\b', 2), process_word_search_pattern(self.view, 'fizz'))
+
+
+@unittest.mock.patch('NeoVintageous.nv.search._HIGHLIGHT_BATCH_SIZE', 4)
+@unittest.mock.patch('NeoVintageous.nv.search.set_timeout')
+class TestHighlightSearch(unittest.ViewTestCase):
+
+    def highlight_search(self, pattern: str, visible: tuple, flags: int = 0, narrow_from: dict = None) -> dict:
+        with unittest.mock.patch.object(self.view, 'visible_region', return_value=self.Region(*visible)):
+            return highlight_search(self.view, pattern, flags, narrow_from=narrow_from)
+
+    def run_batches(self, set_timeout) -> None:
+        while set_timeout.call_count:
+            callback = set_timeout.call_args[0][0]
+            set_timeout.reset_mock()
+            callback()
+
+    def test_visible_region_is_highlighted_first(self, set_timeout):
+        self.normal('xa\nxa\nxa\nx|a\nxa\nxa\n')
+        self.highlight_search('a', (6, 10))
+        self.assertSearch('xa\nxa\nx|a|\nx|a|\nxa\nxa\n')
+        self.assertSearchCurrent('xa\nxa\nxa\nx|a|\nxa\nxa\n')
+        self.run_batches(set_timeout)
+        self.assertSearch('x|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\n')
+        self.assertSearchCurrent('xa\nxa\nxa\nx|a|\nxa\nxa\n')
+
+    def test_current_occurrence_found_off_screen(self, set_timeout):
+        self.normal('xa\nxa\nxa\nxa\nxa\nx|a\n')
+        self.highlight_search('a', (0, 4))
+        self.assertSearch('x|a|\nx|a|\nxa\nxa\nxa\nxa\n')
+        self.assertSearchCurrent('xa\nxa\nxa\nxa\nxa\nxa\n')
+        self.run_batches(set_timeout)
+        self.assertSearch('x|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\n')
+        self.assertSearchCurrent('xa\nxa\nxa\nxa\nxa\nx|a|\n')
+
+    def test_off_screen_occurrences_are_highlighted_when_done(self, set_timeout):
+        self.normal('xa\nxa\nxa\nxa\nxa\nx|a\nxa\nxa\nxa\nxa\nxa\nxa\n')
+        self.highlight_search('a', (15, 19))
+        set_timeout.call_args[0][0]()
+        self.assertSearch('xa\nxa\nxa\nxa\nxa\nx|a|\nx|a|\nxa\nxa\nxa\nxa\nxa\n')
+        self.run_batches(set_timeout)
+        self.assertSearch('x|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\nx|a|\n')
+
+    @unittest.mock.patch.dict('NeoVintageous.nv.session._search_occurrences', clear=True)
+    def test_narrows_the_search_progress_of_a_prefix(self, set_timeout):
+        self.normal('xa\nxab\nxa\nx|ab\nxab\nxa\n')
+        progress = self.highlight_search('a', (7, 12), LITERAL)
+        set_timeout.call_args[0][0]()
+        set_timeout.reset_mock()
+        with unittest.mock.patch.object(self.view, 'find') as find:
+            self.highlight_search('ab', (7, 12), LITERAL, progress)
+            find.assert_not_called()
+        self.assertSearch('xa\nx|ab|\nxa\nx|ab|\nx|ab|\nxa\n')
+        self.run_batches(set_timeout)
+        self.assertSearch('xa\nx|ab|\nxa\nx|ab|\nx|ab|\nxa\n')
+        self.assertEqual([self.Region(4, 6), self.Region(11, 13), self.Region(15, 17)],
+                         get_cached_search_occurrences(self.view, 'ab', LITERAL))
+
+    def test_clearing_cancels_background_highlighting(self, set_timeout):
+        self.normal('xa\nxa\nxa\nx|a\nxa\nxa\n')
+        self.highlight_search('a', (6, 10))
+        clear_search_highlighting(self.view)
+        self.run_batches(set_timeout)
+        self.assertNoSearch()
+
+
+@unittest.mock.patch.dict('NeoVintageous.nv.session._search_occurrences', clear=True)
+class TestSearchOccurrencesCache(unittest.ViewTestCase):
+
+    def test_occurrences_are_cached_until_the_buffer_changes(self):
+        self.write('fizz buzz fizz')
+        self.assertIsNone(get_cached_search_occurrences(self.view, 'fizz', 0))
+        occurrences = find_search_occurrences(self.view, 'fizz', 0)
+        self.assertEqual([self.Region(0, 4), self.Region(10, 14)], occurrences)
+        self.assertIs(occurrences, get_cached_search_occurrences(self.view, 'fizz', 0))
+        self.assertIs(occurrences, find_search_occurrences(self.view, 'fizz', 0))
+        self.assertIsNone(get_cached_search_occurrences(self.view, 'fizz', 1))
+        self.write('fizz')
+        self.assertIsNone(get_cached_search_occurrences(self.view, 'fizz', 0))
+        self.assertEqual([self.Region(0, 4)], find_search_occurrences(self.view, 'fizz', 0))
+
+    @unittest.mock.patch('NeoVintageous.nv.search._OCCURRENCES_CACHE_SIZE', 2)
+    def test_least_recently_used_pattern_is_evicted(self):
+        self.write('a b c')
+        find_search_occurrences(self.view, 'a', 0)
+        find_search_occurrences(self.view, 'b', 0)
+        get_cached_search_occurrences(self.view, 'a', 0)
+        find_search_occurrences(self.view, 'c', 0)
+        self.assertIsNotNone(get_cached_search_occurrences(self.view, 'a', 0))
+        self.assertIsNone(get_cached_search_occurrences(self.view, 'b', 0))
+        self.assertIsNotNone(get_cached_search_occurrences(self.view, 'c', 0))
+
+    @unittest.mock.patch('NeoVintageous.nv.search._OCCURRENCES_CACHE_MAX_REGIONS', 2)
+    def test_occurrences_over_the_memory_cap_are_not_cached(self):
+        self.write('a a a')
+        self.assertEqual(3, len(find_search_occurrences(self.view, 'a', 0)))
+        self.assertIsNone(get_cached_search_occurrences(self.view, 'a', 0))
+
+    def test_find_in_range(self):
+        self.write('ab\nab\nab\nab')
+        expected = [self.Region(3, 4), self.Region(6, 7)]
+        self.assertEqual(expected, find_search_occurrences_in_range(self.view, 'a', 0, 2, 8))
+        find_search_occurrences(self.view, 'a', 0)
+        self.assertEqual(expected, find_search_occurrences_in_range(self.view, 'a', 0, 2, 8))
+        self.assertEqual([], find_search_occurrences_in_range(self.view, 'a', 0, 1, 3))
+
+
+@unittest.mock.patch.dict('NeoVintageous.nv.session._search_occurrences', clear=True)
+class TestNarrowSearchOccurrences(unittest.ViewTestCase):
+
+    def test_narrows_the_occurrences_of_the_prefix(self):
+        self.write('fizz fuzz fizzbuzz fi')
+        find_search_occurrences(self.view, 'f', LITERAL)
+        with unittest.mock.patch.object(self.view, 'find_all') as find_all:
+            occurrences = narrow_search_occurrences(self.view, 'f', 'fiz', LITERAL)
+            self.assertEqual([self.Region(0, 3), self.Region(10, 13)], occurrences)
+            self.assertIs(occurrences, find_search_occurrences(self.view, 'fiz', LITERAL))
+            self.assertEqual([self.Region(10, 18)], narrow_search_occurrences(self.view, 'fiz', 'fizzbuzz', LITERAL))
+            self.assertEqual([], narrow_search_occurrences(self.view, 'fizzbuzz', 'fizzbuzzx', LITERAL))
+            self.assertEqual(0, find_all.call_count)
+
+    def test_ignorecase(self):
+        self.write('Fizz fIZZ fuzz')
+        find_search_occurrences(self.view, 'f', LITERAL | IGNORECASE)
+        expected = [self.Region(0, 3), self.Region(5, 8)]
+        self.assertEqual(expected, narrow_search_occurrences(self.view, 'f', 'fiz', LITERAL | IGNORECASE))
+
+    def test_overlapping_occurrences_are_found_once(self):
+        self.write('abxabxab')
+        find_search_occurrences(self.view, 'ab', LITERAL)
+        self.assertEqual([self.Region(0, 5)], narrow_search_occurrences(self.view, 'ab', 'abxab', LITERAL))
+
+    def test_requires_full_search(self):
+        self.write('aaa fizz')
+        self.assertIsNone(narrow_search_occurrences(self.view, 'f', 'fi', LITERAL))
+        find_search_occurrences(self.view, 'f', LITERAL)
+        self.assertIsNone(narrow_search_occurrences(self.view, 'f', 'fi', 0))
+        self.assertIsNone(narrow_search_occurrences(self.view, 'f', 'f', LITERAL))
+        self.assertIsNone(narrow_search_occurrences(self.view, 'f', 'xf', LITERAL))
+        self.assertIsNone(narrow_search_occurrences(self.view, 'f', 'fi', LITERAL | IGNORECASE))
+        find_search_occurrences(self.view, 'aa', LITERAL)
+        self.assertIsNone(narrow_search_occurrences(self.view, 'aa', 'aaa', LITERAL))
+        find_search_occurrences(self.view, 'f', LITERAL | IGNORECASE)
+        self.assertIsNone(narrow_search_occurrences(self.view, 'f', 'f\u00e9', LITERAL | IGNORECASE))
+
+    def test_buffer_changes_require_full_search(self):
+        self.write('fizz')
+        find_search_occurrences(self.view, 'f', LITERAL)
+        self.write('fizz fizz')
+        self.assertIsNone(narrow_search_occurrences(self.view, 'f', 'fi', LITERAL))
@@ -36,6 +36,31 @@ class TestSession(unittest.ViewTestCase):
         session.session_on_close(view)
         view.id.assert_called_once()
 
+    @unittest.mock_session()
+    def test_session_on_close_removes_command_state(self):
+        state = session.get_command_state(self.view)
+        state.sequence = 'abc'
+        self.assertIs(state, session.get_command_state(self.view))
+        session.session_on_close(self.view)
+        self.assertIsNot(state, session.get_command_state(self.view))
+        self.assertEqual('', session.get_command_state(self.view).sequence)
+
+    @unittest.mock_session()
+    def test_session_on_close_removes_search_occurrences_cache(self):
+        cache = session.get_search_occurrences_cache(self.view)
+        cache[('x', 0, 1)] = []
+        self.assertIs(cache, session.get_search_occurrences_cache(self.view))
+        session.session_on_close(self.view)
+        self.assertEqual(0, len(session.get_search_occurrences_cache(self.view)))
+
+    @unittest.mock_session()
+    def test_session_on_close_removes_setting_cache(self):
+        cache = session.get_setting_cache(self.view)
+        cache['vintageous_fizz'] = 'buzz'
+        self.assertIs(cache, session.get_setting_cache(self.view))
+        session.session_on_close(self.view)
+        self.assertEqual(0, len(session.get_setting_cache(self.view)))
+
     @unittest.mock_session()
     def test_get_set_session_value(self):
         session.set_session_value('fizz', 'buzz')
@@ -55,7 +80,46 @@ class TestSession(unittest.ViewTestCase):
         if unittest.ST_VERSION >= 4081:
             self.assertSessionNotSaved()
         else:
-            self.assertSessionSaved()
+            self.assertSessionSaveScheduled()
+
+    @unittest.mock.patch.dict('NeoVintageous.nv.session._session', {'fizz': 'buzz'}, clear=True)
+    @unittest.mock.patch('NeoVintageous.nv.session._get_session_file')
+    @unittest.mock.patch('NeoVintageous.nv.session._write_session_file')
+    @unittest.mock.patch('NeoVintageous.nv.session.set_timeout_async')
+    @unittest.mock.patch('NeoVintageous.nv.session.set_timeout')
+    def test_runtime_saves_are_coalesced(self, set_timeout, set_timeout_async, write_session_file, get_session_file):
+        get_session_file.return_value = 'test.session'
+        session._schedule_save_session()
+        session._schedule_save_session()
+        session.set_session_value('fizz', 'fizzbuzz')
+        session._schedule_save_session()
+        set_timeout.assert_called_once()
+        self.assertMockNotCalled(set_timeout_async)
+        set_timeout.call_args[0][0]()
+        set_timeout_async.assert_called_once()
+        set_timeout_async.call_args[0][0]()
+        write_session_file.assert_called_once_with('test.session', '{"fizz": "fizzbuzz"}')
+        session._schedule_save_session()
+        self.assertEqual(2, set_timeout.call_count)
+        session.save_session()
+        set_timeout.call_args[0][0]()
+        self.assertEqual(2, write_session_file.call_count)
+        self.assertEqual(1, set_timeout_async.call_count)
+
+    @unittest.mock.patch.dict('NeoVintageous.nv.session._session', {'fizz': 'buzz'}, clear=True)
+    @unittest.mock.patch('NeoVintageous.nv.session._get_session_file')
+    @unittest.mock.patch('NeoVintageous.nv.session._write_session_file')
+    @unittest.mock.patch('NeoVintageous.nv.session.set_timeout_async')
+    @unittest.mock.patch('NeoVintageous.nv.session.set_timeout')
+    def test_stale_queued_save_is_discarded(self, set_timeout, set_timeout_async, write_session_file, get_session_file):
+        get_session_file.return_value = 'test.session'
+        session._schedule_save_session()
+        set_timeout.call_args[0][0]()
+        session.set_session_value('fizz', 'fizzbuzz')
+        session.save_session()
+        write_session_file.assert_called_once_with('test.session', '{"fizz": "fizzbuzz"}')
+        set_timeout_async.call_args[0][0]()
+        write_session_file.assert_called_once_with('test.session', '{"fizz": "fizzbuzz"}')
 
     @unittest.mock_session()
     @unittest.mock.patch('NeoVintageous.nv.session._get_session_file')
@@ -159,6 +223,7 @@ class TestSession(unittest.ViewTestCase):
             session_file = os.path.join(tmpdir, 'test.session')
             get_session_file.return_value = session_file
             session.save_session()
+            self.assertEqual(['test.session'], os.listdir(tmpdir))
 
             with open(session_file, 'r', encoding='utf-8', errors='replace') as f:
                 with open(self.fixturePath('session_basic.json'), 'r', encoding='utf-8') as s:
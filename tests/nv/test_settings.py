@@ -19,8 +19,14 @@ import os
 
 from NeoVintageous.tests import unittest
 
+from NeoVintageous.nv.settings import clear_setting_cache_stats
 from NeoVintageous.nv.settings import get_cmdline_cwd
+from NeoVintageous.nv.settings import get_setting
+from NeoVintageous.nv.settings import get_setting_cache_stats
+from NeoVintageous.nv.settings import get_setting_neo
+from NeoVintageous.nv.settings import reset_setting
 from NeoVintageous.nv.settings import set_cmdline_cwd
+from NeoVintageous.nv.settings import set_setting
 
 
 class TestCmdlineCwd(unittest.ViewTestCase):
@@ -56,3 +62,49 @@ class TestCmdlineCwd(unittest.ViewTestCase):
     def test_can_return_session_cwd(self):
         set_cmdline_cwd('/tmp/fizz')
         self.assertEqual(get_cmdline_cwd(), '/tmp/fizz')
+
+
+class TestSettingCache(unittest.ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        clear_setting_cache_stats()
+
+    def tearDown(self):
+        clear_setting_cache_stats()
+        super().tearDown()
+
+    def test_get_setting_returns_default(self):
+        self.assertIsNone(get_setting(self.view, 'fizz_test'))
+        self.assertEqual('default', get_setting(self.view, 'fizz_test', 'default'))
+
+    def test_set_setting_updates_cache(self):
+        self.assertIsNone(get_setting(self.view, 'fizz_test'))
+        set_setting(self.view, 'fizz_test', 'buzz')
+        self.assertEqual('buzz', get_setting(self.view, 'fizz_test'))
+        reset_setting(self.view, 'fizz_test')
+        self.assertIsNone(get_setting(self.view, 'fizz_test'))
+
+    def test_cache_is_cleared_when_view_settings_change(self):
+        set_setting(self.view, 'fizz_test', 'buzz')
+        self.assertEqual('buzz', get_setting(self.view, 'fizz_test'))
+        self.view.settings().set('vintageous_fizz_test', 'fizz')
+        self.assertEqual('fizz', get_setting(self.view, 'fizz_test'))
+
+    def test_counts_hits_and_misses(self):
+        get_setting(self.view, 'fizz_test')
+        get_setting(self.view, 'fizz_test')
+        get_setting(self.view, 'fizz_test')
+        self.assertEqual((2, 1), get_setting_cache_stats()['vintageous_fizz_test'])
+        clear_setting_cache_stats()
+        self.assertEqual({}, get_setting_cache_stats())
+
+    def test_legacy_settings_are_cached(self):
+        set_setting(self.view, 'fizz_test', 'buzz')
+        self.assertEqual('buzz', get_setting_neo(self.view, 'fizz_test'))
+        self.view.settings().set('neovintageous_fizz_test', 'fizz')
+        self.assertEqual('fizz', get_setting_neo(self.view, 'fizz_test'))
+        self.assertEqual('fizz', get_setting_neo(self.view, 'fizz_test'))
+        self.assertEqual((1, 1), get_setting_cache_stats()['neovintageous_fizz_test'])
+        self.view.settings().erase('neovintageous_fizz_test')
+        self.assertEqual('buzz', get_setting_neo(self.view, 'fizz_test'))
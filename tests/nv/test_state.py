@@ -130,6 +130,23 @@ class TestState(unittest.ViewTestCase):
         set_motion(self.view, motion)
         self.assertTrue(_should_scroll_into_view(get_motion(self.view), get_action(self.view)))
 
+    def test_set_action_and_motion_stores_a_copy(self):
+        action = cmd_defs.ViReplaceCharacters()
+        motion = cmd_defs.ViSearchCharForward()
+        set_action(self.view, action)
+        set_motion(self.view, motion)
+        self.assertIsInstance(get_action(self.view), cmd_defs.ViReplaceCharacters)
+        self.assertIsInstance(get_motion(self.view), cmd_defs.ViSearchCharForward)
+        self.assertIsNot(get_action(self.view), action)
+        self.assertIsNot(get_motion(self.view), motion)
+        get_motion(self.view).accept('x')
+        self.assertEqual(get_motion(self.view).inp, 'x')
+        self.assertEqual(motion.inp, '')
+        set_action(self.view, None)
+        set_motion(self.view, None)
+        self.assertIsNone(get_action(self.view))
+        self.assertIsNone(get_motion(self.view))
+
 
 class TestStateResettingState(unittest.ViewTestCase):
 
@@ -21,7 +21,10 @@ from NeoVintageous.tests import unittest
 
 from NeoVintageous.nv.utils import VisualBlockSelection
 from NeoVintageous.nv.utils import extract_url
+from NeoVintageous.nv.settings import is_gluing_undo_groups
+from NeoVintageous.nv.settings import is_processing_notation
 from NeoVintageous.nv.utils import get_file_type
+from NeoVintageous.nv.utils import glue_undo_groups
 from NeoVintageous.nv.utils import resolve_visual_line_target
 from NeoVintageous.nv.utils import resolve_visual_target
 from NeoVintageous.nv.utils import save_view
@@ -57,6 +60,40 @@ class TestGetFileType(unittest.ViewTestCase):
         self.assertEqual('gitignore', get_file_type(self.view))
 
 
+class TestGlueUndoGroups(unittest.ViewTestCase):
+
+    def test_glue(self):
+        with unittest.mock.patch.object(self.view, 'run_command') as run_command:
+            with glue_undo_groups(self.view):
+                self.assertTrue(is_gluing_undo_groups(self.view))
+                self.assertFalse(is_processing_notation(self.view))
+
+        self.assertFalse(is_gluing_undo_groups(self.view))
+        self.assertEqual([
+            unittest.mock.call('mark_undo_groups_for_gluing'),
+            unittest.mock.call('glue_marked_undo_groups')
+        ], run_command.call_args_list)
+
+    def test_nested_calls_are_glued_by_the_outermost_call(self):
+        with unittest.mock.patch.object(self.view, 'run_command') as run_command:
+            with glue_undo_groups(self.view):
+                with glue_undo_groups(self.view):
+                    pass
+
+                self.assertTrue(is_gluing_undo_groups(self.view))
+
+        self.assertEqual(2, run_command.call_count)
+
+    def test_glued_when_an_exception_is_raised(self):
+        with unittest.mock.patch.object(self.view, 'run_command') as run_command:
+            with self.assertRaises(ValueError):
+                with glue_undo_groups(self.view):
+                    raise ValueError()
+
+        self.assertFalse(is_gluing_undo_groups(self.view))
+        run_command.assert_called_with('glue_marked_undo_groups')
+
+
 class TestTranslateChar(unittest.TestCase):
 
     def test_tranlsate_char(self):
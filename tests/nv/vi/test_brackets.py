@@ -0,0 +1,87 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+from NeoVintageous.tests import unittest
+
+from NeoVintageous.nv.vi.brackets import find_enclosing_closing_bracket
+from NeoVintageous.nv.vi.brackets import find_enclosing_opening_bracket
+
+
+class TestBrackets(unittest.ViewTestCase):
+
+    def opening(self, pt: int, count: int = 1):
+        return find_enclosing_opening_bracket(self.view, pt, '(', ')', count)
+
+    def closing(self, pt: int, count: int = 1):
+        return find_enclosing_closing_bracket(self.view, pt, '(', ')', count)
+
+    def test_innermost_pair(self):
+        self.write('a (b (c) (d) e) f')
+        self.assertEqual(self.opening(13), 2)
+        self.assertEqual(self.closing(4), 14)
+        self.assertEqual(self.opening(7), 5)
+        self.assertEqual(self.closing(6), 7)
+
+    def test_bracket_at_point_encloses_point(self):
+        self.write('a (b (c) (d) e) f')
+        self.assertEqual(self.opening(5), 5)
+        self.assertEqual(self.closing(5), 7)
+        self.assertEqual(self.opening(14), 2)
+        self.assertEqual(self.closing(14), 14)
+
+    def test_outside_pairs(self):
+        self.write('a (b) c (d) e')
+        self.assertIsNone(self.opening(6))
+        self.assertIsNone(self.closing(6))
+        self.assertIsNone(self.closing(0))
+
+    def test_count(self):
+        self.write('((a (b)) (c))')
+        self.assertEqual(self.opening(5, 1), 4)
+        self.assertEqual(self.opening(5, 2), 1)
+        self.assertEqual(self.opening(5, 3), 0)
+        self.assertIsNone(self.opening(5, 4))
+        self.assertEqual(self.closing(5, 1), 6)
+        self.assertEqual(self.closing(5, 2), 7)
+        self.assertEqual(self.closing(5, 3), 12)
+        self.assertIsNone(self.closing(5, 4))
+
+    def test_unbalanced(self):
+        self.write('a ( b ( c ) d')
+        self.assertEqual(self.opening(12), 2)
+        self.assertIsNone(self.closing(12))
+        self.write('a ( b ) c ) d')
+        self.assertEqual(self.closing(8), 10)
+        self.assertIsNone(self.opening(8))
+
+    def test_escaped_brackets_are_ignored(self):
+        self.write('(a \\) b \\( c)')
+        self.assertEqual(self.opening(6), 0)
+        self.assertEqual(self.closing(6), 12)
+
+    def test_index_is_rebuilt_when_view_changes(self):
+        self.write('(a)')
+        self.assertEqual(self.closing(1), 2)
+        self.write('(a b)')
+        self.assertEqual(self.closing(1), 4)
+
+    def test_strings_and_comments_can_be_ignored(self):
+        self.syntax('Packages/Python/Python.sublime-syntax')
+        self.write('f(a, ")", b)  # )\n')
+        self.assertEqual(self.closing(3), 6)
+        self.set_setting('brackets_ignore_strings_and_comments', True)
+        self.assertEqual(self.closing(3), 11)
+        self.assertEqual(self.opening(10), 1)
@@ -17,6 +17,7 @@
 
 import unittest
 
+from NeoVintageous.nv.vi.keys import DeferredDefs
 from NeoVintageous.nv.vi.keys import to_bare_command_name
 from NeoVintageous.nv.vi.keys import tokenize_keys
 
@@ -178,3 +179,33 @@ class TestToBareCommandName(unittest.TestCase):
         self.assertEqual('daw', to_bare_command_name('d2aw'))
         self.assertEqual('daw', to_bare_command_name('daw'))
         self.assertEqual('dd', to_bare_command_name('d2d'))
+
+
+class TestDeferredDefs(unittest.TestCase):
+
+    def test_instantiates_on_first_lookup(self):
+        instances = []
+
+        class Def():
+            def __init__(self, *args, **kwargs):
+                self.args = args
+                self.kwargs = kwargs
+                instances.append(self)
+
+        defs = DeferredDefs()
+        defs.defer('x', Def, (1,), {'a': 2})
+        self.assertEqual(instances, [])
+        command = defs.get('x')
+        self.assertIsInstance(command, Def)
+        self.assertEqual(command.args, (1,))
+        self.assertEqual(command.kwargs, {'a': 2})
+        self.assertIs(defs['x'], command)
+        self.assertIs(defs.get('x'), command)
+        self.assertEqual(len(instances), 1)
+
+    def test_get_missing(self):
+        defs = DeferredDefs()
+        self.assertIsNone(defs.get('x'))
+        self.assertEqual(defs.get('x', 'default'), 'default')
+        with self.assertRaises(KeyError):
+            defs['x']
@@ -28,6 +28,10 @@ TESTS_NEXT_BRACKET = (
     test(content='a\\}bc', start=2, brackets=('\\{', '\\}'), expected=None, msg='should not find escaped bracket at caret position'),  # noqa: E501
     test(content='a\\}bc', start=0, brackets=('\\{', '\\}'), expected=None, msg='should not find escaped bracket'),
     test(content='foo {bar foo bar}', start=16, brackets=('\\{', '\\}'), expected=unittest.Region(16, 17), msg='should find next bracket at caret position'),  # noqa: E501
+    test(content='{a {b} {c} d}', start=4, brackets=('\\{', '\\}'), expected=unittest.Region(5, 6), msg='should find inner bracket'),  # noqa: E501
+    test(content='{a {b} {c} d}', start=1, brackets=('\\{', '\\}'), expected=unittest.Region(12, 13), msg='should skip nested brackets'),  # noqa: E501
+    test(content='{a {b} {c} d}', start=3, brackets=('\\{', '\\}'), expected=unittest.Region(5, 6), msg='should find bracket of opening bracket at caret position'),  # noqa: E501
+    test(content='a {b} c', start=0, brackets=('\\{', '\\}'), expected=None, msg='should not find brackets of pairs after caret'),  # noqa: E501
 )
 
 
@@ -0,0 +1,225 @@
+# Copyright (C) 2018-2023 The NeoVintageous Team (NeoVintageous).
+#
+# This file is part of NeoVintageous.
+#
+# NeoVintageous is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# NeoVintageous is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NeoVintageous.  If not, see <https://www.gnu.org/licenses/>.
+from itertools import product
+
+from sublime import Region
+
+from NeoVintageous.tests import unittest
+
+from NeoVintageous.nv.utils import last_row
+from NeoVintageous.nv.utils import row_at
+from NeoVintageous.nv.vi.text_objects import find_paragraph_text_object
+from NeoVintageous.nv.vi.units import next_paragraph_start
+from NeoVintageous.nv.vi.units import prev_paragraph_start
+
+
+# The paragraph motions and text objects as they were implemented by walking
+# over lines with view.line() and view.substr() calls. The implementations
+# that read the lines through a LineWindow must give the same results.
+
+def _next_paragraph_start(view, pt: int, count: int = 1) -> int:
+    skip_empty = count > 1
+
+    if row_at(view, pt) == last_row(view):
+        if not view.line(view.size()).empty():
+            return view.size() - 1
+
+        return view.size()
+
+    current_row = row_at(view, pt)
+    if (view.line(view.text_point(current_row + 1, 0)).empty() and view.line(pt).empty()):
+        pt, _ = _next_non_empty_row(view, pt)
+
+    for i in range(count):
+        pt, eof = _next_empty_row(view, pt)
+        if eof:
+            if view.line(pt).empty():
+                return pt
+
+            return pt - 1
+
+        if skip_empty and (i != (count - 1)):
+            pt, eof = _next_non_empty_row(view, pt)
+            if eof:
+                if not view.line(pt).empty():
+                    return pt - 1
+
+                return pt
+
+    return pt
+
+
+def _next_empty_row(view, pt: int) -> tuple:
+    r = row_at(view, pt)
+    while True:
+        r += 1
+        pt = view.text_point(r, 0)
+        if row_at(view, pt) == last_row(view):
+            return view.size(), True
+
+        if view.line(pt).empty():
+            return pt, False
+
+
+def _next_non_empty_row(view, pt: int) -> tuple:
+    r = row_at(view, pt)
+    while True:
+        r += 1
+        reg = view.line(view.text_point(r, 0))
+        if r >= last_row(view):
+            return view.size(), True
+
+        if not reg.empty():
+            return reg.a, False
+
+
+def _prev_paragraph_start(view, pt: int, count: int = 1, skip_empty: bool = True) -> int:
+    if row_at(view, pt) == 0:
+        return 0
+
+    current_row = row_at(view, pt)
+    if (view.line(view.text_point(current_row - 1, 0)).empty() and view.line(view.text_point(current_row, 0)).empty()):
+        pt, bof = _prev_non_empty_row(view, pt)
+        if bof:
+            return 0
+
+    for i in range(count):
+        pt, bof = _prev_empty_row(view, pt)
+        if bof:
+            return 0
+
+        if skip_empty and (count > 1) and (i != count - 1):
+            pt, bof = _prev_non_empty_row(view, pt)
+            if bof:
+                return pt
+
+    return view.text_point(row_at(view, pt), 0)
+
+
+def _prev_empty_row(view, pt: int) -> tuple:
+    r = row_at(view, pt)
+    while True:
+        r -= 1
+        if r == 0:
+            return 0, True
+
+        pt = view.text_point(r, 0)
+        if view.line(pt).empty():
+            return pt, False
+
+
+def _prev_non_empty_row(view, pt: int) -> tuple:
+    r = row_at(view, pt)
+    while True:
+        r -= 1
+        reg = view.line(view.text_point(r, 0))
+        if r <= 0:
+            return 0, True
+
+        if not reg.empty():
+            return reg.a, False
+
+
+def _find_inner_paragraph(view, initial_loc):
+    def is_whitespace(region):
+        return len(view.substr(region).strip()) == 0
+
+    iws = is_whitespace(view.line(initial_loc))
+
+    p = initial_loc
+    while True:
+        line = view.line(p)
+        if is_whitespace(line) != iws:
+            break
+        elif line.begin() == 0:
+            p = 0
+            break
+
+        p = line.begin() - 1
+
+    begin = p + 1 if p > 0 else p
+
+    p = initial_loc
+    while True:
+        line = view.line(p)
+        if is_whitespace(line) != iws:
+            break
+
+        p = line.end() + 1
+
+        if p >= view.size():
+            break
+
+    end = p
+
+    return (begin, end)
+
+
+def _find_paragraph_text_object(view, s: Region, inclusive: bool = True, count: int = 1) -> Region:
+    begin = None
+    end = s.a
+    for _ in range(count):
+        b1, e1 = _find_inner_paragraph(view, end)
+        b2, end = _find_inner_paragraph(view, e1) if inclusive else (b1, e1)
+        if begin is None:
+            begin = b1
+
+    if begin is None:
+        return Region(end)
+
+    return Region(begin, end)
+
+
+def _texts():
+    # Every buffer of up to four lines made of empty, blank, and non-blank
+    # lines, with and without a trailing newline.
+    for size in range(5):
+        for lines in product(('', ' ', 'a', 'bc'), repeat=size):
+            yield '\n'.join(lines)
+            yield '\n'.join(lines) + '\n'
+
+
+# A tiny window makes the line windows read forwards and backwards repeatedly.
+@unittest.mock.patch('NeoVintageous.nv.vi.units._LINE_WINDOW_SIZE', 2)
+class TestParagraphDifferential(unittest.ViewTestCase):
+
+    def assertSameAsReference(self, actual, expected) -> None:
+        for text in _texts():
+            self.write(text)
+            for pt in range(len(text) + 1):
+                for count in (1, 2, 3):
+                    self.assertEqual(
+                        actual(pt, count),
+                        expected(pt, count),
+                        'text={!r} pt={} count={}'.format(text, pt, count))
+
+    def test_next_paragraph_start(self):
+        self.assertSameAsReference(
+            lambda pt, count: next_paragraph_start(self.view, pt, count),
+            lambda pt, count: _next_paragraph_start(self.view, pt, count))
+
+    def test_prev_paragraph_start(self):
+        for skip_empty in (True, False):
+            self.assertSameAsReference(
+                lambda pt, count: prev_paragraph_start(self.view, pt, count, skip_empty),
+                lambda pt, count: _prev_paragraph_start(self.view, pt, count, skip_empty))
+
+    def test_paragraph_text_object(self):
+        for inclusive in (True, False):
+            self.assertSameAsReference(
+                lambda pt, count: find_paragraph_text_object(self.view, Region(pt), inclusive, count),
+                lambda pt, count: _find_paragraph_text_object(self.view, Region(pt), inclusive, count))
@@ -1280,14 +1280,17 @@ def mock_session():
         self.assertSessionEmpty()
         self.assertSessionHasNoMacros()
         self.assertSession({'a': {'x': 'y'}, 'b': True})
+        self.assertSessionSaveScheduled()
 
     """
     def wrapper(f):
         @mock.patch.dict('NeoVintageous.nv.session._session', {}, clear=True)
         @mock.patch.dict('NeoVintageous.nv.history._storage', {}, clear=True)
         @mock.patch('NeoVintageous.nv.session.save_session')
+        @mock.patch('NeoVintageous.nv.session._schedule_save_session')
         def wrapped(self, *args, **kwargs):
-            save = args[-1]
+            save = args[-2]
+            schedule_save = args[-1]
 
             def _assertSessionEqual(*args) -> None:
                 from NeoVintageous.nv import session
@@ -1316,13 +1319,15 @@ def mock_session():
 
             def _assertNotSaved() -> None:
                 self.assertMockNotCalled(save)
+                self.assertMockNotCalled(schedule_save)
 
             self.assertSessionNotSaved = _assertNotSaved
             self.assertSessionSaved = save.assert_called_once_with
+            self.assertSessionSaveScheduled = schedule_save.assert_called_once_with
             self.assertSession = _assertSessionEqual
             self.assertSessionEmpty = _assertSessionEmpty
 
-            return f(self, *args[:-1], **kwargs)
+            return f(self, *args[:-2], **kwargs)
         return wrapped
     return wrapper
 
@@ -1385,6 +1390,7 @@ def mock_mappings(*mappings):
         from NeoVintageous.nv.mappings import mappings_add
 
         @unittest.mock.patch.dict('NeoVintageous.nv.mappings._mappings', {k: {} for k in _mappings}, clear=True)
+        @unittest.mock.patch.dict('NeoVintageous.nv.mappings._trie', {k: {} for k in _mappings}, clear=True)
         def wrapped(self, *args, **kwargs):
             for mapping in mappings:
                 mappings_add(*mapping)